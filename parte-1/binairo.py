@@ -0,0 +1,434 @@
+"""
+Motor nativo para Binairo basado en máscaras de bits.
+
+Cada línea (fila o columna) se representa como un entero de n bits: en una
+fila el bit j es la columna j y en una columna el bit i es la fila i; el bit
+vale 1 si la casilla es X (negro) y 0 si es O (blanco), igual que la
+codificación O = 0, X = 1 del CSP de parte-1.py.
+
+Las líneas válidas por sí solas (n/2 unos y sin tres bits iguales seguidos)
+se precalculan una vez por tamaño. El dominio de cada fila y de cada columna
+es la lista de esos patrones compatibles con sus casillas conocidas, que se
+guardan como dos máscaras por línea (bits que valen 1 y bits que valen 0).
+
+La propagación filtra el dominio de una línea con sus máscaras y fija las
+casillas en las que coinciden todos sus patrones; cada casilla fijada
+actualiza las máscaras de la línea perpendicular, que se vuelve a filtrar,
+hasta llegar a un punto fijo. La búsqueda elige la línea con menos patrones
+(y más de uno), prueba cada uno y propaga; si algún dominio se vacía,
+retrocede. Como filas y columnas son patrones válidos, el tablero completo
+cumple todas las restricciones.
+"""
+
+from functools import lru_cache
+from itertools import product
+
+# -----------------------------------------------------------------------------
+# Patrones de línea
+# -----------------------------------------------------------------------------
+
+def _sin_tres_iguales(patron, n):
+    """Comprueba que no hay tres bits iguales consecutivos entre los n bits."""
+    completo = (1 << n) - 1
+    complemento = ~patron & completo
+    return (patron & (patron >> 1) & (patron >> 2)) == 0 and \
+           (complemento & (complemento >> 1) & (complemento >> 2)) == 0
+
+
+@lru_cache(maxsize=None)
+def patrones_validos(n):
+    """
+    Todas las líneas válidas de tamaño n: n/2 unos y sin tres iguales seguidos.
+
+    Returns:
+        tuple: Patrones (enteros de n bits) en orden creciente
+    """
+    mitad = n // 2
+    return tuple(p for p in range(1 << n)
+                 if bin(p).count("1") == mitad and _sin_tres_iguales(p, n))
+
+
+def mascaras_lineas(tablero, n):
+    """
+    Casillas conocidas de cada línea (0..n-1 filas, n..2n-1 columnas).
+
+    Returns:
+        tuple: (uno, cero), listas de 2n máscaras con los bits de las
+               casillas que valen X y de las que valen O
+    """
+    uno = [0] * (2 * n)
+    cero = [0] * (2 * n)
+    for i, fila in enumerate(tablero):
+        for j, celda in enumerate(fila):
+            if celda == 'X':
+                uno[i] |= 1 << j
+                uno[n + j] |= 1 << i
+            elif celda == 'O':
+                cero[i] |= 1 << j
+                cero[n + j] |= 1 << i
+    return uno, cero
+
+
+def a_diccionario(filas, n):
+    """Convierte una solución en patrones de fila al formato {(i, j): 0/1} del CSP."""
+    return {(i, j): (patron >> j) & 1 for i, patron in enumerate(filas) for j in range(n)}
+
+# -----------------------------------------------------------------------------
+# Deducción previa: reglas de pares, huecos y líneas completas
+# -----------------------------------------------------------------------------
+
+def _unos(mascara):
+    """Número de bits a 1 de una máscara."""
+    return bin(mascara).count("1")
+
+
+def _forzadas(u, c, n):
+    """
+    Casillas desconocidas de una línea que las reglas básicas obligan a
+    tomar un valor, a partir de sus máscaras de unos (u) y ceros (c):
+        - pares: junto a dos casillas iguales seguidas va el color contrario
+        - huecos: entre dos casillas iguales separadas por una va el contrario
+        - línea completa: si ya hay n/2 de un color, el resto es del otro
+
+    Returns:
+        tuple: (unos, ceros) con las casillas forzadas a X y a O
+    """
+    desconocidas = ((1 << n) - 1) & ~(u | c)
+
+    def contrarias(iguales):
+        """Casillas que deben tomar el color contrario al de 'iguales'."""
+        pares = iguales & (iguales >> 1)       # bit k: k y k+1 del mismo color
+        huecos = iguales & (iguales >> 2)      # bit k: k y k+2 del mismo color
+        forzadas = (pares >> 1) | (pares << 2) | (huecos << 1)
+        if _unos(iguales) == n // 2:
+            forzadas |= desconocidas
+        return forzadas & desconocidas
+
+    return contrarias(c), contrarias(u)
+
+
+def _contradictoria(u, c, n):
+    """Comprueba si las casillas conocidas de una línea ya incumplen las reglas."""
+    return (u & c or _unos(u) > n // 2 or _unos(c) > n // 2
+            or u & (u >> 1) & (u >> 2) or c & (c >> 1) & (c >> 2))
+
+
+def deducir(tablero, n, distintas=False):
+    """
+    Aplica las reglas de pares, huecos y línea completa (ver _forzadas)
+    hasta que ninguna fija casillas nuevas.
+
+    En la variante de líneas distintas se añade una regla más: si a una
+    línea solo le faltan dos casillas, una de cada color, y coincide en todo
+    lo conocido con otra línea ya completa de la misma orientación, esas dos
+    casillas toman el valor contrario al de la línea completa.
+
+    Args:
+        tablero: Matriz n x n de caracteres '.', 'O' y 'X'
+        n: Tamaño del tablero
+        distintas: Variante en la que no puede haber dos filas ni dos
+                   columnas iguales
+
+    Returns:
+        tuple: (tablero, fijadas) con una copia del tablero en la que se han
+               rellenado las casillas deducidas y cuántas son; tablero es
+               None si las reglas llevan a una contradicción (sin solución)
+    """
+    completo = (1 << n) - 1
+    mitad = n // 2
+    uno, cero = mascaras_lineas(tablero, n)
+    pendientes = set(range(2 * n))
+    fijadas = 0
+
+    while pendientes:
+        linea = pendientes.pop()
+        u = uno[linea]
+        c = cero[linea]
+        if _contradictoria(u, c, n):
+            return None, fijadas
+        nuevos_uno, nuevos_cero = _forzadas(u, c, n)
+
+        inicio = 0 if linea < n else n
+        desconocidas = completo & ~(u | c)
+        if distintas and _unos(desconocidas) == 2 and _unos(u) == mitad - 1:
+            for otra in range(inicio, inicio + n):
+                patron = uno[otra]
+                if (otra != linea and uno[otra] | cero[otra] == completo
+                        and patron & u == u and patron & c == 0):
+                    nuevos_uno |= ~patron & desconocidas
+                    nuevos_cero |= patron & desconocidas
+                    break
+
+        if nuevos_uno & nuevos_cero:
+            return None, fijadas
+        if not (nuevos_uno or nuevos_cero):
+            continue
+
+        uno[linea] = u | nuevos_uno
+        cero[linea] = c | nuevos_cero
+        fijadas += _unos(nuevos_uno | nuevos_cero)
+        pendientes.add(linea)
+        if distintas and uno[linea] | cero[linea] == completo:
+            # Una línea recién completada puede activar la regla en sus paralelas
+            pendientes.update(range(inicio, inicio + n))
+
+        # Cada casilla nueva pasa a la línea perpendicular
+        base, posicion = (n, linea) if linea < n else (0, linea - n)
+        for nuevos, mascaras in ((nuevos_uno, uno), (nuevos_cero, cero)):
+            while nuevos:
+                bit = nuevos & -nuevos
+                nuevos ^= bit
+                perpendicular = base + bit.bit_length() - 1
+                mascaras[perpendicular] |= 1 << posicion
+                pendientes.add(perpendicular)
+
+    # Con la variante, dos líneas completas iguales son una contradicción
+    if distintas:
+        for inicio in (0, n):
+            completas = [uno[l] for l in range(inicio, inicio + n) if uno[l] | cero[l] == completo]
+            if len(set(completas)) != len(completas):
+                return None, fijadas
+
+    resultado = [['X' if (uno[i] >> j) & 1 else 'O' if (cero[i] >> j) & 1 else '.'
+                  for j in range(n)] for i in range(n)]
+    return resultado, fijadas
+
+
+def dividir(tablero, n, k, distintas=False):
+    """
+    Parte el tablero en subproblemas independientes fijando sus k primeras
+    casillas libres (en orden de filas) a cada combinación de O y X.
+
+    Cada subtablero pasa por deducir(), que descarta las combinaciones que ya
+    incumplen las reglas. Como dos subtableros difieren en alguna casilla
+    fijada, sus soluciones no se repiten y la unión es la del tablero entero.
+
+    Returns:
+        list: Subtableros (ya deducidos) en el orden de las combinaciones
+    """
+    libres = [(i, j) for i in range(n) for j in range(n) if tablero[i][j] == '.'][:k]
+    subtableros = []
+    for valores in product('OX', repeat=len(libres)):
+        subtablero = [list(fila) for fila in tablero]
+        for (i, j), valor in zip(libres, valores):
+            subtablero[i][j] = valor
+        subtablero, _ = deducir(subtablero, n, distintas)
+        if subtablero is not None:
+            subtableros.append(subtablero)
+    return subtableros
+
+# -----------------------------------------------------------------------------
+# Clase ResolutorBinairo: propagación y búsqueda sobre patrones de línea
+# -----------------------------------------------------------------------------
+
+class ResolutorBinairo:
+    """
+    Enumera las soluciones de un tablero Binairo.
+
+    Las líneas se numeran 0..n-1 para las filas y n..2n-1 para las columnas.
+
+    Atributos:
+        n: Tamaño del tablero
+        nodos: Patrones probados durante la última búsqueda (esfuerzo)
+    """
+
+    def __init__(self, tablero, n, distintas=False):
+        """
+        Prepara las máscaras de las casillas dadas.
+
+        Args:
+            tablero: Matriz n x n de caracteres '.', 'O' y 'X'
+            n: Tamaño del tablero
+            distintas: Variante en la que no puede haber dos filas ni dos
+                       columnas iguales
+        """
+        self.n = n
+        self.distintas = distintas
+        self._completo = (1 << n) - 1
+        self._patrones = list(patrones_validos(n))
+        self._uno, self._cero = mascaras_lineas(tablero, n)
+        self.nodos = 0
+
+    def _propagar(self, uno, cero, dominios, pendientes):
+        """
+        Filtra los dominios de las líneas pendientes hasta un punto fijo.
+
+        Modifica uno, cero y dominios en el sitio.
+
+        Returns:
+            bool: False si algún dominio se queda vacío (rama sin solución)
+        """
+        n = self.n
+        completo = self._completo
+        while pendientes:
+            linea = pendientes.pop()
+            u = uno[linea]
+            c = cero[linea]
+            dominio = [p for p in dominios[linea] if p & u == u and p & c == 0]
+            if not dominio:
+                return False
+            dominios[linea] = dominio
+
+            # Variante de líneas distintas: un patrón ya decidido no puede
+            # repetirse en otra línea de la misma orientación
+            if self.distintas and len(dominio) == 1:
+                patron = dominio[0]
+                inicio = 0 if linea < n else n
+                for otra in range(inicio, inicio + n):
+                    if otra != linea and patron in dominios[otra]:
+                        if len(dominios[otra]) == 1:
+                            return False
+                        dominios[otra] = [p for p in dominios[otra] if p != patron]
+                        pendientes.add(otra)
+
+            # Casillas en las que coinciden todos los patrones que quedan
+            siempre_uno = completo
+            siempre_cero = completo
+            for p in dominio:
+                siempre_uno &= p
+                siempre_cero &= ~p
+            nuevos_uno = siempre_uno & ~u
+            nuevos_cero = siempre_cero & ~c
+            if not (nuevos_uno or nuevos_cero):
+                continue
+            uno[linea] = u | nuevos_uno
+            cero[linea] = c | nuevos_cero
+
+            # Cada casilla nueva pasa a la línea perpendicular
+            base, posicion = (n, linea) if linea < n else (0, linea - n)
+            for nuevos, mascaras in ((nuevos_uno, uno), (nuevos_cero, cero)):
+                while nuevos:
+                    bit = nuevos & -nuevos
+                    nuevos ^= bit
+                    perpendicular = base + bit.bit_length() - 1
+                    mascaras[perpendicular] |= 1 << posicion
+                    pendientes.add(perpendicular)
+        return True
+
+    def soluciones(self):
+        """
+        Genera las soluciones de una en una como listas de n patrones de fila.
+
+        La búsqueda es perezosa: solo avanza cuando se pide la siguiente
+        solución, así que se puede parar en cualquier momento.
+        """
+        self.nodos = 0
+        uno = list(self._uno)
+        cero = list(self._cero)
+        dominios = [self._patrones] * (2 * self.n)
+        if not self._propagar(uno, cero, dominios, set(range(2 * self.n))):
+            return
+        yield from self._buscar(uno, cero, dominios)
+
+    def _buscar(self, uno, cero, dominios):
+        """Ramifica sobre la línea con menos patrones posibles."""
+        linea = None
+        menor = 0
+        for l, dominio in enumerate(dominios):
+            if len(dominio) > 1 and (linea is None or len(dominio) < menor):
+                linea = l
+                menor = len(dominio)
+
+        if linea is None:
+            # Todas las líneas tienen un único patrón: tablero completo
+            yield [dominio[0] for dominio in dominios[:self.n]]
+            return
+
+        for patron in dominios[linea]:
+            self.nodos += 1
+            nuevo_uno = list(uno)
+            nuevo_cero = list(cero)
+            nuevos_dominios = list(dominios)
+            nuevos_dominios[linea] = [patron]
+            if self._propagar(nuevo_uno, nuevo_cero, nuevos_dominios, {linea}):
+                yield from self._buscar(nuevo_uno, nuevo_cero, nuevos_dominios)
+
+# -----------------------------------------------------------------------------
+# Conteo por programación dinámica sobre filas (matriz de transferencia)
+# -----------------------------------------------------------------------------
+
+def _repartir(patron, n, ancho):
+    """Copia el bit j del patrón en el campo j (de 'ancho' bits) de un entero."""
+    repartido = 0
+    for j in range(n):
+        if (patron >> j) & 1:
+            repartido |= 1 << (ancho * j)
+    return repartido
+
+
+def contar(tablero, n):
+    """
+    Cuenta las soluciones sin construir ninguna, recorriendo las filas en orden.
+
+    Tras colocar las primeras filas, lo único que influye en cómo se pueden
+    completar las demás es, por columna, cuántas X y cuántas O lleva, el
+    valor de su última casilla y si las dos últimas son iguales (entonces la
+    siguiente tiene que ser del otro color). Cada estado se empaqueta en un
+    único entero:
+
+        [ iguales (n bits) | ultima (n bits) | ceros | unos ]
+
+    iguales: columnas cuyas dos últimas casillas coinciden; ultima: la última
+    fila; unos / ceros: los contadores de X y O de las columnas, un campo de
+    'ancho' bits por columna. Un diccionario guarda cuántas formas hay de
+    llegar a cada estado y, en cada fila, se prueba cada patrón válido
+    compatible con sus casillas dadas; los estados que coinciden se funden
+    sumando sus formas.
+
+    Los contadores llevan un desplazamiento para que superar n/2 encienda el
+    bit alto de su campo: una sola máscara comprueba todas las columnas. Al
+    final ninguna columna pasa de n/2 X ni de n/2 O, así que tiene exactamente
+    n/2 de cada.
+
+    El número de estados crece muy deprisa con n: un 8x8 vacío (unos 12
+    millones de soluciones) se cuenta en segundos, pero un 10x10 con pocas
+    casillas dadas puede no caber en memoria. No admite la variante de líneas
+    distintas (el estado tendría que recordar las filas ya usadas).
+
+    Returns:
+        int: Número exacto de soluciones
+    """
+    mitad = n // 2
+    completo = (1 << n) - 1
+    ancho = mitad.bit_length() + 1
+    bits_cuentas = 2 * ancho * n
+    todas_cuentas = (1 << bits_cuentas) - 1
+    desplazamiento = (1 << (ancho - 1)) - 1 - mitad
+    base = sum(desplazamiento << (ancho * j) for j in range(2 * n))
+    desbordes = sum(1 << (ancho * j + ancho - 1) for j in range(2 * n))
+
+    uno, cero = mascaras_lineas(tablero, n)
+    # Patrones de cada fila con lo que suman a los contadores de las columnas
+    candidatos = [
+        [(p, _repartir(p, n, ancho) | _repartir(~p & completo, n, ancho) << (ancho * n))
+         for p in patrones_validos(n) if p & uno[i] == uno[i] and p & cero[i] == 0]
+        for i in range(n)
+    ]
+
+    # La primera fila no tiene casillas anteriores con las que formar tríos
+    estados = {}
+    for p, suma in candidatos[0]:
+        clave = p << bits_cuentas | (base + suma)
+        estados[clave] = estados.get(clave, 0) + 1
+
+    for fila in candidatos[1:]:
+        siguientes = {}
+        for clave, formas in estados.items():
+            cuentas = clave & todas_cuentas
+            ultima = (clave >> bits_cuentas) & completo
+            iguales = clave >> (bits_cuentas + n)
+            dos_unos = iguales & ultima
+            dos_ceros = iguales & ~ultima
+            for p, suma in fila:
+                if p & dos_unos or ~p & dos_ceros:
+                    continue
+                nuevas = cuentas + suma
+                if nuevas & desbordes:
+                    continue
+                nueva = ((~(ultima ^ p) & completo) << n | p) << bits_cuentas | nuevas
+                siguientes[nueva] = siguientes.get(nueva, 0) + formas
+        estados = siguientes
+        if not estados:
+            return 0
+
+    return sum(estados.values())
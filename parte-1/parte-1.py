@@ -1,8 +1,28 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
 import sys
+import time
+import argparse
+import multiprocessing
 from constraint import Problem, ExactSumConstraint
+import binairo
+
+# Motores de resolución: "mascaras" (binairo.py, propagación y búsqueda sobre
+# patrones de línea en máscaras de bits) o "constraint" (CSP de python-constraint)
+MOTORES = ("mascaras", "constraint")
+
+# Modos de ejecución:
+#   todas:   guarda todas las soluciones en memoria (comportamiento original)
+#   primera: se detiene en la primera solución
+#   contar:  cuenta las soluciones sin guardarlas (solo se conserva la primera);
+#            con el motor de máscaras, sin generarlas (programación dinámica)
+#   flujo:   escribe cada solución en el fichero de salida según se encuentra
+MODOS = ("todas", "primera", "contar", "flujo")
+
+# Subproblemas por trabajador al repartir la búsqueda (--paralelo)
+SUBPROBLEMAS_POR_TRABAJADOR = 8
 
 # -----------------------------------------------------------------------------
 # Parte 1: Satisfacción de Restricciones (Binairo)
@@ -78,16 +98,176 @@ def imprimir_tablero_str(tablero):
     # Unimos todas las líneas en una única cadena
     return "\n".join(tablero_str)
 
-def resolver_binairo(tablero_inicial, n):
+def _soluciones_mascaras(tablero_inicial, n, distintas, estadisticas):
+    """
+    Patrones de fila de cada solución con binairo.ResolutorBinairo. Deja en
+    estadisticas['nodos'] los patrones probados hasta la última solución
+    entregada (o hasta agotar la búsqueda).
+    """
+    resolutor = binairo.ResolutorBinairo(tablero_inicial, n, distintas)
+    for filas in resolutor.soluciones():
+        estadisticas["nodos"] = resolutor.nodos
+        yield filas
+    estadisticas["nodos"] = resolutor.nodos
+
+def iterar_soluciones(tablero_inicial, n, motor="mascaras", distintas=False, estadisticas=None):
+    """
+    Devuelve un iterador perezoso sobre las soluciones del Binairo: cada
+    solución se busca cuando se pide la siguiente.
+
+    Ambos motores encuentran las mismas soluciones (aunque no necesariamente
+    en el mismo orden), en el formato {(i, j): 0/1} con O = 0 y X = 1. Con
+    distintas se resuelve la variante sin filas ni columnas repetidas. Con el
+    motor de máscaras, si se pasa el diccionario estadisticas, se deja en
+    estadisticas['nodos'] el esfuerzo de la búsqueda (ResolutorBinairo.nodos).
+    """
+    if motor == "constraint":
+        return crear_problema(tablero_inicial, n, distintas).getSolutionIter()
+
+    soluciones = _soluciones_mascaras(tablero_inicial, n, distintas,
+                                      {} if estadisticas is None else estadisticas)
+    return (binairo.a_diccionario(filas, n) for filas in soluciones)
+
+def resolver_binairo(tablero_inicial, n, motor="mascaras", distintas=False, estadisticas=None):
+    """
+    Resuelve el Binairo con el motor indicado.
+
+    Devuelve una lista con todas las soluciones encontradas.
+    """
+    if motor == "constraint":
+        return crear_problema(tablero_inicial, n, distintas).getSolutions()
+    return list(iterar_soluciones(tablero_inicial, n, motor, distintas, estadisticas))
+
+def primera_solucion(tablero_inicial, n, motor="mascaras", distintas=False, estadisticas=None):
+    """Devuelve la primera solución encontrada, o None si no hay ninguna."""
+    if motor == "constraint":
+        return crear_problema(tablero_inicial, n, distintas).getSolution()
+    return next(iterar_soluciones(tablero_inicial, n, motor, distintas, estadisticas), None)
+
+def contar_soluciones(tablero_inicial, n, motor="mascaras", distintas=False, estadisticas=None):
+    """
+    Cuenta las soluciones sin guardarlas en memoria.
+
+    Devuelve (número de soluciones, primera solución o None). Cuando las
+    enumera el motor de máscaras deja sus nodos en estadisticas, como
+    iterar_soluciones; el conteo por filas (binairo.contar) no es una
+    búsqueda y no deja nodos.
+    """
+    if motor == "constraint":
+        soluciones = crear_problema(tablero_inicial, n, distintas).getSolutionIter()
+        primera = next(soluciones, None)
+        return (0 if primera is None else 1 + sum(1 for _ in soluciones)), primera
+
+    # Con el motor de máscaras se cuentan los estados fila a fila sin generar
+    # soluciones (binairo.contar) y solo se busca la primera para la salida
+    if not distintas:
+        num = binairo.contar(tablero_inicial, n)
+        return num, (primera_solucion(tablero_inicial, n, motor) if num else None)
+
+    # La variante de líneas distintas se cuenta enumerando patrones de fila,
+    # sin convertirlos a diccionario
+    soluciones = _soluciones_mascaras(tablero_inicial, n, distintas,
+                                      {} if estadisticas is None else estadisticas)
+    filas = next(soluciones, None)
+    if filas is None:
+        return 0, None
+    return 1 + sum(1 for _ in soluciones), binairo.a_diccionario(filas, n)
+
+def _resolver_subproblema(tarea):
+    """
+    Resuelve un subtablero de resolver_en_paralelo (se ejecuta en el trabajador).
+
+    Devuelve (índice, número de soluciones, primera solución o None, segundos,
+    pid del trabajador). Con solo_primera se para en la primera solución.
+    """
+    indice, subtablero, n, motor, distintas, solo_primera = tarea
+    t0 = time.perf_counter()
+    if solo_primera:
+        primera = primera_solucion(subtablero, n, motor, distintas)
+        num = 0 if primera is None else 1
+    else:
+        num, primera = contar_soluciones(subtablero, n, motor, distintas)
+    return indice, num, primera, time.perf_counter() - t0, os.getpid()
+
+def crear_pool(trabajadores):
+    """
+    Pool de procesos para resolver_en_paralelo, o None si no hay 'fork' (o
+    con un solo trabajador): entonces los subproblemas se resuelven en el
+    propio proceso.
+    """
+    if trabajadores > 1 and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork").Pool(trabajadores)
+    return None
+
+def resolver_en_paralelo(tablero_inicial, n, trabajadores, motor="mascaras", distintas=False,
+                         solo_primera=False, division=None):
+    """
+    Reparte la búsqueda entre varios procesos.
+
+    El tablero se parte con binairo.dividir() fijando sus primeras 'division'
+    casillas libres; por defecto, las justas para tener unos
+    SUBPROBLEMAS_POR_TRABAJADOR subproblemas por trabajador y repartir bien
+    la carga aunque unos sean mucho más costosos que otros. Cada subproblema
+    se cuenta (o se busca su primera solución) por separado y los resultados
+    se juntan.
+
+    Returns:
+        tuple: (número de soluciones, primera solución o None, estadísticas),
+               con estadísticas {pid: [subproblemas, soluciones, segundos]}.
+               Con solo_primera el número es 0 o 1 y se devuelve la primera
+               solución que termine de encontrarse.
     """
-    Crea y resuelve el problema Binairo como un CSP.
+    if division is None:
+        division = (trabajadores * SUBPROBLEMAS_POR_TRABAJADOR - 1).bit_length()
+    subtableros = binairo.dividir(tablero_inicial, n, division, distintas)
+    tareas = [(i, subtablero, n, motor, distintas, solo_primera)
+              for i, subtablero in enumerate(subtableros)]
+
+    total = 0
+    primeras = {}
+    estadisticas = {}
+    pool = crear_pool(trabajadores)
+    if pool is None:
+        # En el propio proceso: al salir del bucle no se resuelve ninguno más
+        resultados = map(_resolver_subproblema, tareas)
+    else:
+        resultados = pool.imap_unordered(_resolver_subproblema, tareas)
+    try:
+        for indice, num, primera, segundos, pid in resultados:
+            datos = estadisticas.setdefault(pid, [0, 0, 0.0])
+            datos[0] += 1
+            datos[1] += num
+            datos[2] += segundos
+            total += num
+            if primera is not None:
+                primeras[indice] = primera
+                if solo_primera:
+                    # Los demás subproblemas ya no hacen falta: no se esperan
+                    break
+    finally:
+        # Con todos los resultados recibidos no queda nada en curso; tras la
+        # primera solución o un error, terminate() para los trabajadores
+        # sin esperar a los subproblemas que estén resolviendo
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    # Sin parar en la primera, se devuelve la del subproblema de menor índice
+    # para que el resultado no dependa del orden en que terminan los trabajadores
+    primera = primeras[min(primeras)] if primeras else None
+    return total, primera, estadisticas
+
+def crear_problema(tablero_inicial, n, distintas=False):
+    """
+    Crea el problema Binairo como un CSP de python-constraint.
 
     Restricciones:
       1) Respetar casillas ya preasignadas en la instancia inicial.
       2) En cada fila y cada columna, debe haber exactamente n/2 discos negros (y n/2 blancos).
       3) No puede haber tres discos consecutivos del mismo color ni en filas ni en columnas.
+      4) Solo con distintas: no puede haber dos filas ni dos columnas iguales.
 
-    Devuelve una lista con todas las soluciones encontradas.
+    Devuelve el objeto Problem listo para resolver.
     """
     
     # Creamos el problema de satisfacción de restricciones
@@ -152,8 +332,33 @@ def resolver_binairo(tablero_inicial, n):
         for i in range(n - 2):
             problem.addConstraint(no_tres_iguales, [(i, j), (i+1, j), (i+2, j)])
 
-    # Devolvemos todas las soluciones encontradas
-    return problem.getSolutions()
+    # 4) Variante: filas distintas dos a dos y columnas distintas dos a dos.
+    # Cada restricción recibe las 2n casillas de las dos líneas que compara.
+    if distintas:
+        def lineas_distintas(*valores):
+            return valores[:n] != valores[n:]
+
+        for a in range(n):
+            for b in range(a + 1, n):
+                problem.addConstraint(lineas_distintas,
+                                      [(a, j) for j in range(n)] + [(b, j) for j in range(n)])
+                problem.addConstraint(lineas_distintas,
+                                      [(i, a) for i in range(n)] + [(i, b) for i in range(n)])
+
+    return problem
+
+def tablero_solucion(solucion, n):
+    """Convierte una solución numérica (0/1) en un tablero de caracteres (O/X)."""
+    tablero_resuelto = []
+    for i in range(n):
+        fila = []
+        for j in range(n):
+            if solucion[(i, j)] == 0:
+                fila.append('O')
+            else:
+                fila.append('X')
+        tablero_resuelto.append(fila)
+    return tablero_resuelto
 
 def guardar_salida(ruta_salida, tablero_inicial, solucion, n):
     """
@@ -169,20 +374,9 @@ def guardar_salida(ruta_salida, tablero_inicial, solucion, n):
     
     contenido_solucion = ""
 
-    # Convertir solución numérica (0/1) a caracteres (O/X)
+    # Convertimos a texto la solución
     if solucion:
-        tablero_resuelto = []
-        for i in range(n):
-            fila = []
-            for j in range(n):
-                if solucion[(i, j)] == 0:
-                    fila.append('O')
-                else:
-                    fila.append('X')
-            tablero_resuelto.append(fila)
-
-        # Convertimos a texto la solución
-        contenido_solucion = imprimir_tablero_str(tablero_resuelto)
+        contenido_solucion = imprimir_tablero_str(tablero_solucion(solucion, n))
     
     # Escribimos instancia y solución en el fichero de salida
     with open(ruta_salida, 'w', encoding="utf-8") as f:
@@ -190,6 +384,24 @@ def guardar_salida(ruta_salida, tablero_inicial, solucion, n):
         if contenido_solucion:
             f.write(contenido_solucion + "\n")
 
+def volcar_soluciones(ruta_salida, tablero_inicial, soluciones, n):
+    """
+    Escribe el tablero inicial y después cada solución según se va generando,
+    sin guardarlas en memoria. Devuelve el número de soluciones escritas.
+    """
+    num_soluciones = 0
+    with open(ruta_salida, 'w', encoding="utf-8") as f:
+        f.write(imprimir_tablero_str(tablero_inicial) + "\n")
+        for solucion in soluciones:
+            f.write(imprimir_tablero_str(tablero_solucion(solucion, n)) + "\n")
+            num_soluciones += 1
+    return num_soluciones
+
+def imprimir_esfuerzo(estadisticas):
+    """Muestra los nodos de búsqueda si el motor los ha registrado."""
+    if "nodos" in estadisticas:
+        print(f"Nodos de búsqueda: {estadisticas['nodos']}")
+
 def main():
     """
     Función principal del programa.
@@ -198,13 +410,40 @@ def main():
 
     # 1) Validar argumentos
     # Nota: Para ejecutar el scirpt con ./parte-1.py en Linux, se debe dar permisos de ejecución con chmod +x parte-1.py
-    if len(sys.argv) != 3:
-        print("Uso: ./parte-1.py <fichero-entrada.in> <fichero-salida.out>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        usage="./parte-1.py <fichero-entrada.in> <fichero-salida.out> [--motor MOTOR] [--modo MODO] "
+              "[--distintas] [--sin-deduccion] [--paralelo N [--division K]]")
+    parser.add_argument("entrada", help="fichero con el tablero inicial")
+    parser.add_argument("salida", help="fichero donde escribir el tablero y su solución")
+    parser.add_argument("--motor", choices=MOTORES, default="mascaras",
+                        help="mascaras: propagación y búsqueda con máscaras de bits (por defecto); "
+                             "constraint: CSP genérico de python-constraint")
+    parser.add_argument("--modo", choices=MODOS, default="todas",
+                        help="todas: guarda todas las soluciones (por defecto); primera: para en "
+                             "la primera; contar: cuenta sin guardarlas; flujo: escribe todas "
+                             "en el fichero de salida según se encuentran")
+    parser.add_argument("--distintas", action="store_true",
+                        help="variante en la que no puede haber dos filas ni dos columnas iguales")
+    parser.add_argument("--sin-deduccion", action="store_true",
+                        help="con --motor constraint, no aplica las reglas de pares, huecos y "
+                             "línea completa antes de buscar (el motor de máscaras no las usa)")
+    parser.add_argument("--paralelo", type=int, metavar="N",
+                        help="reparte la búsqueda entre N procesos (solo modos contar y primera)")
+    parser.add_argument("--division", type=int, metavar="K",
+                        help="con --paralelo, casillas libres que se fijan para formar los "
+                             "subproblemas (por defecto según N)")
+    args = parser.parse_args()
+    if args.paralelo is not None:
+        if args.paralelo < 1:
+            parser.error("--paralelo necesita al menos un proceso")
+        if args.modo not in ("contar", "primera"):
+            parser.error("--paralelo solo admite los modos contar y primera")
+    if args.division is not None and (args.paralelo is None or args.division < 0):
+        parser.error("--division necesita --paralelo y un valor no negativo")
         
     # 2) Lectura de argumentos de línea de comandos  
-    entrada = sys.argv[1]
-    salida = sys.argv[2]
+    entrada = args.entrada
+    salida = args.salida
     
     # 3) Leer entrada
     tablero_inicial, n = leer_fichero(entrada)
@@ -213,19 +452,70 @@ def main():
     str_inicial = imprimir_tablero_str(tablero_inicial)
     print(str_inicial)
     
-    # 5) Resolver el problema
-    soluciones = resolver_binairo(tablero_inicial, n)
-    num_soluciones = len(soluciones)
-    
-    print(f"{num_soluciones} soluciones encontradas")
-    
-    # 6) Escribir fichero de salida
-    # Se toma la primera solución de la lista si existe.
-    if num_soluciones > 0:
-        primera_solucion = soluciones[0]
+    # 5) Deducción previa: las casillas que fijan las reglas básicas se pasan
+    # ya asignadas a la búsqueda (el fichero de salida muestra el tablero original).
+    # Solo con el CSP: la propagación sobre patrones del motor de máscaras ya
+    # fija esas casillas antes de ramificar, así que no le ahorra ningún nodo
+    tablero = tablero_inicial
+    if args.motor == "constraint" and not args.sin_deduccion:
+        tablero, fijadas = binairo.deducir(tablero_inicial, n, args.distintas)
+        print(f"Deducción previa: {fijadas} casillas fijadas")
+        if tablero is None:
+            print("La deducción lleva a una contradicción")
+            print("0 soluciones encontradas")
+            guardar_salida(salida, tablero_inicial, None, n)
+            return
+
+    # 6) Resolver el problema y escribir el fichero de salida según el modo
+    if args.paralelo is not None:
+        # Subproblemas repartidos entre procesos; se informa del trabajo de cada uno
+        num_soluciones, solucion, estadisticas = resolver_en_paralelo(
+            tablero, n, args.paralelo, args.motor, args.distintas,
+            solo_primera=args.modo == "primera", division=args.division)
+        for pid, (subproblemas, encontradas, segundos) in sorted(estadisticas.items()):
+            print(f"Trabajador {pid}: {subproblemas} subproblemas, "
+                  f"{encontradas} soluciones, {segundos:.3f} s")
+        if args.modo == "primera" and solucion is not None:
+            print("Primera solución encontrada (no se buscan las demás)")
+        else:
+            print(f"{num_soluciones} soluciones encontradas")
+        guardar_salida(salida, tablero_inicial, solucion, n)
+        return
+
+    # Esfuerzo de la búsqueda del motor de máscaras (nodos), para elegir el
+    # modo más barato que da la respuesta que se necesita
+    estadisticas = {}
+    if args.modo == "flujo":
+        # Todas las soluciones van directamente al fichero
+        soluciones = iterar_soluciones(tablero, n, args.motor, args.distintas, estadisticas)
+        num_soluciones = volcar_soluciones(salida, tablero_inicial, soluciones, n)
+        print(f"{num_soluciones} soluciones encontradas")
+        imprimir_esfuerzo(estadisticas)
+        return
+
+    if args.modo == "primera":
+        solucion = primera_solucion(tablero, n, args.motor, args.distintas, estadisticas)
+        if solucion is None:
+            print("0 soluciones encontradas")
+        else:
+            print("Primera solución encontrada (no se buscan las demás)")
+    elif args.modo == "contar":
+        num_soluciones, solucion = contar_soluciones(tablero, n, args.motor, args.distintas,
+                                                     estadisticas)
+        print(f"{num_soluciones} soluciones encontradas")
     else:
-        primera_solucion = None
-    guardar_salida(salida, tablero_inicial, primera_solucion, n)
+        soluciones = resolver_binairo(tablero, n, args.motor, args.distintas, estadisticas)
+        num_soluciones = len(soluciones)
+        print(f"{num_soluciones} soluciones encontradas")
+        # Se toma la primera solución de la lista si existe.
+        if num_soluciones > 0:
+            solucion = soluciones[0]
+        else:
+            solucion = None
+    imprimir_esfuerzo(estadisticas)
+
+    # 7) Escribir fichero de salida
+    guardar_salida(salida, tablero_inicial, solucion, n)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas del motor de máscaras (binairo.py) frente al CSP de python-constraint.
+
+Se ejecutan con pytest desde la carpeta parte-1:
+    python -m pytest -q pruebas
+"""
+
+import sys
+import random
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+# Ajuste del path para poder importar los modulos de la carpeta superior
+SCRIPT_DIR = Path(__file__).resolve().parent
+RAIZ_PARTE1 = SCRIPT_DIR.parent
+if str(RAIZ_PARTE1) not in sys.path:
+    sys.path.insert(0, str(RAIZ_PARTE1))
+
+import binairo
+
+# parte-1.py no es importable por nombre (lleva guion): se carga desde su ruta
+_spec = importlib.util.spec_from_file_location("parte1", RAIZ_PARTE1 / "parte-1.py")
+parte1 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(parte1)
+
+ENTRADAS_DIR = SCRIPT_DIR / "entradas"
+
+
+def _solucion_aleatoria(rng, n):
+    """
+    Una solución cualquiera de un tablero n x n: la primera que encuentra el
+    motor de máscaras tras fijar unas pocas casillas al azar (sin enumerar
+    las del tablero vacío, que en 8x8 son millones).
+    """
+    while True:
+        semilla = [['.'] * n for _ in range(n)]
+        for _ in range(n):
+            semilla[rng.randrange(n)][rng.randrange(n)] = rng.choice('OX')
+        filas = next(binairo.ResolutorBinairo(semilla, n).soluciones(), None)
+        if filas is not None:
+            return binairo.a_diccionario(filas, n)
+
+
+def _tablero_aleatorio(rng, n, proporcion):
+    """
+    Tablero n x n con una fracción 'proporcion' de casillas dadas. Las
+    casillas salen de una solución aleatoria; uno de cada cuatro tableros
+    lleva además una casilla cambiada al azar, que puede dejarlo sin
+    solución.
+    """
+    tablero = [['.'] * n for _ in range(n)]
+    for (i, j), valor in _solucion_aleatoria(rng, n).items():
+        if rng.random() < proporcion:
+            tablero[i][j] = 'X' if valor else 'O'
+    if rng.random() < 0.25:
+        i, j = rng.randrange(n), rng.randrange(n)
+        tablero[i][j] = rng.choice('OX')
+    return tablero
+
+
+def _tableros_pequenos():
+    """Tableros de pruebas/entradas de hasta 6x6 (sin el vacío) y aleatorios."""
+    tableros = []
+    for ruta in sorted(ENTRADAS_DIR.glob("caso*.in")):
+        tablero, n = parte1.leer_fichero(str(ruta))
+        if n <= 6 and "vacio" not in ruta.name:
+            tableros.append((ruta.stem, tablero, n))
+    rng = random.Random(21)
+    tableros.append(("vacio_4x4", [['.'] * 4 for _ in range(4)], 4))
+    # Tres X en una fila de 4: sin solución
+    tableros.append(("sin_solucion", [list("XX.X"), list("...."), list("...."), list("....")], 4))
+    for k in range(12):
+        n = rng.choice((4, 6))
+        tableros.append((f"aleatorio_{k}", _tablero_aleatorio(rng, n, rng.uniform(0.2, 0.5)), n))
+    return tableros
+
+
+def _conjunto(soluciones):
+    """Conjunto de soluciones {(i, j): 0/1} comparable sin importar el orden."""
+    return {frozenset(solucion.items()) for solucion in soluciones}
+
+
+@pytest.mark.parametrize("distintas", (False, True))
+@pytest.mark.parametrize("nombre,tablero,n", _tableros_pequenos())
+def test_mismas_soluciones_que_constraint(nombre, tablero, n, distintas):
+    esperadas = _conjunto(parte1.iterar_soluciones(tablero, n, "constraint", distintas))
+    obtenidas = _conjunto(parte1.iterar_soluciones(tablero, n, "mascaras", distintas))
+    assert obtenidas == esperadas
+
+
+def test_contar_igual_que_enumerar():
+    rng = random.Random(25)
+    for _ in range(120):
+        n = rng.choice((4, 6, 8))
+        proporcion = rng.uniform(0.3, 0.6) if n == 8 else rng.uniform(0.1, 0.5)
+        tablero = _tablero_aleatorio(rng, n, proporcion)
+        enumeradas = sum(1 for _ in binairo.ResolutorBinairo(tablero, n).soluciones())
+        assert binairo.contar(tablero, n) == enumeradas
+
+
+def test_contar_tablero_vacio():
+    # 8x8 vacío: 12413918 soluciones, imposibles de enumerar en una prueba
+    for n, esperadas in ((4, 90), (6, 11222), (8, 12413918)):
+        assert binairo.contar([['.'] * n for _ in range(n)], n) == esperadas
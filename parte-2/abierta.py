@@ -5,36 +5,57 @@ Esta clase gestiona el conjunto de nodos pendientes de explorar,
 ordenados por su valor f(n) = g(n) + h(n)
 """
 
+import heapq
+
 # -----------------------------------------------------------------------------
 # Clase ListaAbierta: Gestión de nodos a explorar en A*
 # -----------------------------------------------------------------------------
 
 class ListaAbierta:
-    """Clase que implementa la lista abierta (frontera) del algoritmo A*."""
-    
+    """
+    Clase que implementa la lista abierta (frontera) del algoritmo A*.
+
+    Internamente es un montículo binario (heapq) con borrado perezoso: cuando
+    se mejora el coste de un nodo no se modifica su entrada antigua, sino que
+    se inserta una nueva. Las entradas obsoletas se descartan al extraerlas,
+    ya que su nodo estará en la ListaCerrada.
+
+    Cada entrada es (f_score, orden, nodo). El contador de orden rompe los
+    empates de f_score por orden de inserción (FIFO), de modo que el camino
+    devuelto es siempre el mismo para la misma entrada.
+    """
+
     def __init__(self):
         """Inicializa una lista abierta vacía."""
         self.lista = []
-    
+        # Contador de inserciones para desempatar entradas con igual f_score
+        self.contador = 0
+
     def push(self, nodo, f_score):
-        """Inserta un nodo en la lista abierta con su valor f(n)."""
-        self.lista.append((f_score, nodo))
-        
+        """Inserta un nodo en la lista abierta con su valor f(n). Coste O(log n)."""
+        heapq.heappush(self.lista, (f_score, self.contador, nodo))
+        self.contador += 1
+
     def pop(self):
-        """Extrae y retorna el nodo con menor valor f(n) de la lista abierta."""
+        """Extrae y retorna (f, nodo) con menor valor f(n). Coste O(log n)."""
         if not self.lista:
             return None
-        
-        # Búsqueda lineal del elemento con menor f_score
-        # Encontramos el índice del elemento con menor f_score
-        idx_min = 0
-        for i in range(1, len(self.lista)):
-            if self.lista[i][0] < self.lista[idx_min][0]:
-                idx_min = i
-        
-        # Extraemos el elemento
-        return self.lista.pop(idx_min)
-        
+
+        # La raíz del montículo es siempre el elemento de menor (f_score, orden)
+        f_score, _, nodo = heapq.heappop(self.lista)
+        return f_score, nodo
+
+    def peek(self):
+        """Retorna (f, nodo) con menor valor f(n) sin extraerlo."""
+        if not self.lista:
+            return None
+        f_score, _, nodo = self.lista[0]
+        return f_score, nodo
+
     def is_empty(self):
         """Verifica si la lista abierta está vacía."""
-        return len(self.lista) == 0
\ No newline at end of file
+        return len(self.lista) == 0
+
+    def __len__(self):
+        """Número de entradas en la frontera (incluidas las obsoletas)."""
+        return len(self.lista)
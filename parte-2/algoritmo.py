@@ -8,8 +8,18 @@ más corto en grafos de carreteras con coordenadas geográficas.
 """
 
 import math
+import heapq
+from array import array
 from abierta import ListaAbierta
 from cerrada import ListaCerrada
+from espacio_busqueda import EspacioBusqueda
+import motor_numba
+
+# Heurística que el motor "rapido" calcula en línea (ver AStar._modo_heuristica)
+H_HAVERSINE = 0
+H_CUERDA = 1
+H_CERO = 2
+H_METODO = 3     # subclase con su propia _heuristica: se llama al método
 
 # -----------------------------------------------------------------------------
 # Clase AStar: Algoritmo de búsqueda heurística A*
@@ -26,12 +36,97 @@ class AStar:
     Atributos:
         grafo: Instancia de la clase Grafo con el mapa a explorar
         nodos_expandidos: Contador de nodos expandidos durante la búsqueda
+        espacio: EspacioBusqueda con los arrays de trabajo de resolver()
+        instrumentacion: Instrumentacion que registra contadores y tiempos de
+                         resolver(), o None (por defecto, sin coste alguno)
     """
     
-    def __init__(self, grafo):
-        """Inicializa el algoritmo A* con un grafo."""
+    # Radio de la Tierra en metros
+    RADIO_TIERRA = 6371000
+
+    # Heurísticas geográficas disponibles
+    HEURISTICAS = ("haversine", "cuerda")
+
+    # En resolver_multiple, con más objetivos que este número se usa h = 0:
+    # evaluar el mínimo sobre todos ellos cuesta más de lo que ahorra
+    MAX_OBJETIVOS_HEURISTICA = 8
+
+    # En los lotes (consultas.resolver_lote) las consultas con el mismo inicio
+    # se resuelven juntas con resolver_multiple
+    AGRUPAR_POR_INICIO = True
+
+    # Motores de resolver(): "clasico" usa ListaAbierta y los métodos del grafo;
+    # "rapido" es el mismo algoritmo con variables locales y la heurística en
+    # línea; "numba" lo compila con Numba si está instalado (si no, "rapido")
+    MOTORES = ("clasico", "rapido", "numba")
+
+    def __init__(self, grafo, heuristica="haversine", espacio=None, motor="clasico",
+                 instrumentacion=None):
+        """
+        Inicializa el algoritmo A* con un grafo.
+
+        Args:
+            grafo: Instancia de Grafo con el mapa a explorar
+            heuristica: "haversine" (distancia sobre la esfera, por defecto) o
+                        "cuerda" (distancia en línea recta a través de la esfera;
+                        es siempre menor que la de Haversine, luego también
+                        admisible, y no necesita funciones trigonométricas)
+            espacio: EspacioBusqueda a reutilizar (p.ej. compartido por varios
+                     resolutores que se usan por turnos); por defecto se crea
+                     uno propio en la primera consulta
+            motor: Implementación del bucle de resolver() (ver MOTORES); todas
+                   devuelven exactamente el mismo coste, camino y expansiones
+            instrumentacion: Instrumentacion en la que acumular las métricas de
+                             cada consulta; con ella resolver() usa siempre el
+                             motor clásico, con sus piezas medidas
+        """
+        if heuristica not in self.HEURISTICAS:
+            raise ValueError(f"Heurística desconocida: {heuristica}")
+        if motor not in self.MOTORES:
+            raise ValueError(f"Motor desconocido: {motor}")
+
         self.grafo = grafo
         self.nodos_expandidos = 0  # Contador de estadísticas
+        self.expansiones_objetivos = {}  # Expansiones al asentar cada objetivo (resolver_multiple)
+        self.heuristica = heuristica
+        self.espacio = espacio     # Arrays de trabajo reutilizados entre consultas
+        self.motor = motor
+        self.instrumentacion = instrumentacion
+        self._csr_numba = None     # Arrays CSR de un Grafo de diccionarios (motor numba)
+
+        # Términos por nodo de la heurística geográfica (Grafo.terminos_heuristica),
+        # pedidos al grafo la primera vez que se evalúa: Dijkstra y ALT no los usan
+        self._terminos = None
+
+        # Objetivo de la consulta y sus términos, cacheados una vez por consulta
+        self._objetivo = None
+        self._terminos_objetivo = None
+
+    def _preparar_espacio(self):
+        """Espacio de trabajo de resolver(), creado la primera vez que se usa."""
+        if self.espacio is None or self.espacio.num_nodos != self.grafo.num_nodos:
+            self.espacio = EspacioBusqueda(self.grafo.num_nodos)
+        return self.espacio
+
+    def _preparar_objetivo(self, nodo_objetivo):
+        """
+        Fija el objetivo de la búsqueda. Sus términos de la heurística
+        geográfica se calculan en _preparar_terminos, solo si se usan.
+        """
+        self._objetivo = nodo_objetivo
+        self._terminos_objetivo = None
+
+    def _preparar_terminos(self, nodo_objetivo):
+        """
+        Obtiene del grafo (la primera vez) los términos por nodo de la
+        heurística geográfica y fija los del objetivo, que no cambian en toda
+        la búsqueda. Devuelve los del objetivo.
+        """
+        if self._terminos is None:
+            self._terminos = self.grafo.terminos_heuristica(self.heuristica)
+        a, b, c = self._terminos
+        self._terminos_objetivo = (a[nodo_objetivo], b[nodo_objetivo], c[nodo_objetivo])
+        return self._terminos_objetivo
 
     def _heuristica(self, nodo_actual, nodo_objetivo):
         """
@@ -44,34 +139,41 @@ class AStar:
             nodo_actual: ID del nodo desde el que se calcula la distancia
             nodo_objetivo: ID del nodo objetivo
         
-        Las coordenadas en el grafo vienen multiplicadas por 10^6.
+        Las coordenadas en el grafo vienen multiplicadas por 10^6; su paso a
+        radianes y el coseno de la latitud se precalculan en el grafo
+        (Grafo.terminos_heuristica) y los del objetivo una vez por consulta.
         Radio de la Tierra: aproximadamente 6.371.000 metros.
         """
-        
-        # Obtener coordenadas de ambos nodos
-        lon1, lat1 = self.grafo.get_coordenadas(nodo_actual)
-        lon2, lat2 = self.grafo.get_coordenadas(nodo_objetivo)
+        if nodo_objetivo != self._objetivo:
+            self._preparar_objetivo(nodo_objetivo)
+        terminos_objetivo = self._terminos_objetivo
+        if terminos_objetivo is None:
+            terminos_objetivo = self._preparar_terminos(nodo_objetivo)
 
-        # Convertir coordenadas a grados reales (dividir por 10^6) y luego a radianes
-        rlat1 = math.radians(lat1 / 1000000.0)
-        rlon1 = math.radians(lon1 / 1000000.0)
-        rlat2 = math.radians(lat2 / 1000000.0)
-        rlon2 = math.radians(lon2 / 1000000.0)
+        if self.heuristica == "cuerda":
+            # Longitud de la cuerda entre ambos puntos: 2R·sin(c/2) <= R·c
+            xs, ys, zs = self._terminos
+            x2, y2, z2 = terminos_objetivo
+            dx = xs[nodo_actual] - x2
+            dy = ys[nodo_actual] - y2
+            dz = zs[nodo_actual] - z2
+            return self.RADIO_TIERRA * math.sqrt(dx * dx + dy * dy + dz * dz)
 
         # Diferencias de latitud y longitud
-        dlat = rlat2 - rlat1
-        dlon = rlon2 - rlon1
+        rlat, rlon, cos_lat = self._terminos
+        rlat2, rlon2, cos_lat2 = terminos_objetivo
+        dlat = rlat2 - rlat[nodo_actual]
+        dlon = rlon2 - rlon[nodo_actual]
 
         # Aplicación de la fórmula de Haversine
         # a = sin²(Δlat/2) + cos(lat1) * cos(lat2) * sin²(Δlon/2)
-        a = math.sin(dlat / 2)**2 + math.cos(rlat1) * math.cos(rlat2) * math.sin(dlon / 2)**2
+        a = math.sin(dlat / 2)**2 + cos_lat[nodo_actual] * cos_lat2 * math.sin(dlon / 2)**2
         
         # c = 2 * atan2(√a, √(1-a))
         c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
         
         # Distancia = Radio * c
-        R = 6371000  # Radio de la Tierra en metros
-        return R * c
+        return self.RADIO_TIERRA * c
 
     def resolver(self, inicio, fin):
         """
@@ -81,24 +183,52 @@ class AStar:
             inicio: ID del nodo de inicio
             fin: ID del nodo objetivo
         """
-        # Inicialización de estructuras de datos
+        if self.instrumentacion is None:
+            if self.motor == "numba" and motor_numba.DISPONIBLE \
+                    and self._modo_heuristica() != H_METODO:
+                return self._resolver_numba(inicio, fin)
+            if self.motor != "clasico":
+                return self._resolver_rapido(inicio, fin)
+
+        # Piezas del bucle. Con instrumentación se sustituyen por envoltorios
+        # que las miden (ver instrumentacion.MedicionConsulta); sin ella el
+        # bucle solo paga la comprobación de al_expandir en cada expansión
         abierta = ListaAbierta()    # Nodos por explorar (frontera)
-        cerrada = ListaCerrada()    # Nodos ya expandidos
-        
-        # g_score: diccionario que almacena el coste real desde inicio hasta cada nodo
-        # Usamos dict para flexibilidad (IDs no siempre son densos)
-        g_score = {inicio: 0}
-        
-        # came_from: diccionario para reconstruir el camino {nodo_hijo: nodo_padre}
-        came_from = {}
+        heuristica = self._heuristica
+        vecinos = self.grafo.get_vecinos
+        medicion = al_expandir = None
+        if self.instrumentacion is not None:
+            medicion = self.instrumentacion.nueva_consulta()
+            abierta = medicion.abierta(abierta)
+            heuristica = medicion.heuristica(heuristica)
+            vecinos = medicion.vecinos(vecinos)
+            al_expandir = medicion.al_expandir
+
+        # g(n), predecesores y nodos cerrados en arrays densos reutilizados entre
+        # consultas (ver EspacioBusqueda): marca[v] == gen si v se ha visitado en
+        # esta búsqueda y marca[v] == cerrado si ya se ha expandido
+        espacio = self._preparar_espacio()
+        gen = espacio.nueva_busqueda()
+        cerrado = gen + 1
+        g_score = espacio.g
+        came_from = espacio.came_from
+        marca = espacio.marca
+        g_score[inicio] = 0
+        marca[inicio] = gen
+
+        # Términos del objetivo fijos durante toda la búsqueda
+        self._preparar_objetivo(fin)
 
         # Insertar nodo inicial en la lista abierta con f(n) = g(n) + h(n)
-        h_inicial = self._heuristica(inicio, fin)
+        h_inicial = heuristica(inicio, fin)
         abierta.push(inicio, h_inicial)  # f(inicio) = 0 + h(inicio)
 
         # Reiniciar contador de expansiones
         self.nodos_expandidos = 0
 
+        # Si no se alcanza el objetivo, no hay camino entre inicio y fin
+        resultado = (None, [])
+
         # Bucle principal de A*: explorar hasta encontrar solución o agotar opciones
         while not abierta.is_empty():
             # Extraer el nodo con menor f(n) de la lista abierta
@@ -106,32 +236,40 @@ class AStar:
 
             # Condición de éxito: hemos alcanzado el nodo objetivo
             if u == fin:
-                return g_score[u], self._reconstruir_camino(came_from, inicio, fin)
+                resultado = (g_score[u], self._reconstruir_camino(came_from, inicio, fin))
+                break
 
-            # Ignorar nodos ya expandidos
-            if cerrada.contains(u):
+            # Ignorar entradas obsoletas: la lista abierta usa borrado perezoso,
+            # así que un nodo puede aparecer varias veces; solo vale la primera
+            if marca[u] == cerrado:
                 continue
             
             # Marcar nodo como expandido
-            cerrada.add(u)
+            marca[u] = cerrado
             self.nodos_expandidos += 1
+            g_u = g_score[u]
+
+            if al_expandir is not None:
+                al_expandir(u, g_u, f_actual, len(abierta))
 
             # Expansión: explorar todos los vecinos del nodo actual
-            for v, peso in self.grafo.get_vecinos(u):
+            for v, peso in vecinos(u):
                 # Saltar vecinos ya expandidos
-                if cerrada.contains(v):
+                marca_v = marca[v]
+                if marca_v == cerrado:
                     continue
 
                 # Calcular coste tentativo de llegar a v a través de u
-                tentative_g = g_score[u] + peso
+                tentative_g = g_u + peso
                 
                 # Si encontramos un camino mejor hacia v (o es la primera vez que lo visitamos)
-                if v not in g_score or tentative_g < g_score[v]:
+                if marca_v != gen or tentative_g < g_score[v]:
                     # Actualizar mejor camino conocido hacia v
                     g_score[v] = tentative_g
+                    marca[v] = gen
                     
                     # Calcular f(v) = g(v) + h(v)
-                    h_v = self._heuristica(v, fin)
+                    h_v = heuristica(v, fin)
                     f_v = tentative_g + h_v
                     
                     # Insertar v en la lista abierta con su nuevo f_score
@@ -140,9 +278,265 @@ class AStar:
                     # Registrar el predecesor para reconstruir el camino
                     came_from[v] = u
 
-        # Si llegamos aquí, no hay camino entre inicio y fin
+        if medicion is not None:
+            medicion.terminar(self.nodos_expandidos, encontrado=bool(resultado[1]))
+        return resultado
+
+    def _modo_heuristica(self):
+        """Heurística que puede calcularse en línea (H_*) o H_METODO si no."""
+        metodo = type(self)._heuristica
+        if metodo is AStar._heuristica:
+            return H_CUERDA if self.heuristica == "cuerda" else H_HAVERSINE
+        if metodo is Dijkstra._heuristica:
+            return H_CERO
+        return H_METODO
+
+    def _resolver_rapido(self, inicio, fin):
+        """
+        Motor "rapido": el bucle de resolver() sin llamadas a métodos.
+
+        Todo lo que se consulta en el bucle son variables locales: los arrays
+        del grafo (CSR) o su lista de diccionarios, el montículo de heapq con
+        las mismas entradas (f, orden, nodo) que ListaAbierta y la heurística
+        escrita en línea con las mismas operaciones que _heuristica, de modo
+        que el orden de expansión y el resultado son idénticos.
+        """
+        grafo = self.grafo
+        espacio = self._preparar_espacio()
+        gen = espacio.nueva_busqueda()
+        cerrado = gen + 1
+        g_score = espacio.g
+        came_from = espacio.came_from
+        marca = espacio.marca
+        g_score[inicio] = 0
+        marca[inicio] = gen
+
+        # Heurística y términos (solo los de la heurística en uso) en variables locales
+        modo = self._modo_heuristica()
+        heuristica = self._heuristica
+        self._preparar_objetivo(fin)
+        if modo == H_HAVERSINE:
+            rlat2, rlon2, cos_lat2 = self._preparar_terminos(fin)
+            rlat, rlon, cos_lat = self._terminos
+        elif modo == H_CUERDA:
+            x2, y2, z2 = self._preparar_terminos(fin)
+            xs, ys, zs = self._terminos
+        radio = self.RADIO_TIERRA
+        sin, sqrt, atan2 = math.sin, math.sqrt, math.atan2
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        # Representación del grafo: CSR (GrafoCSR) o lista de diccionarios (Grafo)
+        csr = grafo.adyacencia is None
+        if csr:
+            offsets, destinos, pesos = grafo.offsets, grafo.destinos, grafo.pesos
+        else:
+            adyacencia = grafo.adyacencia
+
+        frontera = [(heuristica(inicio, fin), 0, inicio)]
+        contador = 1
+        expandidos = 0
+
+        while frontera:
+            _, _, u = heappop(frontera)
+
+            if u == fin:
+                self.nodos_expandidos = expandidos
+                return g_score[u], self._reconstruir_camino(came_from, inicio, fin)
+
+            if marca[u] == cerrado:
+                continue
+            marca[u] = cerrado
+            expandidos += 1
+            g_u = g_score[u]
+
+            if csr:
+                ini = offsets[u]
+                tramo = offsets[u + 1]
+                vecinos = zip(destinos[ini:tramo], pesos[ini:tramo])
+            else:
+                vecinos = adyacencia[u].items()
+
+            for v, peso in vecinos:
+                marca_v = marca[v]
+                if marca_v == cerrado:
+                    continue
+                tentative_g = g_u + peso
+                if marca_v != gen or tentative_g < g_score[v]:
+                    g_score[v] = tentative_g
+                    marca[v] = gen
+
+                    # Mismas operaciones y en el mismo orden que _heuristica
+                    if modo == H_HAVERSINE:
+                        dlat = rlat2 - rlat[v]
+                        dlon = rlon2 - rlon[v]
+                        a = sin(dlat / 2)**2 + cos_lat[v] * cos_lat2 * sin(dlon / 2)**2
+                        c = 2 * atan2(sqrt(a), sqrt(1 - a))
+                        h_v = radio * c
+                    elif modo == H_CUERDA:
+                        dx = xs[v] - x2
+                        dy = ys[v] - y2
+                        dz = zs[v] - z2
+                        h_v = radio * sqrt(dx * dx + dy * dy + dz * dz)
+                    elif modo == H_CERO:
+                        h_v = 0
+                    else:
+                        h_v = heuristica(v, fin)
+
+                    heappush(frontera, (tentative_g + h_v, contador, v))
+                    contador += 1
+                    came_from[v] = u
+
+        self.nodos_expandidos = expandidos
         return None, []
 
+    def _resolver_numba(self, inicio, fin):
+        """Motor "numba": mismo bucle que _resolver_rapido compilado (ver motor_numba)."""
+        grafo = self.grafo
+        if grafo.adyacencia is None:
+            offsets, destinos, pesos = grafo.offsets, grafo.destinos, grafo.pesos
+        else:
+            # Un Grafo de diccionarios se exporta a CSR una vez por resolutor,
+            # conservando el orden de los vecinos
+            if self._csr_numba is None:
+                self._csr_numba = grafo._exportar_csr()[:3]
+            offsets, destinos, pesos = self._csr_numba
+
+        espacio = self._preparar_espacio()
+        gen = espacio.nueva_busqueda()
+        self._preparar_objetivo(fin)
+
+        # Términos de la heurística en uso; con h = 0 no se leen
+        modo = self._modo_heuristica()
+        if modo == H_CERO:
+            terminos = (array('d'), array('d'), array('d'))
+        else:
+            self._preparar_terminos(fin)
+            terminos = self._terminos
+
+        encontrado, coste, expandidos = motor_numba.buscar(
+            offsets, destinos, pesos, *terminos,
+            modo, float(self.RADIO_TIERRA),
+            inicio, fin, espacio.g, espacio.came_from, espacio.marca, gen,
+        )
+        self.nodos_expandidos = expandidos
+        if not encontrado:
+            return None, []
+        return coste, self._reconstruir_camino(espacio.came_from, inicio, fin)
+
+    def resolver_multiple(self, inicio, objetivos, caminos=True):
+        """
+        Calcula en una única búsqueda el camino más corto a varios objetivos.
+
+        La heurística es el mínimo de h(n, t) sobre los objetivos que faltan
+        por asentar (sigue siendo consistente). Al asentar un objetivo esa
+        heurística solo puede crecer, así que las entradas de la lista abierta
+        quedan con f por defecto. Cada entrada lleva la versión del conjunto
+        de objetivos con la que se calculó su f; las de versiones anteriores
+        se recalculan de forma perezosa al extraerlas y se reinsertan si su f
+        ha aumentado. La versión va en la entrada y no en el nodo: una entrada
+        antigua de un nodo mejorado después no debe pasar por vigente. Con más de
+        MAX_OBJETIVOS_HEURISTICA objetivos se usa h = 0 (Dijkstra). La
+        búsqueda termina cuando todos los objetivos están asentados.
+
+        Args:
+            inicio: ID del nodo de inicio
+            objetivos: IDs de los nodos objetivo
+            caminos: Si es False no se reconstruyen los caminos (camino y
+                     costes_arcos None)
+
+        Returns:
+            dict: {objetivo: (coste, camino, costes_arcos)}, con los costes de
+                  los arcos sacados de g como en resolver_con_costes;
+                  (None, [], []) si no es alcanzable. En
+                  self.expansiones_objetivos queda, para cada objetivo, el
+                  valor de nodos_expandidos cuando se asentó (el total final
+                  para los no alcanzables)
+        """
+        restantes = set(objetivos)
+        usar_heuristica = len(restantes) <= self.MAX_OBJETIVOS_HEURISTICA
+
+        def h(nodo):
+            if not usar_heuristica:
+                return 0
+            return min(self._heuristica(nodo, t) for t in restantes)
+
+        # Las entradas de la lista abierta son (nodo, versión del conjunto de
+        # objetivos con la que se calculó su f); la versión sube al asentar uno
+        abierta = ListaAbierta()
+        cerrada = ListaCerrada()
+        g_score = {inicio: 0}
+        came_from = {}
+        version = 0
+        resultado = {}
+
+        abierta.push((inicio, version), h(inicio))
+        self.nodos_expandidos = 0
+        self.expansiones_objetivos = {}
+
+        while restantes and not abierta.is_empty():
+            f_actual, (u, version_f) = abierta.pop()
+            if cerrada.contains(u):
+                continue
+
+            # f calculada con más objetivos de los que quedan: se actualiza
+            if usar_heuristica and version_f != version:
+                f_nueva = g_score[u] + h(u)
+                if f_nueva > f_actual:
+                    abierta.push((u, version), f_nueva)
+                    continue
+
+            cerrada.add(u)
+            self.nodos_expandidos += 1
+
+            if u in restantes:
+                restantes.discard(u)
+                version += 1
+                self.expansiones_objetivos[u] = self.nodos_expandidos
+                if caminos:
+                    camino = self._reconstruir_camino(came_from, inicio, u)
+                    costes_arcos = [g_score[b] - g_score[a] for a, b in zip(camino, camino[1:])]
+                else:
+                    camino = costes_arcos = None
+                resultado[u] = (g_score[u], camino, costes_arcos)
+                if not restantes:
+                    break
+
+            for v, peso in self.grafo.get_vecinos(u):
+                if cerrada.contains(v):
+                    continue
+                tentative_g = g_score[u] + peso
+                if v not in g_score or tentative_g < g_score[v]:
+                    g_score[v] = tentative_g
+                    abierta.push((v, version), tentative_g + h(v))
+                    came_from[v] = u
+
+        # Objetivos no alcanzables desde el inicio
+        for t in restantes:
+            resultado[t] = (None, [], [])
+            self.expansiones_objetivos[t] = self.nodos_expandidos
+        return resultado
+
+    def resolver_con_costes(self, inicio, fin):
+        """
+        Como resolver(), pero devuelve también el coste de cada arco del camino.
+
+        Los costes salen de g(n) de la propia búsqueda (g(v) - g(u) para cada
+        arco u -> v del camino), sin volver a consultar el grafo.
+
+        Returns:
+            tuple: (coste, camino, costes_arcos); costes_arcos[i] es el coste
+                   del arco camino[i] -> camino[i + 1] (lista vacía sin camino)
+        """
+        coste, camino = self.resolver(inicio, fin)
+        if len(camino) < 2:
+            return coste, camino, []
+        return coste, camino, self._costes_arcos(camino)
+
+    def _costes_arcos(self, camino):
+        """Coste de cada arco del camino devuelto por la última llamada a resolver()."""
+        g = self.espacio.g
+        return [g[v] - g[u] for u, v in zip(camino, camino[1:])]
+
     def _reconstruir_camino(self, came_from, inicio, fin):
         """
         Reconstruye el camino desde el inicio hasta el fin.
@@ -176,4 +570,170 @@ class AStar:
 class Dijkstra(AStar):
     def _heuristica(self, nodo_actual, nodo_objetivo):
         # Anulamos la heurística para que devuelva 0 siempre.
-        return 0
\ No newline at end of file
+        return 0
+
+# -----------------------------------------------------------------------------
+# Clase AStarBidireccional: A* simultáneo desde el inicio y desde el fin
+# -----------------------------------------------------------------------------
+
+class AStarBidireccional(AStar):
+    """
+    A* bidireccional con potenciales promediados.
+
+    Se lanzan dos búsquedas a la vez: una hacia delante desde el inicio por
+    los arcos del grafo y otra hacia atrás desde el fin por los arcos
+    inversos (Grafo.get_predecesores). Para que ambas sean consistentes
+    entre sí se usa el potencial promediado
+
+        pf(v) = (h(v, fin) - h(v, inicio)) / 2,    pr(v) = -pf(v)
+
+    con el que la clave de la búsqueda directa es g_f(v) + pf(v) y la de la
+    inversa g_r(v) + pr(v). La búsqueda termina cuando la suma de las claves
+    mínimas de ambas fronteras alcanza el coste mu del mejor camino
+    encontrado, momento en el que mu es óptimo.
+
+    La heurística debe ser simétrica (h(a, b) = h(b, a)), como Haversine o
+    la cuerda. nodos_expandidos cuenta las expansiones de ambos sentidos.
+    """
+
+    def resolver(self, inicio, fin):
+        """
+        Ejecuta la búsqueda bidireccional entre inicio y fin.
+
+        Args:
+            inicio: ID del nodo de inicio
+            fin: ID del nodo objetivo
+
+        Returns:
+            tuple: (coste, camino) igual que AStar.resolver
+        """
+        self.nodos_expandidos = 0
+        if inicio == fin:
+            return 0, [inicio]
+
+        # Potencial de cada nodo, calculado la primera vez que se alcanza
+        potenciales = {}
+
+        def potencial(v):
+            p = potenciales.get(v)
+            if p is None:
+                p = (self._heuristica(v, fin) - self._heuristica(v, inicio)) / 2
+                potenciales[v] = p
+            return p
+
+        # Estructuras de cada sentido: índice 0 = directo, 1 = inverso
+        g_score = ({inicio: 0}, {fin: 0})
+        came_from = ({}, {})
+        abiertas = (ListaAbierta(), ListaAbierta())
+        cerradas = (ListaCerrada(), ListaCerrada())
+        vecinos = (self.grafo.get_vecinos, self.grafo.get_predecesores)
+        signo = (1, -1)
+
+        abiertas[0].push(inicio, potencial(inicio))
+        abiertas[1].push(fin, -potencial(fin))
+
+        mu = math.inf     # coste del mejor camino completo encontrado
+        encuentro = None  # nodo en el que se unen ambas búsquedas
+
+        while True:
+            # Descartar entradas obsoletas de la cima de cada frontera
+            for lado in (0, 1):
+                while not abiertas[lado].is_empty() and cerradas[lado].contains(abiertas[lado].peek()[1]):
+                    abiertas[lado].pop()
+            if abiertas[0].is_empty() or abiertas[1].is_empty():
+                break
+
+            # Criterio de parada: ninguna unión pendiente puede mejorar mu
+            if abiertas[0].peek()[0] + abiertas[1].peek()[0] >= mu:
+                break
+
+            # Se avanza por el sentido con la frontera más pequeña
+            lado = 0 if len(abiertas[0]) <= len(abiertas[1]) else 1
+            _, u = abiertas[lado].pop()
+            cerradas[lado].add(u)
+            self.nodos_expandidos += 1
+
+            g_lado = g_score[lado]
+            g_otro = g_score[1 - lado]
+            for v, peso in vecinos[lado](u):
+                if cerradas[lado].contains(v):
+                    continue
+
+                tentative_g = g_lado[u] + peso
+                if v not in g_lado or tentative_g < g_lado[v]:
+                    g_lado[v] = tentative_g
+                    came_from[lado][v] = u
+                    abiertas[lado].push(v, tentative_g + signo[lado] * potencial(v))
+
+                    # ¿El otro sentido ya había llegado a v? -> camino completo
+                    if v in g_otro and tentative_g + g_otro[v] < mu:
+                        mu = tentative_g + g_otro[v]
+                        encuentro = v
+
+        # g de ambos sentidos, para _costes_arcos
+        self._ultima_busqueda = (g_score, encuentro)
+        if encuentro is None:
+            return None, []
+
+        # Tramo inicio -> encuentro con los predecesores de la búsqueda directa
+        camino = self._reconstruir_camino(came_from[0], inicio, encuentro)
+        # Tramo encuentro -> fin con los sucesores de la búsqueda inversa
+        actual = encuentro
+        while actual != fin:
+            actual = came_from[1][actual]
+            camino.append(actual)
+        return mu, camino
+
+    def _costes_arcos(self, camino):
+        """
+        Coste de cada arco del último camino: diferencias de g_f hasta el nodo
+        de encuentro y de g_r (distancia al fin) desde él.
+        """
+        (g_f, g_r), encuentro = self._ultima_busqueda
+        costes = []
+        hacia_fin = False
+        for u, v in zip(camino, camino[1:]):
+            hacia_fin = hacia_fin or u == encuentro
+            costes.append(g_r[u] - g_r[v] if hacia_fin else g_f[v] - g_f[u])
+        return costes
+
+
+class DijkstraBidireccional(AStarBidireccional):
+    def _heuristica(self, nodo_actual, nodo_objetivo):
+        # Sin heurística: búsqueda bidireccional de coste uniforme.
+        return 0
+
+# -----------------------------------------------------------------------------
+# Dijkstra completo desde un origen (preprocesos)
+# -----------------------------------------------------------------------------
+
+def distancias_desde(grafo, origen, inverso=False):
+    """
+    Calcula la distancia mínima desde 'origen' a todos los nodos del grafo.
+
+    Args:
+        grafo: Instancia de Grafo
+        origen: ID del nodo de partida
+        inverso: Si es True se recorren los arcos al revés, obteniendo la
+                 distancia desde cada nodo HASTA 'origen'
+
+    Returns:
+        list: dist[nodo] con la distancia en metros (math.inf si no es alcanzable)
+    """
+    vecinos = grafo.get_predecesores if inverso else grafo.get_vecinos
+    dist = [math.inf] * (grafo.num_nodos + 1)
+    dist[origen] = 0
+    frontera = [(0, origen)]
+
+    while frontera:
+        d_u, u = heapq.heappop(frontera)
+        # Entrada obsoleta: ya se encontró un camino mejor hasta u
+        if d_u > dist[u]:
+            continue
+        for v, peso in vecinos(u):
+            d_v = d_u + peso
+            if d_v < dist[v]:
+                dist[v] = d_v
+                heapq.heappush(frontera, (d_v, v))
+
+    return dist
@@ -0,0 +1,232 @@
+"""
+Heurística ALT (A*, Landmarks y desigualdad Triangular).
+
+En un preproceso se eligen k nodos de referencia (landmarks) y se calculan,
+para cada uno, las distancias reales por carretera desde el landmark a todos
+los nodos y desde todos los nodos hasta el landmark. Por la desigualdad
+triangular, para cualquier landmark L:
+
+    d(v, t) >= d(L, t) - d(L, v)
+    d(v, t) >= d(v, L) - d(t, L)
+
+El máximo de estas cotas sobre todos los landmarks es una heurística
+admisible y consistente, mucho más ajustada que la distancia Haversine
+cuando la carretera rodea obstáculos (montañas, lagos...).
+
+Las tablas de distancias se guardan junto al mapa (<mapa>.lmk) para no
+repetir el preproceso.
+"""
+
+import os
+import math
+import struct
+from array import array
+
+from algoritmo import AStar, distancias_desde
+
+# -----------------------------------------------------------------------------
+# Formato del fichero de landmarks
+# -----------------------------------------------------------------------------
+
+EXTENSION = ".lmk"
+MAGIC = b"GRAFOLMK"
+VERSION = 1
+
+# Cabecera: magic, versión, k, num_nodos, num_arcos, tamaño y mtime del .gr
+CABECERA = struct.Struct("<8sIIqqqq")
+
+# Distancia "infinita" (nodo inalcanzable) en los arrays int32
+INALCANZABLE = 2**31 - 1
+
+
+def _a_array(dist):
+    """Convierte una lista de distancias (con math.inf) en un array int32."""
+    return array('i', [INALCANZABLE if d == math.inf else d for d in dist])
+
+
+# -----------------------------------------------------------------------------
+# Clase Landmarks: selección, cálculo y persistencia de las tablas
+# -----------------------------------------------------------------------------
+
+class Landmarks:
+    """
+    Tablas de distancias de los landmarks de un grafo.
+
+    Atributos:
+        nodos: Lista con el ID de cada landmark
+        desde: desde[i][v] = distancia del landmark i al nodo v
+        hacia: hacia[i][v] = distancia del nodo v al landmark i
+    """
+
+    def __init__(self, nodos, desde, hacia):
+        self.nodos = nodos
+        self.desde = desde
+        self.hacia = hacia
+
+    @classmethod
+    def calcular(cls, grafo, k=8):
+        """
+        Elige k landmarks por selección del más lejano y calcula sus tablas.
+
+        Se parte de una búsqueda desde el primer nodo con arcos; en cada paso
+        se elige como landmark el nodo cuya distancia al landmark más cercano
+        ya elegido es máxima. Los nodos no alcanzables cuentan como los más
+        lejanos, de modo que cada componente desconexa recibe su landmark.
+        """
+        # Solo son candidatos los nodos con algún arco de salida
+        candidatos = [u for u in range(1, grafo.num_nodos + 1)
+                      if any(True for _ in grafo.get_vecinos(u))]
+        if not candidatos:
+            return cls([], [], [])
+
+        nodos, desde, hacia = [], [], []
+        cercania = distancias_desde(grafo, candidatos[0])
+
+        while len(nodos) < k:
+            # Candidato más alejado de todos los landmarks ya elegidos
+            elegido = max(candidatos, key=cercania.__getitem__)
+            if cercania[elegido] == 0:
+                break  # todos los candidatos son ya landmarks
+
+            d_desde = distancias_desde(grafo, elegido)
+            d_hacia = distancias_desde(grafo, elegido, inverso=True)
+            nodos.append(elegido)
+            desde.append(_a_array(d_desde))
+            hacia.append(_a_array(d_hacia))
+
+            # La primera distancia venía del nodo de arranque, no de un landmark
+            if len(nodos) == 1:
+                cercania = d_desde
+            else:
+                cercania = [min(a, b) for a, b in zip(cercania, d_desde)]
+
+        return cls(nodos, desde, hacia)
+
+    def guardar(self, ruta, ruta_gr, grafo):
+        """Escribe las tablas en disco asociadas al .gr del que proceden."""
+        st = os.stat(ruta_gr)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(CABECERA.pack(MAGIC, VERSION, len(self.nodos), grafo.num_nodos,
+                                  grafo.num_arcos, st.st_size, st.st_mtime_ns))
+            array('i', self.nodos).tofile(f)
+            for d_desde, d_hacia in zip(self.desde, self.hacia):
+                d_desde.tofile(f)
+                d_hacia.tofile(f)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta, ruta_gr, grafo, k):
+        """Lee las tablas de disco; devuelve None si no existen o están desfasadas."""
+        if not os.path.exists(ruta):
+            return None
+
+        st = os.stat(ruta_gr)
+        with open(ruta, "rb") as f:
+            datos = f.read(CABECERA.size)
+            if len(datos) < CABECERA.size:
+                return None
+            magic, version, k_fichero, num_nodos, num_arcos, tam_gr, mtime_gr = \
+                CABECERA.unpack(datos)
+            if (magic != MAGIC or version != VERSION or k_fichero != k
+                    or num_nodos != grafo.num_nodos or num_arcos != grafo.num_arcos
+                    or tam_gr != st.st_size or mtime_gr != st.st_mtime_ns):
+                return None
+
+            try:
+                nodos = array('i')
+                nodos.fromfile(f, k)
+                desde, hacia = [], []
+                for _ in range(k):
+                    d_desde = array('i')
+                    d_desde.fromfile(f, num_nodos + 1)
+                    d_hacia = array('i')
+                    d_hacia.fromfile(f, num_nodos + 1)
+                    desde.append(d_desde)
+                    hacia.append(d_hacia)
+            except EOFError:
+                return None
+
+        return cls(list(nodos), desde, hacia)
+
+    @classmethod
+    def cargar_o_calcular(cls, grafo, ruta_base, k=8):
+        """Usa <ruta_base>.lmk si está vigente; si no, preprocesa y lo guarda."""
+        ruta = ruta_base + EXTENSION
+        ruta_gr = ruta_base + ".gr"
+
+        landmarks = cls.cargar(ruta, ruta_gr, grafo, k)
+        if landmarks is None:
+            landmarks = cls.calcular(grafo, k)
+            # Si el mapa tiene menos componentes/nodos que k no se guarda:
+            # al cargar se exige exactamente k landmarks
+            if len(landmarks.nodos) == k:
+                try:
+                    landmarks.guardar(ruta, ruta_gr, grafo)
+                except OSError:
+                    pass
+        return landmarks
+
+
+# -----------------------------------------------------------------------------
+# Clase AStarALT: A* con la heurística de landmarks
+# -----------------------------------------------------------------------------
+
+class AStarALT(AStar):
+    """
+    A* que sustituye la distancia Haversine por la cota ALT.
+
+    Devuelve los mismos (coste, camino) y estadísticas que AStar, por lo que
+    puede usarse en su lugar en parte-2.py y en el análisis.
+    """
+
+    # La cota ALT se prepara para un único objetivo (ver _preparar_objetivo):
+    # el mínimo sobre varios objetivos de resolver_multiple la recalcula en
+    # cada evaluación y el lote agrupado resulta más lento que por separado
+    AGRUPAR_POR_INICIO = False
+
+    def __init__(self, grafo, landmarks, motor="clasico"):
+        """Inicializa el algoritmo con un grafo y sus landmarks precalculados."""
+        super().__init__(grafo, motor=motor)
+        self.landmarks = landmarks
+        self._cotas_desde = []
+        self._cotas_hacia = []
+
+    def _preparar_objetivo(self, nodo_objetivo):
+        """
+        Fija d(L, t) y d(t, L) para cada landmark. Los landmarks que no
+        alcanzan al objetivo (o a los que no llega) no aportan cota.
+        """
+        super()._preparar_objetivo(nodo_objetivo)
+        self._cotas_desde = [
+            (d_desde, d_desde[nodo_objetivo])
+            for d_desde in self.landmarks.desde
+            if d_desde[nodo_objetivo] != INALCANZABLE
+        ]
+        self._cotas_hacia = [
+            (d_hacia, d_hacia[nodo_objetivo])
+            for d_hacia in self.landmarks.hacia
+            if d_hacia[nodo_objetivo] != INALCANZABLE
+        ]
+
+    def _heuristica(self, nodo_actual, nodo_objetivo):
+        """
+        Máximo de las cotas triangulares sobre todos los landmarks.
+
+        Si d(L, v) es inalcanzable la primera cota queda muy negativa y no
+        cuenta. Si d(v, L) es inalcanzable pero d(t, L) no, v tampoco puede
+        llegar a t y la cota enorme resultante sigue siendo admisible.
+        """
+        if nodo_objetivo != self._objetivo:
+            self._preparar_objetivo(nodo_objetivo)
+
+        mejor = 0
+        for d_desde, d_lt in self._cotas_desde:
+            cota = d_lt - d_desde[nodo_actual]
+            if cota > mejor:
+                mejor = cota
+        for d_hacia, d_tl in self._cotas_hacia:
+            cota = d_hacia[nodo_actual] - d_tl
+            if cota > mejor:
+                mejor = cota
+        return mejor
@@ -0,0 +1,324 @@
+"""
+Caché binaria de grafos ya cargados.
+
+La primera vez que se carga un mapa DIMACS se guarda junto a los ficheros
+.gr/.co una instantánea binaria (<mapa>.cache) con el grafo en formato CSR.
+En las cargas siguientes el fichero se proyecta en memoria (mmap) y los
+arrays se copian directamente, sin volver a interpretar millones de líneas
+de texto; GrafoMmap ni siquiera los copia y trabaja sobre la proyección
+(ver proyectar), y proyecta también los términos de la heurística
+(ver proyectar_terminos).
+
+La caché se invalida si cambia el tamaño o la fecha de modificación de
+alguno de los ficheros fuente: una edición que conserve el tamaño (p.ej. un
+peso de 5000 cambiado a 9999) debe volver a interpretar el texto. Copiar o
+tocar (touch) los ficheros también obliga a regenerarla.
+"""
+
+import os
+import mmap
+import struct
+from array import array
+
+# -----------------------------------------------------------------------------
+# Formato del fichero de caché
+# -----------------------------------------------------------------------------
+
+EXTENSION = ".cache"
+MAGIC = b"GRAFOCSR"
+VERSION = 2
+
+# Cabecera: magic, versión, (tamaño, mtime) de .gr y .co, num_nodos,
+# num_arcos declarados y longitudes de los arrays de arcos
+CABECERA = struct.Struct("<8sI4xqqqqqqqq")
+
+# Secciones del fichero en orden: (nombre, typecode)
+SECCIONES = (
+    ("offsets", "q"),
+    ("destinos", "i"),
+    ("pesos", "i"),
+    ("longitudes", "i"),
+    ("latitudes", "i"),
+)
+
+
+def ruta_cache(ruta_base):
+    """Ruta del fichero de caché asociado a un mapa."""
+    return ruta_base + EXTENSION
+
+
+def _alinear(posicion):
+    """Redondea una posición al siguiente múltiplo de 8 bytes."""
+    return (posicion + 7) & ~7
+
+
+def _longitudes_secciones(num_nodos, num_arcos_csr):
+    """Número de elementos de cada sección."""
+    return {
+        "offsets": num_nodos + 2,
+        "destinos": num_arcos_csr,
+        "pesos": num_arcos_csr,
+        "longitudes": num_nodos + 1,
+        "latitudes": num_nodos + 1,
+    }
+
+
+def guardar(grafo, ruta_base, ruta_gr, ruta_co):
+    """
+    Escribe la instantánea binaria de un grafo recién cargado.
+
+    La escritura se hace sobre un fichero temporal que después se renombra,
+    de modo que un proceso concurrente nunca ve una caché a medio escribir.
+    Si no se puede escribir (p.ej. directorio de solo lectura) se ignora.
+    """
+    offsets, destinos, pesos, longitudes, latitudes = grafo._exportar_csr()
+    st_gr = os.stat(ruta_gr)
+    st_co = os.stat(ruta_co)
+
+    cabecera = CABECERA.pack(
+        MAGIC, VERSION,
+        st_gr.st_size, st_gr.st_mtime_ns,
+        st_co.st_size, st_co.st_mtime_ns,
+        grafo.num_nodos, grafo.num_arcos, len(destinos), 0,
+    )
+    datos = {
+        "offsets": offsets,
+        "destinos": destinos,
+        "pesos": pesos,
+        "longitudes": longitudes,
+        "latitudes": latitudes,
+    }
+
+    destino = ruta_cache(ruta_base)
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "wb") as f:
+            f.write(cabecera)
+            for nombre, _ in SECCIONES:
+                # Cada sección empieza alineada a 8 bytes
+                f.write(b"\0" * (_alinear(f.tell()) - f.tell()))
+                datos[nombre].tofile(f)
+        os.replace(temporal, destino)
+    except OSError:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _es_valida(cabecera, ruta_gr, ruta_co, magic=MAGIC):
+    """Comprueba que la caché corresponde a los ficheros fuente actuales."""
+    magic_fichero, version, tam_gr, mtime_gr, tam_co, mtime_co, *_ = cabecera
+    if magic_fichero != magic or version != VERSION:
+        return False
+
+    for ruta, tamano, mtime in ((ruta_gr, tam_gr, mtime_gr), (ruta_co, tam_co, mtime_co)):
+        st = os.stat(ruta)
+        if st.st_size != tamano or st.st_mtime_ns != mtime:
+            return False
+    return True
+
+
+def _proyectar_fichero(ruta, magic, ruta_gr, ruta_co):
+    """
+    Proyecta en memoria (solo lectura) un fichero con CABECERA vigente.
+
+    Returns:
+        tuple: (mmap, cabecera desempaquetada), o None si no existe, no se
+               puede abrir o no corresponde a los ficheros fuente actuales
+    """
+    if not os.path.exists(ruta):
+        return None
+
+    try:
+        with open(ruta, "rb") as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapa) < CABECERA.size:
+        mapa.close()
+        return None
+    cabecera = CABECERA.unpack_from(mapa, 0)
+    if not _es_valida(cabecera, ruta_gr, ruta_co, magic):
+        mapa.close()
+        return None
+    return mapa, cabecera
+
+
+def _cortar_secciones(mapa, secciones, longitudes):
+    """
+    Vistas (memoryview) de cada sección [(nombre, typecode)] tras la cabecera,
+    alineadas a 8 bytes y con longitudes[nombre] elementos. Si el fichero
+    está truncado o le sobran bytes, cierra el mmap y devuelve None.
+    """
+    vista = memoryview(mapa)
+    cortes = {}
+    posicion = CABECERA.size
+    for nombre, typecode in secciones:
+        posicion = _alinear(posicion)
+        tamano = longitudes[nombre] * array(typecode).itemsize
+        ultima = nombre == secciones[-1][0]
+        if posicion + tamano > len(mapa) or (ultima and posicion + tamano != len(mapa)):
+            # Fichero truncado o inconsistente: se descarta y se vuelve a generar
+            for corte in cortes.values():
+                corte.release()
+            vista.release()
+            mapa.close()
+            return None
+        cortes[nombre] = vista[posicion:posicion + tamano]
+        posicion += tamano
+    vista.release()
+    return cortes
+
+
+def abrir(ruta_base, ruta_gr, ruta_co):
+    """
+    Proyecta en memoria la caché de un mapa si existe y es válida.
+
+    Returns:
+        tuple: (mmap, num_nodos, num_arcos, secciones) donde secciones es un
+               diccionario {nombre: memoryview} con los bytes de cada array
+               dentro del fichero proyectado, o None si no hay caché utilizable.
+               Hay que liberar (release) las vistas antes de cerrar el mmap.
+    """
+    proyectado = _proyectar_fichero(ruta_cache(ruta_base), MAGIC, ruta_gr, ruta_co)
+    if proyectado is None:
+        return None
+
+    mapa, cabecera = proyectado
+    num_nodos, num_arcos, num_arcos_csr = cabecera[6], cabecera[7], cabecera[8]
+    secciones = _cortar_secciones(mapa, SECCIONES,
+                                  _longitudes_secciones(num_nodos, num_arcos_csr))
+    if secciones is None:
+        return None
+    return mapa, num_nodos, num_arcos, secciones
+
+
+def cargar(grafo, ruta_base, ruta_gr, ruta_co):
+    """
+    Carga un grafo desde su caché. Devuelve True si lo consiguió.
+
+    Los arrays se copian desde el fichero proyectado (una copia de memoria
+    por sección), así que el mmap se puede cerrar en cuanto termina la carga.
+    """
+    abierto = abrir(ruta_base, ruta_gr, ruta_co)
+    if abierto is None:
+        return False
+
+    mapa, num_nodos, num_arcos, secciones = abierto
+    try:
+        arrays = []
+        for nombre, typecode in SECCIONES:
+            datos = array(typecode)
+            datos.frombytes(secciones[nombre])
+            secciones[nombre].release()
+            arrays.append(datos)
+    finally:
+        mapa.close()
+
+    grafo._importar_csr(*arrays, num_nodos=num_nodos, num_arcos=num_arcos)
+    return True
+
+
+def proyectar(grafo, ruta_base, ruta_gr, ruta_co):
+    """
+    Entrega al grafo los arrays de la caché como vistas (memoryview) sobre el
+    fichero proyectado, sin copiarlos: el sistema operativo decide qué páginas
+    quedan en memoria y los procesos que proyectan la misma caché comparten
+    una única copia física.
+
+    Returns:
+        mmap.mmap: La proyección, que debe seguir abierta mientras se use el
+                   grafo, o None si no hay caché utilizable
+    """
+    abierto = abrir(ruta_base, ruta_gr, ruta_co)
+    if abierto is None:
+        return None
+
+    mapa, num_nodos, num_arcos, secciones = abierto
+    vistas = []
+    for nombre, typecode in SECCIONES:
+        vistas.append(secciones[nombre].cast(typecode))
+        secciones[nombre].release()
+
+    grafo._importar_csr(*vistas, num_nodos=num_nodos, num_arcos=num_arcos)
+    return mapa
+
+
+# -----------------------------------------------------------------------------
+# Términos de la heurística en disco (GrafoMmap)
+# -----------------------------------------------------------------------------
+#
+# Los términos por nodo de cada heurística geográfica (Grafo.terminos_heuristica)
+# se guardan en <mapa>.<heuristica>.terminos para que GrafoMmap los proyecte
+# igual que el grafo: los comparten todos los procesos que abren el mapa en
+# lugar de calcular cada uno su copia. Mismo formato de cabecera que la caché
+# (sin arcos) y después los tres arrays float64, num_nodos + 1 elementos cada uno.
+
+EXTENSION_TERMINOS = ".terminos"
+MAGIC_TERMINOS = b"GRAFOTER"
+SECCIONES_TERMINOS = (("a", "d"), ("b", "d"), ("c", "d"))
+
+
+def ruta_terminos(ruta_base, heuristica):
+    """Ruta del fichero de términos de una heurística de un mapa."""
+    return f"{ruta_base}.{heuristica}{EXTENSION_TERMINOS}"
+
+
+def guardar_terminos(grafo, ruta_base, ruta_gr, ruta_co, heuristica):
+    """
+    Calcula (Grafo._calcular_terminos) y escribe los términos de una
+    heurística. Igual que guardar(), pasa por un temporal y se ignora si no
+    se puede escribir.
+    """
+    terminos = grafo._calcular_terminos(heuristica)
+    st_gr = os.stat(ruta_gr)
+    st_co = os.stat(ruta_co)
+    cabecera = CABECERA.pack(
+        MAGIC_TERMINOS, VERSION,
+        st_gr.st_size, st_gr.st_mtime_ns,
+        st_co.st_size, st_co.st_mtime_ns,
+        grafo.num_nodos, 0, 0, 0,
+    )
+
+    destino = ruta_terminos(ruta_base, heuristica)
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "wb") as f:
+            f.write(cabecera)
+            for datos in terminos:
+                f.write(b"\0" * (_alinear(f.tell()) - f.tell()))
+                datos.tofile(f)
+        os.replace(temporal, destino)
+    except OSError:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def proyectar_terminos(ruta_base, ruta_gr, ruta_co, heuristica, num_nodos):
+    """
+    Proyecta los términos de una heurística guardados con guardar_terminos.
+
+    Returns:
+        tuple: (mmap, (a, b, c)) con los tres arrays como vistas float64 sobre
+               el fichero (ver Grafo.terminos_heuristica), o None si no hay
+               fichero vigente para este mapa
+    """
+    proyectado = _proyectar_fichero(ruta_terminos(ruta_base, heuristica),
+                                    MAGIC_TERMINOS, ruta_gr, ruta_co)
+    if proyectado is None:
+        return None
+
+    mapa, cabecera = proyectado
+    if cabecera[6] != num_nodos:
+        mapa.close()
+        return None
+    secciones = _cortar_secciones(mapa, SECCIONES_TERMINOS,
+                                  {nombre: num_nodos + 1 for nombre, _ in SECCIONES_TERMINOS})
+    if secciones is None:
+        return None
+
+    vistas = []
+    for nombre, typecode in SECCIONES_TERMINOS:
+        vistas.append(secciones[nombre].cast(typecode))
+        secciones[nombre].release()
+    return mapa, tuple(vistas)
@@ -0,0 +1,138 @@
+"""
+Ejecución de consultas sobre un grafo ya cargado en un pool de procesos.
+
+El grafo y el resolutor se construyen una sola vez en el proceso principal y
+se fijan como variables globales de este módulo antes de crear el pool. Con
+el método de arranque 'fork' los trabajadores heredan esa memoria (copia en
+escritura), de modo que ni el grafo ni las tablas de preproceso (landmarks,
+jerarquía) se serializan en cada tarea: solo viajan los IDs de la consulta
+y el resultado.
+
+En sistemas sin 'fork' las consultas se resuelven en un hilo del propio
+proceso principal.
+"""
+
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import salida
+
+# Grafo y resolutor compartidos con los trabajadores (ver preparar())
+_GRAFO = None
+_SOLVER = None
+
+
+def preparar(grafo, solver):
+    """Fija el grafo y el resolutor que usarán las consultas de este proceso."""
+    global _GRAFO, _SOLVER
+    _GRAFO = grafo
+    _SOLVER = solver
+
+
+def crear_pool(trabajadores):
+    """
+    Crea el ejecutor de consultas tras llamar a preparar().
+
+    Con más de un trabajador y 'fork' disponible es un ProcessPoolExecutor; se
+    arrancan todos los procesos en este momento para que el fork ocurra antes
+    de que el llamante cree sus propios hilos.
+    """
+    if trabajadores > 1 and "fork" in multiprocessing.get_all_start_methods():
+        pool = ProcessPoolExecutor(max_workers=trabajadores,
+                                   mp_context=multiprocessing.get_context("fork"))
+        pool.submit(int).result()
+        return pool
+    return ThreadPoolExecutor(max_workers=1)
+
+
+def resolver_consulta(inicio, fin):
+    """
+    Resuelve una consulta con el resolutor global (se ejecuta en el trabajador).
+
+    Returns:
+        tuple: (coste, camino, costes_arcos, nodos_expandidos, segundos). Si no
+               hay camino, coste es None y las listas están vacías.
+    """
+    t0 = time.perf_counter()
+    coste, camino, costes_arcos = _SOLVER.resolver_con_costes(inicio, fin)
+    segundos = time.perf_counter() - t0
+    return coste, camino, costes_arcos, _SOLVER.nodos_expandidos, segundos
+
+
+def resolver_origen(inicio, destinos):
+    """
+    Resuelve las consultas de un mismo inicio a varios destinos (se ejecuta
+    en el trabajador). Con más de un destino y un resolutor que lo admite
+    (AStar.AGRUPAR_POR_INICIO) se hace una única búsqueda con
+    AStar.resolver_multiple en lugar de una por destino.
+
+    Returns:
+        list: Un resultado como los de resolver_consulta por destino, en el
+              mismo orden. Cada destino lleva las expansiones que hizo la
+              búsqueda compartida desde que se asentó el destino anterior
+              hasta asentarlo a él, y la parte proporcional del tiempo, de
+              modo que los totales del lote siguen siendo correctos.
+    """
+    if len(destinos) == 1 or not getattr(_SOLVER, "AGRUPAR_POR_INICIO", False):
+        return [resolver_consulta(inicio, fin) for fin in destinos]
+
+    t0 = time.perf_counter()
+    soluciones = _SOLVER.resolver_multiple(inicio, destinos)
+    segundos = time.perf_counter() - t0
+    total = _SOLVER.nodos_expandidos
+
+    # Expansiones propias de cada destino, en el orden en que se asentaron
+    marcas = _SOLVER.expansiones_objetivos
+    propias = {}
+    anterior = 0
+    for fin in sorted(marcas, key=marcas.get):
+        propias[fin] = marcas[fin] - anterior
+        anterior = marcas[fin]
+
+    resultados = []
+    for fin in destinos:
+        coste, camino, costes_arcos = soluciones[fin]
+        # Un destino repetido solo cuenta su parte la primera vez
+        expandidos = propias.pop(fin, 0)
+        parte = segundos * expandidos / total if total else 0
+        resultados.append((coste, camino, costes_arcos, expandidos, parte))
+    return resultados
+
+
+def _resolver_grupo(grupo):
+    """Adaptador de resolver_origen para Executor.map."""
+    return resolver_origen(*grupo)
+
+
+def resolver_lote(pool, pares, trabajadores):
+    """
+    Resuelve una lista de consultas (inicio, fin) repartiéndolas en el pool.
+
+    Las consultas que comparten inicio se agrupan y cada grupo se resuelve
+    con una sola búsqueda en un trabajador (ver resolver_origen). Los grupos
+    se envían en trozos para amortizar la comunicación entre procesos.
+    Devuelve un iterador con los resultados de resolver_consulta en el mismo
+    orden que 'pares': cada resultado se entrega en cuanto han llegado los de
+    todas las consultas anteriores.
+    """
+    # Grupos por inicio, en el orden en que aparece cada inicio por primera vez
+    posiciones = {}
+    for i, (inicio, _) in enumerate(pares):
+        posiciones.setdefault(inicio, []).append(i)
+    grupos = [(inicio, [pares[i][1] for i in indices]) for inicio, indices in posiciones.items()]
+
+    trozo = max(1, min(64, len(grupos) // (4 * max(trabajadores, 1))))
+    resultados = pool.map(_resolver_grupo, grupos, chunksize=trozo)
+
+    pendientes = {}
+    siguiente = 0
+    for indices, resultados_grupo in zip(posiciones.values(), resultados):
+        pendientes.update(zip(indices, resultados_grupo))
+        while siguiente in pendientes:
+            yield pendientes.pop(siguiente)
+            siguiente += 1
+
+
+def formatear_camino(camino, costes_arcos):
+    """Línea de salida: <inicio> - (coste) - <nodo_i> - ... - <fin>."""
+    return "".join(salida.trozos_texto(camino, costes_arcos))
@@ -0,0 +1,418 @@
+"""
+Jerarquías de contracción (Contraction Hierarchies) sobre un Grafo.
+
+Preproceso: los nodos se contraen uno a uno en orden de importancia
+creciente. Al contraer v, para cada par de vecinos u -> v -> w todavía no
+contraídos se comprueba con una búsqueda local (búsqueda de testigos) si
+existe otro camino u -> w igual o más corto que no pase por v; si no existe
+se añade un atajo u -> w que recuerda su nodo intermedio v. El orden se
+decide con la diferencia de aristas ponderada (atajos añadidos menos arcos
+eliminados) más el número de vecinos ya contraídos, con actualización
+perezosa.
+
+Consulta: Dijkstra bidireccional en el que cada sentido solo sube a nodos de
+rango mayor. Los caminos se desempaquetan sustituyendo cada atajo por sus
+dos mitades hasta llegar a arcos originales, por lo que el resultado tiene el
+mismo formato que AStar.resolver.
+
+La jerarquía se guarda junto al mapa (<mapa>.ch) para no repetir el preproceso.
+"""
+
+import os
+import math
+import heapq
+import struct
+from array import array
+
+# -----------------------------------------------------------------------------
+# Formato del fichero de la jerarquía
+# -----------------------------------------------------------------------------
+
+EXTENSION = ".ch"
+MAGIC = b"GRAFOCH\0"
+VERSION = 1
+
+# Cabecera: magic, versión, num_nodos, num_arcos, tamaño y mtime del .gr,
+# número de arcos ascendentes hacia delante y hacia atrás
+CABECERA = struct.Struct("<8sI4xqqqqqq")
+
+# Nodos asentados como máximo en cada búsqueda de testigos
+MAX_ASENTADOS_TESTIGO = 100
+
+# Peso de la diferencia de aristas en la prioridad de contracción: con 2 se
+# generan menos atajos y el preproceso es más rápido que con 1
+PESO_DIFERENCIA = 2
+
+# Valor de 'medio' de los arcos originales (los IDs DIMACS empiezan en 1)
+SIN_MEDIO = 0
+
+
+# -----------------------------------------------------------------------------
+# Clase JerarquiaContraccion: preproceso y almacenamiento
+# -----------------------------------------------------------------------------
+
+class JerarquiaContraccion:
+    """
+    Grafo ascendente resultado de la contracción.
+
+    Atributos:
+        num_nodos: Número de nodos del grafo original
+        rango: rango[v] = posición de v en el orden de contracción
+        subida: Arcos u -> v con rango[v] > rango[u], en CSR:
+                (offsets, destinos, pesos, medios)
+        bajada: Arcos v -> u con rango[v] > rango[u], agrupados por u:
+                (offsets, origenes, pesos, medios)
+    """
+
+    def __init__(self, num_nodos, rango, subida, bajada):
+        self.num_nodos = num_nodos
+        self.rango = rango
+        self.subida = subida
+        self.bajada = bajada
+
+    # -- Preproceso -----------------------------------------------------------
+
+    @classmethod
+    def construir(cls, grafo):
+        """Contrae todos los nodos del grafo y devuelve la jerarquía."""
+        n = grafo.num_nodos
+
+        # Grafo de trabajo mutable: salientes[u][v] = entrantes[v][u] = (peso, medio)
+        salientes = [{} for _ in range(n + 1)]
+        entrantes = [{} for _ in range(n + 1)]
+        for u in range(n + 1):
+            for v, peso in grafo.get_vecinos(u):
+                if u != v:
+                    salientes[u][v] = (peso, SIN_MEDIO)
+                    entrantes[v][u] = (peso, SIN_MEDIO)
+
+        vecinos_contraidos = [0] * (n + 1)
+        rango = array('i', bytes(4 * (n + 1)))
+        subida = [None] * (n + 1)
+        bajada = [None] * (n + 1)
+
+        def prioridad(v, atajos):
+            # Diferencia de aristas (ponderada) más vecinos ya contraídos
+            diferencia = len(atajos) - len(salientes[v]) - len(entrantes[v])
+            return PESO_DIFERENCIA * diferencia + vecinos_contraidos[v]
+
+        cola = [(prioridad(v, _atajos_necesarios(salientes, entrantes, v)), v)
+                for v in range(n + 1)]
+        heapq.heapify(cola)
+
+        siguiente_rango = 0
+        while cola:
+            _, v = heapq.heappop(cola)
+
+            # Actualización perezosa: si la prioridad ha empeorado, se reinserta
+            atajos = _atajos_necesarios(salientes, entrantes, v)
+            nueva = prioridad(v, atajos)
+            if cola and nueva > cola[0][0]:
+                heapq.heappush(cola, (nueva, v))
+                continue
+
+            # Contracción de v
+            rango[v] = siguiente_rango
+            siguiente_rango += 1
+
+            # Todos los vecinos que quedan tienen rango mayor: son sus arcos ascendentes
+            subida[v] = [(w, peso, medio) for w, (peso, medio) in salientes[v].items()]
+            bajada[v] = [(u, peso, medio) for u, (peso, medio) in entrantes[v].items()]
+
+            for w in salientes[v]:
+                del entrantes[w][v]
+                vecinos_contraidos[w] += 1
+            for u in entrantes[v]:
+                del salientes[u][v]
+                vecinos_contraidos[u] += 1
+            salientes[v] = {}
+            entrantes[v] = {}
+
+            for u, w, coste in atajos:
+                actual = salientes[u].get(w)
+                if actual is None or coste < actual[0]:
+                    salientes[u][w] = (coste, v)
+                    entrantes[w][u] = (coste, v)
+
+        return cls(n, rango, _a_csr(subida), _a_csr(bajada))
+
+    # -- Persistencia ---------------------------------------------------------
+
+    def guardar(self, ruta, ruta_gr, grafo):
+        """Escribe la jerarquía en disco asociada al .gr del que procede."""
+        st = os.stat(ruta_gr)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(CABECERA.pack(MAGIC, VERSION, self.num_nodos, grafo.num_arcos,
+                                  st.st_size, st.st_mtime_ns,
+                                  len(self.subida[1]), len(self.bajada[1])))
+            self.rango.tofile(f)
+            for datos in (self.subida, self.bajada):
+                for seccion in datos:
+                    seccion.tofile(f)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta, ruta_gr, grafo):
+        """Lee la jerarquía de disco; devuelve None si no existe o está desfasada."""
+        if not os.path.exists(ruta):
+            return None
+
+        st = os.stat(ruta_gr)
+        with open(ruta, "rb") as f:
+            datos = f.read(CABECERA.size)
+            if len(datos) < CABECERA.size:
+                return None
+            magic, version, num_nodos, num_arcos, tam_gr, mtime_gr, m_subida, m_bajada = \
+                CABECERA.unpack(datos)
+            if (magic != MAGIC or version != VERSION or num_nodos != grafo.num_nodos
+                    or num_arcos != grafo.num_arcos
+                    or tam_gr != st.st_size or mtime_gr != st.st_mtime_ns):
+                return None
+
+            try:
+                rango = _leer_array(f, 'i', num_nodos + 1)
+                partes = []
+                for m in (m_subida, m_bajada):
+                    partes.append((
+                        _leer_array(f, 'q', num_nodos + 2),
+                        _leer_array(f, 'i', m),
+                        _leer_array(f, 'i', m),
+                        _leer_array(f, 'i', m),
+                    ))
+            except EOFError:
+                return None
+
+        return cls(num_nodos, rango, partes[0], partes[1])
+
+    @classmethod
+    def cargar_o_construir(cls, grafo, ruta_base):
+        """Usa <ruta_base>.ch si está vigente; si no, preprocesa y lo guarda."""
+        ruta = ruta_base + EXTENSION
+        ruta_gr = ruta_base + ".gr"
+
+        jerarquia = cls.cargar(ruta, ruta_gr, grafo)
+        if jerarquia is None:
+            jerarquia = cls.construir(grafo)
+            try:
+                jerarquia.guardar(ruta, ruta_gr, grafo)
+            except OSError:
+                pass
+        return jerarquia
+
+    # -- Acceso a arcos -------------------------------------------------------
+
+    def arco(self, u, v):
+        """(peso, medio) del arco u -> v de la jerarquía (medio = SIN_MEDIO si es original)."""
+        if self.rango[u] < self.rango[v]:
+            offsets, destinos, pesos, medios = self.subida
+            buscado, tramo = v, u
+        else:
+            offsets, destinos, pesos, medios = self.bajada
+            buscado, tramo = u, v
+        for i in range(offsets[tramo], offsets[tramo + 1]):
+            if destinos[i] == buscado:
+                return pesos[i], medios[i]
+        raise KeyError(f"No existe el arco {u} -> {v} en la jerarquía")
+
+
+# -----------------------------------------------------------------------------
+# Clase ConsultaCH: búsqueda bidireccional ascendente
+# -----------------------------------------------------------------------------
+
+class ConsultaCH:
+    """
+    Resolutor de consultas punto a punto sobre una JerarquiaContraccion.
+
+    Ofrece la misma interfaz que AStar: resolver(inicio, fin) devuelve
+    (coste, camino), resolver_con_costes(inicio, fin) añade el coste de cada
+    arco y nodos_expandidos cuenta los nodos asentados.
+    """
+
+    def __init__(self, jerarquia):
+        """Inicializa el resolutor con una jerarquía ya construida o cargada."""
+        self.jerarquia = jerarquia
+        self.nodos_expandidos = 0
+        # Coste de cada arco del último camino (se obtiene al desempaquetar)
+        self._costes_camino = []
+
+    def resolver(self, inicio, fin):
+        """
+        Calcula el camino más corto entre inicio y fin.
+
+        Args:
+            inicio: ID del nodo de inicio
+            fin: ID del nodo objetivo
+        """
+        self.nodos_expandidos = 0
+        self._costes_camino = []
+        if inicio == fin:
+            return 0, [inicio]
+
+        jerarquia = self.jerarquia
+        arcos = (jerarquia.subida, jerarquia.bajada)
+        dist = ({inicio: 0}, {fin: 0})
+        # padre[lado][v] = (u, medio, peso) del arco por el que se alcanzó v
+        padre = ({}, {})
+        colas = ([(0, inicio)], [(0, fin)])
+
+        mu = math.inf
+        encuentro = None
+        lado = 1
+
+        while True:
+            # Cada sentido sigue mientras su mínimo pueda mejorar mu
+            activos = [l for l in (0, 1) if colas[l] and colas[l][0][0] < mu]
+            if not activos:
+                break
+            lado = 1 - lado if (1 - lado) in activos else lado
+            if lado not in activos:
+                lado = activos[0]
+
+            d, u = heapq.heappop(colas[lado])
+            if d > dist[lado][u]:
+                continue
+            self.nodos_expandidos += 1
+
+            # ¿Llega también la otra búsqueda a u?
+            d_otro = dist[1 - lado].get(u)
+            if d_otro is not None and d + d_otro < mu:
+                mu = d + d_otro
+                encuentro = u
+
+            offsets, vecinos, pesos, medios = arcos[lado]
+            dist_lado = dist[lado]
+            for i in range(offsets[u], offsets[u + 1]):
+                v = vecinos[i]
+                nd = d + pesos[i]
+                if nd < dist_lado.get(v, math.inf):
+                    dist_lado[v] = nd
+                    padre[lado][v] = (u, medios[i], pesos[i])
+                    heapq.heappush(colas[lado], (nd, v))
+
+        if encuentro is None:
+            return None, []
+
+        # Arcos de la jerarquía inicio -> encuentro (de la búsqueda hacia delante)
+        tramo = []
+        actual = encuentro
+        while actual != inicio:
+            anterior, medio, peso = padre[0][actual]
+            tramo.append((anterior, actual, medio, peso))
+            actual = anterior
+        tramo.reverse()
+
+        # Arcos encuentro -> fin (la búsqueda inversa guarda el siguiente nodo)
+        actual = encuentro
+        while actual != fin:
+            siguiente, medio, peso = padre[1][actual]
+            tramo.append((actual, siguiente, medio, peso))
+            actual = siguiente
+
+        camino = [inicio]
+        for u, v, medio, peso in tramo:
+            self._desempaquetar(u, v, medio, peso, camino, self._costes_camino)
+        return mu, camino
+
+    def resolver_con_costes(self, inicio, fin):
+        """
+        Como resolver(), pero devuelve también el coste de cada arco del camino.
+
+        Returns:
+            tuple: (coste, camino, costes_arcos) igual que AStar.resolver_con_costes
+        """
+        coste, camino = self.resolver(inicio, fin)
+        return coste, camino, self._costes_camino
+
+    def _desempaquetar(self, u, v, medio, peso, camino, costes):
+        """
+        Añade a 'camino' los nodos del arco u -> v tras u, expandiendo atajos,
+        y a 'costes' el peso de cada arco original recorrido.
+        """
+        pila = [(u, v, peso, medio)]
+        while pila:
+            a, b, p, m = pila.pop()
+            if m == SIN_MEDIO:
+                camino.append(b)
+                costes.append(p)
+            else:
+                # Se apila primero la segunda mitad para procesar antes la primera
+                pila.append((m, b, *self.jerarquia.arco(m, b)))
+                pila.append((a, m, *self.jerarquia.arco(a, m)))
+
+
+# -----------------------------------------------------------------------------
+# Funciones auxiliares del preproceso
+# -----------------------------------------------------------------------------
+
+def _atajos_necesarios(salientes, entrantes, v):
+    """
+    Atajos (u, w, coste) que harían falta al contraer v.
+
+    Para cada predecesor u se lanza una única búsqueda de testigos acotada por
+    el mayor coste u -> v -> w; si no encuentra un camino u -> w sin pasar
+    por v de coste menor o igual, el atajo es necesario.
+    """
+    atajos = []
+    sucesores = salientes[v]
+    if not sucesores:
+        return atajos
+
+    for u, (peso_uv, _) in entrantes[v].items():
+        objetivos = {w: peso_uv + peso_vw for w, (peso_vw, _) in sucesores.items() if w != u}
+        if not objetivos:
+            continue
+        dist = _busqueda_testigos(salientes, u, v, max(objetivos.values()), objetivos)
+        for w, coste in objetivos.items():
+            if dist.get(w, math.inf) > coste:
+                atajos.append((u, w, coste))
+    return atajos
+
+
+def _busqueda_testigos(salientes, origen, excluido, limite, objetivos):
+    """Dijkstra local desde origen que evita 'excluido' y se corta en 'limite'."""
+    dist = {origen: 0}
+    cola = [(0, origen)]
+    pendientes = set(objetivos)
+    asentados = 0
+
+    while cola:
+        d, x = heapq.heappop(cola)
+        if d > dist[x]:
+            continue
+        if d > limite:
+            break
+        pendientes.discard(x)
+        asentados += 1
+        if not pendientes or asentados > MAX_ASENTADOS_TESTIGO:
+            break
+        for y, (peso, _) in salientes[x].items():
+            if y == excluido:
+                continue
+            nd = d + peso
+            if nd < dist.get(y, math.inf):
+                dist[y] = nd
+                heapq.heappush(cola, (nd, y))
+    return dist
+
+
+def _a_csr(listas):
+    """Convierte una lista de listas [(vecino, peso, medio), ...] en arrays CSR."""
+    offsets = array('q', [0])
+    vecinos = array('i')
+    pesos = array('i')
+    medios = array('i')
+    for arcos in listas:
+        for v, peso, medio in arcos:
+            vecinos.append(v)
+            pesos.append(peso)
+            medios.append(medio)
+        offsets.append(len(vecinos))
+    return offsets, vecinos, pesos, medios
+
+
+def _leer_array(f, typecode, n):
+    """Lee n elementos de un fichero binario en un array."""
+    datos = array(typecode)
+    datos.fromfile(f, n)
+    return datos
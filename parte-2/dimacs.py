@@ -0,0 +1,288 @@
+"""
+Lectura masiva de ficheros DIMACS (.gr y .co).
+
+En lugar de procesar el fichero línea a línea con split()/int() en Python,
+se lee en bloques grandes de bytes, se localizan de una vez todas las líneas
+de un tipo ('a' o 'v') con una expresión regular y sus campos numéricos se
+convierten a enteros en una sola pasada (map(int) sobre los tokens), volcando
+el resultado directamente en arrays compactos.
+
+Para los mapas más grandes, leer_en_paralelo reparte los ficheros en rangos
+de bytes entre varios procesos, que escriben sus registros directamente en
+memoria compartida.
+
+Se mantiene la semántica del parser original: solo se consideran las líneas
+que empiezan por el prefijo en la primera columna y se ignoran los
+comentarios ('c'), la línea de problema ('p') y cualquier otra.
+"""
+
+import os
+import re
+import time
+from array import array
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+# -----------------------------------------------------------------------------
+# Parámetros de lectura
+# -----------------------------------------------------------------------------
+
+# Tamaño de cada bloque leído del disco
+TAM_BLOQUE = 32 * 1024 * 1024
+
+# Patrones por tipo de registro: capturan exactamente los campos numéricos
+# que usa el parser clásico (partes[1], partes[2], partes[3])
+PATRONES = {
+    b'a': re.compile(rb'^a\S*[ \t]+(-?\d+[ \t]+-?\d+[ \t]+-?\d+)', re.M),
+    b'v': re.compile(rb'^v\S*[ \t]+(-?\d+[ \t]+-?\d+[ \t]+-?\d+)', re.M),
+}
+
+
+def parsear_bloque(bloque, prefijo):
+    """
+    Convierte los registros de un bloque de bytes en un array de enteros.
+
+    El bloque debe contener líneas completas. Devuelve un array plano con
+    los tres campos de cada registro consecutivos: [c1, c2, c3, c1, c2, ...].
+    """
+    registros = PATRONES[prefijo].findall(bloque)
+    return array('q', map(int, b' '.join(registros).split()))
+
+
+def _bloques_registros(ruta, prefijo, inicio=0, fin=None):
+    """
+    Recorre un rango del fichero en bloques de como mucho TAM_BLOQUE bytes y
+    genera, por bloque, (campos, lineas): el array de parsear_bloque con sus
+    líneas completas y el número de líneas que contiene.
+    """
+    resto = b''
+    with open(ruta, 'rb') as f:
+        if fin is None:
+            fin = os.fstat(f.fileno()).st_size
+        f.seek(inicio)
+        # Nunca se pide más de lo que queda: read() reserva el tamaño pedido
+        pendiente = fin - inicio
+        while pendiente > 0:
+            datos = f.read(min(TAM_BLOQUE, pendiente))
+            if not datos:
+                break
+            pendiente -= len(datos)
+
+            # Solo se procesan líneas completas; el final se arrastra al siguiente bloque
+            bloque = resto + datos
+            corte = bloque.rfind(b'\n') + 1
+            resto = bloque[corte:]
+            yield parsear_bloque(bloque[:corte], prefijo), bloque.count(b'\n', 0, corte)
+
+    # Última línea sin salto de línea final
+    if resto:
+        yield parsear_bloque(resto, prefijo), 1
+
+
+def leer_registros(ruta, prefijo, inicio=0, fin=None):
+    """
+    Lee todos los registros de un tipo de un fichero DIMACS.
+
+    Args:
+        ruta: Ruta del fichero .gr o .co
+        prefijo: b'a' para arcos, b'v' para coordenadas
+        inicio, fin: Rango de bytes a procesar (por defecto, hasta el final
+                     del fichero). Deben coincidir con inicios de línea.
+
+    Returns:
+        tuple: (campos, lineas) donde campos es el array plano de enteros
+               devuelto por parsear_bloque y lineas el número de líneas leídas
+    """
+    campos = array('q')
+    lineas = 0
+    for parte, lineas_parte in _bloques_registros(ruta, prefijo, inicio, fin):
+        campos.extend(parte)
+        lineas += lineas_parte
+    return campos, lineas
+
+
+# -----------------------------------------------------------------------------
+# Lectura paralela por rangos de bytes
+# -----------------------------------------------------------------------------
+
+def dividir_rangos(ruta, partes):
+    """
+    Divide un fichero en como mucho 'partes' rangos de bytes [inicio, fin)
+    de tamaño similar, ajustando cada corte al comienzo de una línea.
+    """
+    tam = os.path.getsize(ruta)
+    cortes = [0]
+    with open(ruta, 'rb') as f:
+        for i in range(1, partes):
+            pos = tam * i // partes
+            if pos <= cortes[-1]:
+                continue
+            # Se avanza hasta el final de la línea en curso
+            f.seek(pos - 1)
+            f.readline()
+            corte = f.tell()
+            if cortes[-1] < corte < tam:
+                cortes.append(corte)
+    cortes.append(tam)
+    return list(zip(cortes, cortes[1:]))
+
+
+def _contar_rango(ruta, prefijo, inicio, fin):
+    """
+    Tarea de un proceso del pool: número de líneas del rango que empiezan por
+    el prefijo. Es una cota superior de sus registros (todo registro es una
+    de esas líneas) que se calcula mucho más deprisa que el parseo.
+    """
+    marca = b'\n' + prefijo
+    total = 0
+    tras_salto = True    # el rango empieza al comienzo de una línea
+    with open(ruta, 'rb') as f:
+        f.seek(inicio)
+        pendiente = fin - inicio
+        while pendiente > 0:
+            datos = f.read(min(TAM_BLOQUE, pendiente))
+            if not datos:
+                break
+            pendiente -= len(datos)
+            total += datos.count(marca)
+            # Línea que empieza justo en el borde entre dos lecturas
+            if tras_salto and datos[:1] == prefijo:
+                total += 1
+            tras_salto = datos[-1:] == b'\n'
+    return total
+
+
+def _trabajador_rango(nombre, posicion, ruta, prefijo, inicio, fin):
+    """
+    Tarea de un proceso del pool: interpreta un rango del fichero y escribe
+    sus campos en el bloque de memoria compartida 'nombre' a partir del
+    entero 'posicion', sin pasar por el proceso principal.
+
+    Returns:
+        tuple: (número de enteros escritos, líneas leídas)
+    """
+    bloque = shared_memory.SharedMemory(name=nombre)
+    try:
+        with bloque.buf.cast('q') as vista:
+            escritos = lineas = 0
+            for campos, lineas_parte in _bloques_registros(ruta, prefijo, inicio, fin):
+                vista[posicion + escritos:posicion + escritos + len(campos)] = campos
+                escritos += len(campos)
+                lineas += lineas_parte
+    finally:
+        bloque.close()
+    return escritos, lineas
+
+
+@contextmanager
+def leer_en_paralelo(ruta_co, ruta_gr, procesos, estadisticas=None):
+    """
+    Interpreta a la vez los registros 'v' del .co y 'a' del .gr en un pool
+    de procesos.
+
+    Cada fichero se divide en rangos proporcionales a su tamaño. Una primera
+    pasada (también en el pool) cuenta las líneas de registro de cada rango;
+    con ellas el proceso principal crea un único bloque de memoria
+    compartida por fichero y reparte entre los rangos sus tramos en el orden
+    del fichero. Cada trabajador escribe sus campos directamente en su tramo,
+    así que la semántica (p.ej. el último arco duplicado gana) es la misma
+    que en la lectura secuencial y el proceso principal no copia nada. Solo
+    si alguna línea con el prefijo no es un registro válido quedan huecos,
+    que se compactan en el sitio.
+
+    Es un gestor de contexto: entrega (campos_co, campos_gr) como vistas
+    (memoryview de enteros 'q') sobre los bloques compartidos, que se
+    liberan al salir del with; quien las use debe copiar lo que necesite.
+    Los bloques se liberan también si falla cualquier tarea.
+    """
+    t0 = time.perf_counter()
+    tam_co = os.path.getsize(ruta_co)
+    tam_gr = os.path.getsize(ruta_gr)
+    total = max(tam_co + tam_gr, 1)
+    ficheros = (
+        (ruta_co, b'v', dividir_rangos(ruta_co, max(1, round(procesos * tam_co / total)))),
+        (ruta_gr, b'a', dividir_rangos(ruta_gr, max(1, round(procesos * tam_gr / total)))),
+    )
+
+    # Un único resource_tracker compartido con los hijos: así los bloques que
+    # abren los trabajadores se dan de baja cuando el padre los libera
+    resource_tracker.ensure_running()
+
+    bloques = []
+    vistas = []
+    try:
+        lineas = 0
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            # 1) Cota de registros de cada rango
+            conteos = [
+                [pool.submit(_contar_rango, ruta, prefijo, inicio, fin) for inicio, fin in rangos]
+                for ruta, prefijo, rangos in ficheros
+            ]
+
+            # 2) Un bloque por fichero; cada rango escribe a partir de su posición
+            tareas = []
+            for (ruta, prefijo, rangos), futuros in zip(ficheros, conteos):
+                maximos = [3 * futuro.result() for futuro in futuros]
+                bloque = shared_memory.SharedMemory(create=True, size=max(8 * sum(maximos), 1))
+                bloques.append(bloque)
+                posicion = 0
+                tareas_fichero = []
+                for (inicio, fin), maximo in zip(rangos, maximos):
+                    tareas_fichero.append((posicion, pool.submit(
+                        _trabajador_rango, bloque.name, posicion, ruta, prefijo, inicio, fin)))
+                    posicion += maximo
+                tareas.append(tareas_fichero)
+
+            # 3) Tramos escritos, compactando los huecos si los hay
+            for bloque, tareas_fichero in zip(bloques, tareas):
+                vista = bloque.buf.cast('q')
+                vistas.append(vista)
+                escritura = 0
+                for posicion, futuro in tareas_fichero:
+                    escritos, lineas_rango = futuro.result()
+                    if posicion != escritura:
+                        vista[escritura:escritura + escritos] = vista[posicion:posicion + escritos]
+                    escritura += escritos
+                    lineas += lineas_rango
+                vistas.append(vista[:escritura])
+
+        if estadisticas is not None:
+            estadisticas.lineas += lineas
+            estadisticas.segundos += time.perf_counter() - t0
+
+        yield vistas[1], vistas[3]
+    finally:
+        # Las vistas derivadas primero; luego el bloque (si alguien conserva
+        # aún una vista, el mmap no se puede cerrar, pero se borra igual)
+        for vista in reversed(vistas):
+            vista.release()
+        for bloque in bloques:
+            try:
+                bloque.close()
+            except BufferError:
+                pass
+            bloque.unlink()
+
+
+class EstadisticasCarga:
+    """Acumula líneas y tiempo de parseo para informar del rendimiento."""
+
+    def __init__(self):
+        self.lineas = 0
+        self.segundos = 0.0
+
+    def medir(self, ruta, prefijo):
+        """Llama a leer_registros cronometrando y contabilizando las líneas."""
+        t0 = time.perf_counter()
+        campos, lineas = leer_registros(ruta, prefijo)
+        self.segundos += time.perf_counter() - t0
+        self.lineas += lineas
+        return campos
+
+    @property
+    def lineas_por_segundo(self):
+        """Tasa de parseo en líneas/s."""
+        if self.segundos <= 0:
+            return 0.0
+        return self.lineas / self.segundos
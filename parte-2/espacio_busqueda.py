@@ -0,0 +1,58 @@
+"""
+Espacio de trabajo reutilizable para las búsquedas sobre un Grafo.
+
+Los IDs de los nodos son densos (1..num_nodos), así que g(n), el predecesor
+y el estado de cada nodo caben en arrays planos reservados una sola vez, en
+lugar de diccionarios y conjuntos creados en cada consulta.
+
+Para no tener que limpiar los arrays entre consultas se usa una marca de
+generación por nodo: cada búsqueda recibe un número nuevo y un nodo solo se
+considera visitado (o cerrado) si su marca es la de la búsqueda actual; los
+valores de búsquedas anteriores quedan simplemente obsoletos.
+"""
+
+from array import array
+
+# Las marcas son enteros sin signo de 32 bits; al agotarse se reinician
+MAX_MARCA = 2**32 - 1
+
+# -----------------------------------------------------------------------------
+# Clase EspacioBusqueda: g(n), predecesores y estado por nodo
+# -----------------------------------------------------------------------------
+
+class EspacioBusqueda:
+    """
+    Arrays por nodo que una búsqueda reutiliza entre consultas.
+
+    Cada búsqueda llama a nueva_busqueda(), que fija la generación actual
+    'gen' (siempre par). Para un nodo v:
+        marca[v] <  gen     -> no visitado en esta búsqueda
+        marca[v] == gen     -> visitado: g[v] y came_from[v] son válidos
+        marca[v] == gen + 1 -> cerrado (ya expandido)
+
+    No es seguro compartir un mismo espacio entre búsquedas simultáneas
+    (hilos); cada resolutor usa el suyo.
+
+    Atributos:
+        g: Array (int64) con el coste desde el inicio de cada nodo visitado
+        came_from: Array (int32) con el predecesor de cada nodo visitado
+        marca: Array (uint32) con la generación en que se tocó cada nodo
+        gen: Generación de la búsqueda en curso
+    """
+
+    def __init__(self, num_nodos):
+        """Reserva los arrays para los nodos 0..num_nodos."""
+        self.num_nodos = num_nodos
+        self.g = array('q', bytes(8 * (num_nodos + 1)))
+        self.came_from = array('i', bytes(4 * (num_nodos + 1)))
+        self.marca = array('I', bytes(4 * (num_nodos + 1)))
+        self.gen = 0
+
+    def nueva_busqueda(self):
+        """Invalida en O(1) todo el estado de la búsqueda anterior."""
+        self.gen += 2
+        if self.gen >= MAX_MARCA:
+            # Tras 2^31 búsquedas las marcas se reinician de verdad
+            self.marca = array('I', bytes(4 * (self.num_nodos + 1)))
+            self.gen = 2
+        return self.gen
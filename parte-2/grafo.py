@@ -7,6 +7,12 @@ vecindad y costes de arcos.
 """
 
 import os
+import math
+from array import array
+
+import cache_grafo
+import dimacs
+from indice_espacial import IndiceEspacial
 
 # -----------------------------------------------------------------------------
 # Clase Grafo: Representación de mapas de carreteras
@@ -38,8 +44,29 @@ class Grafo:
         self.num_nodos = 0
         self.num_arcos = 0
 
-    def cargar_mapa(self, ruta_base):
-        """Carga un mapa desde los ficheros .gr y .co de DIMACS."""
+        # Rendimiento del último parseo de texto (None si se cargó de caché)
+        self.estadisticas_carga = None
+
+        # Términos por nodo de cada heurística geográfica (ver terminos_heuristica)
+        self._terminos_heuristica = {}
+
+        # Índice inverso (offsets, origenes, pesos), construido bajo demanda
+        self._inverso = None
+
+        # Rejilla para localizar nodos por coordenadas, construida bajo demanda
+        self._indice_espacial = None
+
+    def cargar_mapa(self, ruta_base, usar_cache=True, procesos=1):
+        """
+        Carga un mapa desde los ficheros .gr y .co de DIMACS.
+
+        Si usar_cache es True se intenta cargar antes la instantánea binaria
+        <ruta_base>.cache (ver cache_grafo); si no existe o está desfasada se
+        leen los ficheros de texto y se genera para la próxima vez.
+
+        Con procesos > 1 los ficheros de texto se trocean por rangos de bytes
+        y se interpretan en paralelo en un pool de procesos (ver dimacs).
+        """
         # Construcción de las rutas completas a los ficheros
         ruta_gr = ruta_base + ".gr"  # Fichero de arcos/distancias
         ruta_co = ruta_base + ".co"  # Fichero de coordenadas
@@ -48,48 +75,57 @@ class Grafo:
         if not os.path.exists(ruta_gr) or not os.path.exists(ruta_co):
             raise FileNotFoundError(f"No se encontraron los ficheros {ruta_gr} o {ruta_co}")
 
+        # Cualquier precálculo sobre un mapa anterior deja de ser válido
+        self._terminos_heuristica = {}
+        self._inverso = None
+        self._indice_espacial = None
+
+        # Camino rápido: instantánea binaria ya generada y vigente
+        if usar_cache and cache_grafo.cargar(self, ruta_base, ruta_gr, ruta_co):
+            return
+
         # Carga de datos en orden: primero coordenadas (para dimensionar), luego arcos
-        self._cargar_coordenadas(ruta_co)
-        self._cargar_arcos(ruta_gr)
+        self.estadisticas_carga = dimacs.EstadisticasCarga()
+        if procesos > 1:
+            # Ambos ficheros se interpretan a la vez, repartidos entre los procesos
+            # (los campos son vistas sobre memoria compartida, válidas dentro del with)
+            with dimacs.leer_en_paralelo(ruta_co, ruta_gr, procesos,
+                                         self.estadisticas_carga) as (campos_co, campos_gr):
+                self._procesar_coordenadas(campos_co)
+                self._procesar_arcos(campos_gr)
+        else:
+            self._cargar_coordenadas(ruta_co)
+            self._cargar_arcos(ruta_gr)
+
+        if usar_cache:
+            cache_grafo.guardar(self, ruta_base, ruta_gr, ruta_co)
 
     def _cargar_coordenadas(self, ruta):
         """
         Lee el fichero de coordenadas en formato DIMACS.
         Formato de línea: v <id> <longitud> <latitud>
         """
-        max_id = 0
-        temp_coords = {}
-        
-        # Primera pasada: leer todas las coordenadas y encontrar el ID máximo
-        with open(ruta, 'r') as f:
-            for linea in f:
-                # Procesamos solo las líneas que empiezan con 'v'
-                if linea.startswith('v'):
-                    partes = linea.split()
-                    # Formato: v <id> <longitud> <latitud>
-                    nid = int(partes[1])      # ID del nodo
-                    lon = int(partes[2])      # Longitud * 10^6
-                    lat = int(partes[3])      # Latitud * 10^6
-                    
-                    temp_coords[nid] = (lon, lat)
-                    
-                    # Actualizamos el ID máximo para dimensionar las listas
-                    if nid > max_id:
-                        max_id = nid
-        
+        # Lectura masiva: array plano [id, lon, lat, id, lon, lat, ...]
+        campos = self.estadisticas_carga.medir(ruta, b'v')
+        self._procesar_coordenadas(campos)
+
+    def _procesar_coordenadas(self, campos):
+        """Rellena las coordenadas a partir del array plano [id, lon, lat, ...]."""
+        ids = campos[0::3]    # ID del nodo
+        lons = campos[1::3]   # Longitud * 10^6
+        lats = campos[2::3]   # Latitud * 10^6
+
+        # El ID máximo dimensiona las listas (+1 porque DIMACS empieza en 1)
+        max_id = max(ids) if ids else 0
         self.num_nodos = max_id
-        
-        # Inicializamos listas con tamaño fijo para acceso directo por índice
-        # +1 porque los IDs de DIMACS empiezan en 1 (no en 0)
-        for i in range(max_id + 1):
-            self.coordenadas.append((0, 0))
 
-        for i in range(max_id + 1):
-            self.adyacencia.append({})
+        # Acceso directo por índice; los IDs sin coordenadas quedan en (0, 0)
+        self.coordenadas = [(0, 0)] * (max_id + 1)
+        coordenadas = self.coordenadas
+        for nid, lon, lat in zip(ids, lons, lats):
+            coordenadas[nid] = (lon, lat)
 
-        # Segunda pasada: asignar coordenadas a sus posiciones en la lista
-        for nid, coord in temp_coords.items():
-            self.coordenadas[nid] = coord
+        self.adyacencia = [{} for _ in range(max_id + 1)]
 
     def _cargar_arcos(self, ruta):
         """
@@ -97,24 +133,139 @@ class Grafo:
         Formato de línea: a <id_origen> <id_destino> <coste>
         El coste representa distancia en metros.
         """
-        count = 0
-        
-        with open(ruta, 'r') as f:
-            for linea in f:
-                # Procesamos solo las líneas que empiezan con 'a'
-                if linea.startswith('a'):
-                    # Formato: a <id_origen> <id_destino> <peso>
-                    partes = linea.split()
-                    u = int(partes[1])  # Nodo origen
-                    v = int(partes[2])  # Nodo destino
-                    w = int(partes[3])  # Coste del arco en metros
-                    
-                    # Guardamos el arco en la lista de adyacencia
-                    # Si hay arcos duplicados, se sobrescribe (quedamos con el último)
-                    self.adyacencia[u][v] = w
-                    count += 1
-        
-        self.num_arcos = count
+        # Lectura masiva: array plano [origen, destino, peso, origen, ...]
+        campos = self.estadisticas_carga.medir(ruta, b'a')
+        self._procesar_arcos(campos)
+
+    def _procesar_arcos(self, campos):
+        """Rellena la adyacencia a partir del array plano [origen, destino, peso, ...]."""
+        # Guardamos cada arco en la lista de adyacencia
+        # Si hay arcos duplicados, se sobrescribe (quedamos con el último)
+        adyacencia = self.adyacencia
+        for u, v, w in zip(campos[0::3], campos[1::3], campos[2::3]):
+            adyacencia[u][v] = w
+
+        self.num_arcos = len(campos) // 3
+
+    def _exportar_csr(self):
+        """Devuelve (offsets, destinos, pesos, longitudes, latitudes) en arrays CSR."""
+        offsets = array('q', [0])
+        destinos = array('i')
+        pesos = array('i')
+        for vecinos in self.adyacencia:
+            destinos.extend(vecinos.keys())
+            pesos.extend(vecinos.values())
+            # offsets[u + 1] marca el final del tramo de u
+            offsets.append(len(destinos))
+
+        longitudes = array('i', [lon for lon, _ in self.coordenadas])
+        latitudes = array('i', [lat for _, lat in self.coordenadas])
+        return offsets, destinos, pesos, longitudes, latitudes
+
+    def _importar_csr(self, offsets, destinos, pesos, longitudes, latitudes,
+                      num_nodos, num_arcos):
+        """Reconstruye las listas del grafo a partir de arrays CSR."""
+        self.num_nodos = num_nodos
+        self.num_arcos = num_arcos
+        self.coordenadas = list(zip(longitudes, latitudes))
+        self.adyacencia = [
+            dict(zip(destinos[offsets[u]:offsets[u + 1]], pesos[offsets[u]:offsets[u + 1]]))
+            for u in range(num_nodos + 1)
+        ]
+
+    def terminos_heuristica(self, heuristica="haversine"):
+        """
+        Términos por nodo que usa la heurística geográfica indicada de AStar,
+        calculados la primera vez que se piden y reutilizados después.
+
+        Solo se construyen los de la heurística pedida (24 bytes por nodo),
+        así que un grafo que solo se recorre con Dijkstra o ALT no los tiene.
+
+        Args:
+            heuristica: "haversine" o "cuerda"
+
+        Returns:
+            tuple: Tres arrays indexados por nodo: (rlat, rlon, cos_lat) con
+                   la latitud y longitud en radianes y el coseno de la
+                   latitud para "haversine", o (x, y, z) con las coordenadas
+                   cartesianas sobre la esfera unidad para "cuerda"
+        """
+        terminos = self._terminos_heuristica.get(heuristica)
+        if terminos is None:
+            terminos = self._calcular_terminos(heuristica)
+            self._terminos_heuristica[heuristica] = terminos
+        return terminos
+
+    def _calcular_terminos(self, heuristica):
+        """Calcula los arrays de terminos_heuristica(heuristica) sin guardarlos."""
+        if heuristica not in ("haversine", "cuerda"):
+            raise ValueError(f"Heurística desconocida: {heuristica}")
+        a = array('d')
+        b = array('d')
+        c = array('d')
+        for lon, lat in self.coordenadas:
+            # Misma conversión que la heurística original: grados * 10^6 -> radianes
+            la = math.radians(lat / 1000000.0)
+            lo = math.radians(lon / 1000000.0)
+            cos_la = math.cos(la)
+            if heuristica == "haversine":
+                a.append(la)
+                b.append(lo)
+                c.append(cos_la)
+            else:
+                a.append(cos_la * math.cos(lo))
+                b.append(cos_la * math.sin(lo))
+                c.append(math.sin(la))
+        return a, b, c
+
+    def _construir_inverso(self):
+        """
+        Construye el índice de arcos entrantes en formato CSR.
+
+        Como el grafo es dirigido, las búsquedas hacia atrás (bidireccional,
+        landmarks) necesitan recorrer para cada v los arcos u->v.
+        """
+        n = self.num_nodos
+
+        # 1) Grado de entrada de cada nodo y suma acumulada -> offsets
+        offsets = array('q', bytes(8 * (n + 2)))
+        for u in range(n + 1):
+            for v, _ in self.get_vecinos(u):
+                offsets[v + 1] += 1
+        for v in range(1, n + 2):
+            offsets[v] += offsets[v - 1]
+
+        # 2) Reparto de cada arco u->v en el tramo de v
+        siguiente = array('q', offsets)
+        origenes = array('i', bytes(4 * offsets[n + 1]))
+        pesos = array('i', bytes(4 * offsets[n + 1]))
+        for u in range(n + 1):
+            for v, w in self.get_vecinos(u):
+                p = siguiente[v]
+                origenes[p] = u
+                pesos[p] = w
+                siguiente[v] = p + 1
+
+        self._inverso = (offsets, origenes, pesos)
+
+    def get_predecesores(self, nodo):
+        """Obtiene los nodos con un arco hacia 'nodo' junto con su coste."""
+        if self._inverso is None:
+            self._construir_inverso()
+        offsets, origenes, pesos = self._inverso
+        ini = offsets[nodo]
+        fin = offsets[nodo + 1]
+        return zip(origenes[ini:fin], pesos[ini:fin])
+
+    def indice_espacial(self):
+        """
+        Índice para localizar los nodos más cercanos a unas coordenadas (ver
+        indice_espacial.IndiceEspacial). Se construye la primera vez que se
+        pide y se reutiliza mientras no se cargue otro mapa.
+        """
+        if self._indice_espacial is None:
+            self._indice_espacial = IndiceEspacial(self)
+        return self._indice_espacial
 
     def get_vecinos(self, nodo):
         """Obtiene los vecinos de un nodo con sus costes."""
@@ -126,4 +277,299 @@ class Grafo:
 
     def coste_arco(self, u, v):
         """Obtiene el coste del arco entre dos nodos."""
-        return self.adyacencia[u].get(v, float('inf'))
\ No newline at end of file
+        return self.adyacencia[u].get(v, float('inf'))
+
+# -----------------------------------------------------------------------------
+# Clase GrafoCSR: Representación compacta (Compressed Sparse Row)
+# -----------------------------------------------------------------------------
+
+class _VistaCoordenadas:
+    """
+    Vista de solo lectura que imita la lista grafo.coordenadas sobre los
+    arrays empaquetados de un GrafoCSR: vista[nodo] = (longitud, latitud).
+    """
+
+    def __init__(self, longitudes, latitudes):
+        self.longitudes = longitudes
+        self.latitudes = latitudes
+
+    def __len__(self):
+        return len(self.longitudes)
+
+    def __getitem__(self, nodo):
+        return (self.longitudes[nodo], self.latitudes[nodo])
+
+    def __iter__(self):
+        return zip(self.longitudes, self.latitudes)
+
+
+class GrafoCSR(Grafo):
+    """
+    Grafo dirigido almacenado en formato CSR sobre arrays compactos.
+
+    Mantiene la misma interfaz que Grafo (get_vecinos, get_coordenadas,
+    coste_arco) pero sustituye el diccionario por nodo y las tuplas de
+    coordenadas por arrays planos de enteros, lo que reduce varias veces
+    la memoria necesaria en los mapas grandes.
+
+    Atributos:
+        offsets: Array (int64) de tamaño num_nodos + 2. Los arcos que salen de u
+                 ocupan las posiciones [offsets[u], offsets[u+1]) de destinos/pesos
+        destinos: Array (int32) con el nodo destino de cada arco
+        pesos: Array (int32) con el coste de cada arco en metros
+        longitudes: Array (int32) con la longitud * 10^6 de cada nodo
+        latitudes: Array (int32) con la latitud * 10^6 de cada nodo
+    """
+
+    def __init__(self):
+        """Inicializa un grafo CSR vacío."""
+        super().__init__()
+        # En modo compacto no existe la lista de diccionarios
+        self.adyacencia = None
+
+        self.offsets = array('q')
+        self.destinos = array('i')
+        self.pesos = array('i')
+        self.longitudes = array('i')
+        self.latitudes = array('i')
+
+    def _procesar_coordenadas(self, campos):
+        """Rellena los arrays de longitudes y latitudes desde [id, lon, lat, ...]."""
+        self._asignar_coordenadas(campos[0::3], campos[1::3], campos[2::3])
+
+    def _asignar_coordenadas(self, ids, lons, lats):
+        """Coloca cada coordenada en la posición de su ID (indexación en 1)."""
+        max_id = max(ids) if ids else 0
+        self.num_nodos = max_id
+
+        # Arrays inicializados a 0: los IDs sin coordenadas quedan en (0, 0)
+        self.longitudes = array('i', bytes(4 * (max_id + 1)))
+        self.latitudes = array('i', bytes(4 * (max_id + 1)))
+        longitudes = self.longitudes
+        latitudes = self.latitudes
+        for nid, lon, lat in zip(ids, lons, lats):
+            longitudes[nid] = lon
+            latitudes[nid] = lat
+
+        self.coordenadas = _VistaCoordenadas(self.longitudes, self.latitudes)
+
+    def _procesar_arcos(self, campos):
+        """Construye el CSR a partir del array plano [origen, destino, peso, ...]."""
+        self._construir_csr(campos[0::3], campos[1::3], campos[2::3])
+
+    def _construir_csr(self, origenes, destinos, pesos):
+        """
+        Construye offsets/destinos/pesos a partir de la lista de arcos.
+
+        Se ordenan los arcos por origen con un counting sort estable y después
+        se eliminan los duplicados de cada nodo con la misma semántica que el
+        diccionario de Grafo: se conserva la posición de la primera aparición
+        y el coste de la última. Así el orden de vecinos coincide con el de
+        Grafo y A* expande exactamente los mismos nodos.
+        """
+        n = self.num_nodos
+        m = len(origenes)
+        # Igual que en Grafo, se cuentan todas las líneas 'a' (con duplicados)
+        self.num_arcos = m
+
+        # 1) Grado de salida de cada nodo y suma acumulada -> offsets
+        offsets = array('q', bytes(8 * (n + 2)))
+        for u in origenes:
+            offsets[u + 1] += 1
+        for u in range(1, n + 2):
+            offsets[u] += offsets[u - 1]
+
+        # 2) Reparto estable de los arcos en su tramo
+        siguiente = array('q', offsets)
+        csr_destinos = array('i', bytes(4 * m))
+        csr_pesos = array('i', bytes(4 * m))
+        for u, v, w in zip(origenes, destinos, pesos):
+            p = siguiente[u]
+            csr_destinos[p] = v
+            csr_pesos[p] = w
+            siguiente[u] = p + 1
+
+        # 3) Compactación in situ eliminando arcos duplicados (gana el último)
+        escritura = 0
+        for u in range(n + 1):
+            ini = offsets[u]
+            fin = offsets[u + 1]
+            offsets[u] = escritura
+            tramo = csr_destinos[ini:fin]
+            if len(set(tramo)) == fin - ini:
+                # Caso habitual: sin duplicados, solo se desplaza si hace falta
+                if escritura != ini:
+                    csr_destinos[escritura:escritura + fin - ini] = tramo
+                    csr_pesos[escritura:escritura + fin - ini] = csr_pesos[ini:fin]
+                escritura += fin - ini
+            else:
+                unicos = {}
+                for v, w in zip(tramo, csr_pesos[ini:fin]):
+                    unicos[v] = w
+                for v, w in unicos.items():
+                    csr_destinos[escritura] = v
+                    csr_pesos[escritura] = w
+                    escritura += 1
+        offsets[n + 1] = escritura
+        del csr_destinos[escritura:]
+        del csr_pesos[escritura:]
+
+        self.offsets = offsets
+        self.destinos = csr_destinos
+        self.pesos = csr_pesos
+
+    def _exportar_csr(self):
+        """Devuelve (offsets, destinos, pesos, longitudes, latitudes) en arrays CSR."""
+        return self.offsets, self.destinos, self.pesos, self.longitudes, self.latitudes
+
+    def _importar_csr(self, offsets, destinos, pesos, longitudes, latitudes,
+                      num_nodos, num_arcos):
+        """Adopta directamente los arrays CSR recibidos."""
+        self.num_nodos = num_nodos
+        self.num_arcos = num_arcos
+        self.offsets = offsets
+        self.destinos = destinos
+        self.pesos = pesos
+        self.longitudes = longitudes
+        self.latitudes = latitudes
+        self.coordenadas = _VistaCoordenadas(longitudes, latitudes)
+
+    def get_vecinos(self, nodo):
+        """Obtiene los vecinos de un nodo con sus costes."""
+        ini = self.offsets[nodo]
+        fin = self.offsets[nodo + 1]
+        return zip(self.destinos[ini:fin], self.pesos[ini:fin])
+
+    def get_coordenadas(self, nodo):
+        """Obtiene las coordenadas geográficas de un nodo."""
+        return (self.longitudes[nodo], self.latitudes[nodo])
+
+    def coste_arco(self, u, v):
+        """Obtiene el coste del arco entre dos nodos."""
+        ini = self.offsets[u]
+        fin = self.offsets[u + 1]
+        destinos = self.destinos
+        for i in range(ini, fin):
+            if destinos[i] == v:
+                return self.pesos[i]
+        return float('inf')
+
+
+# -----------------------------------------------------------------------------
+# Clase GrafoMmap: GrafoCSR sobre la caché binaria proyectada en memoria
+# -----------------------------------------------------------------------------
+
+class GrafoMmap(GrafoCSR):
+    """
+    GrafoCSR cuyos arrays (offsets, destinos, pesos, longitudes y latitudes)
+    son vistas de solo lectura sobre la caché <mapa>.cache proyectada en
+    memoria, sin copiarla (ver cache_grafo.proyectar).
+
+    Sirve para mapas que no caben cómodamente en RAM: el sistema operativo
+    carga y descarta páginas según se usan, y varios procesos que abren el
+    mismo mapa comparten una única copia física. Los términos de la
+    heurística geográfica también se proyectan desde disco (ver
+    terminos_heuristica). El índice inverso, el índice espacial y los arrays
+    de trabajo de cada búsqueda (EspacioBusqueda) sí se construyen en
+    memoria del proceso que los usa.
+
+    AStar y el resto de algoritmos lo usan igual que un GrafoCSR.
+    """
+
+    def __init__(self):
+        """Inicializa un grafo vacío sin proyección."""
+        super().__init__()
+        self._mapa = None
+        self._mapas_terminos = []
+        self._rutas = None   # (ruta_base, ruta_gr, ruta_co) del mapa proyectado
+
+    def cargar_mapa(self, ruta_base, usar_cache=True, procesos=1):
+        """
+        Proyecta la caché del mapa. Si no existe o está desfasada se genera
+        antes leyendo los ficheros de texto con un GrafoCSR temporal.
+
+        El grafo siempre trabaja sobre la caché, así que usar_cache no se
+        tiene en cuenta; procesos se usa si hay que interpretar el texto.
+
+        Raises:
+            FileNotFoundError: Si no existen los ficheros .gr o .co
+            OSError: Si no se puede escribir la caché
+        """
+        ruta_gr = ruta_base + ".gr"
+        ruta_co = ruta_base + ".co"
+        if not os.path.exists(ruta_gr) or not os.path.exists(ruta_co):
+            raise FileNotFoundError(f"No se encontraron los ficheros {ruta_gr} o {ruta_co}")
+
+        self.cerrar()
+        self.estadisticas_carga = None
+
+        self._mapa = cache_grafo.proyectar(self, ruta_base, ruta_gr, ruta_co)
+        if self._mapa is None:
+            temporal = GrafoCSR()
+            temporal.cargar_mapa(ruta_base, usar_cache=True, procesos=procesos)
+            self.estadisticas_carga = temporal.estadisticas_carga
+            del temporal
+            self._mapa = cache_grafo.proyectar(self, ruta_base, ruta_gr, ruta_co)
+            if self._mapa is None:
+                raise OSError(f"No se pudo generar la caché {cache_grafo.ruta_cache(ruta_base)}")
+        self._rutas = (ruta_base, ruta_gr, ruta_co)
+
+    def terminos_heuristica(self, heuristica="haversine"):
+        """
+        Como Grafo.terminos_heuristica, pero los arrays son vistas sobre
+        <mapa>.<heuristica>.terminos proyectado en memoria. El fichero se
+        genera la primera vez que algún proceso lo necesita y después lo
+        comparten todos. Si no se puede escribir, los términos se calculan
+        en memoria del proceso como en GrafoCSR.
+        """
+        terminos = self._terminos_heuristica.get(heuristica)
+        if terminos is not None:
+            return terminos
+        if self._rutas is None:
+            return super().terminos_heuristica(heuristica)
+
+        ruta_base, ruta_gr, ruta_co = self._rutas
+        proyectado = cache_grafo.proyectar_terminos(ruta_base, ruta_gr, ruta_co,
+                                                    heuristica, self.num_nodos)
+        if proyectado is None:
+            cache_grafo.guardar_terminos(self, ruta_base, ruta_gr, ruta_co, heuristica)
+            proyectado = cache_grafo.proyectar_terminos(ruta_base, ruta_gr, ruta_co,
+                                                        heuristica, self.num_nodos)
+        if proyectado is None:
+            return super().terminos_heuristica(heuristica)
+
+        mapa, terminos = proyectado
+        self._mapas_terminos.append(mapa)
+        self._terminos_heuristica[heuristica] = terminos
+        return terminos
+
+    def cerrar(self):
+        """
+        Libera las vistas y cierra las proyecciones; el grafo queda vacío. Si
+        alguien conserva todavía una vista (p.ej. un trozo de get_vecinos),
+        el fichero se libera cuando esta desaparece.
+        """
+        for terminos in self._terminos_heuristica.values():
+            for vista in terminos:
+                if isinstance(vista, memoryview):
+                    vista.release()
+        self._terminos_heuristica = {}
+        self._inverso = None
+        self._indice_espacial = None
+        self._rutas = None
+        mapas = self._mapas_terminos
+        self._mapas_terminos = []
+
+        if self._mapa is not None:
+            for vista in (self.offsets, self.destinos, self.pesos, self.longitudes, self.latitudes):
+                vista.release()
+            self._importar_csr(array('q'), array('i'), array('i'), array('i'), array('i'),
+                               num_nodos=0, num_arcos=0)
+            mapas.append(self._mapa)
+            self._mapa = None
+
+        for mapa in mapas:
+            try:
+                mapa.close()
+            except BufferError:
+                pass
@@ -0,0 +1,236 @@
+"""
+Índice espacial para localizar el nodo del grafo más cercano a un punto.
+
+Los nodos se representan por su posición (x, y, z) sobre la esfera unidad
+(los mismos términos que usa la heurística de la cuerda) y se reparten en
+una rejilla uniforme de celdas cúbicas. En la esfera, ordenar por distancia
+en línea recta (cuerda) es lo mismo que ordenar por distancia de círculo
+máximo, así que la búsqueda del más cercano es exacta.
+
+Una consulta recorre las capas de celdas alrededor del punto (distancia de
+Chebyshev r = 0, 1, 2...) y para en cuanto la siguiente capa ya no puede
+contener un nodo más cercano que los encontrados. Solo se guardan las celdas
+ocupadas, ordenadas por clave, para no reservar memoria para el espacio vacío.
+"""
+
+import math
+import heapq
+from array import array
+from bisect import bisect_left
+
+# Radio de la Tierra en metros (el mismo que AStar)
+RADIO_TIERRA = 6371000
+
+# Número medio de nodos por celda ocupada que se busca al elegir el lado
+NODOS_POR_CELDA = 2
+
+
+def _punto_esfera(lat, lon):
+    """Coordenadas (x, y, z) sobre la esfera unidad de una latitud/longitud en grados."""
+    la = math.radians(lat)
+    lo = math.radians(lon)
+    c = math.cos(la)
+    return c * math.cos(lo), c * math.sin(lo), math.sin(la)
+
+
+def _metros(cuerda):
+    """Distancia de círculo máximo correspondiente a una cuerda de la esfera unidad."""
+    return 2 * RADIO_TIERRA * math.asin(min(1.0, cuerda / 2))
+
+
+# -----------------------------------------------------------------------------
+# Clase IndiceEspacial: rejilla uniforme sobre los nodos de un grafo
+# -----------------------------------------------------------------------------
+
+class IndiceEspacial:
+    """
+    Rejilla de celdas sobre las coordenadas de los nodos 1..num_nodos.
+
+    No se construye directamente: Grafo.indice_espacial() la crea la primera
+    vez que se necesita y la reutiliza mientras no se cargue otro mapa.
+    """
+
+    def __init__(self, grafo):
+        """Reparte los nodos del grafo en celdas."""
+        self._x, self._y, self._z = grafo.terminos_heuristica("cuerda")
+        n = grafo.num_nodos
+
+        # Celdas ocupadas en CSR: claves ordenadas y nodos de cada celda
+        self._claves = array('q')
+        self._offsets = array('q', [0])
+        self._nodos = array('i')
+        if n == 0:
+            self._lado = 1.0
+            self._origen = (0.0, 0.0, 0.0)
+            self._dims = (0, 0, 0)
+            return
+
+        nodos = range(1, n + 1)
+        minimos = []
+        extensiones = []
+        for coord in (self._x, self._y, self._z):
+            valores = coord[1:n + 1]
+            minimos.append(min(valores))
+            extensiones.append(max(valores) - min(valores))
+
+        # Los nodos de un mapa ocupan una superficie: el lado se elige para que
+        # el área de las dos mayores extensiones dé NODOS_POR_CELDA por celda
+        mayores = sorted(extensiones)[1:]
+        area = mayores[0] * mayores[1] or max(mayores) ** 2
+        lado = math.sqrt(area * NODOS_POR_CELDA / n) if area > 0 else 0.0
+        self._lado = lado if lado > 0 else 1.0
+        self._origen = tuple(minimos)
+        self._dims = tuple(int(e / self._lado) + 1 for e in extensiones)
+
+        clave = self._clave
+        celdas = array('q', (clave(*self._celda(self._x[v], self._y[v], self._z[v]))
+                             for v in nodos))
+        orden = sorted(nodos, key=lambda v: celdas[v - 1])
+
+        for v in orden:
+            c = celdas[v - 1]
+            if not self._claves or self._claves[-1] != c:
+                if self._claves:
+                    self._offsets.append(len(self._nodos))
+                self._claves.append(c)
+            self._nodos.append(v)
+        self._offsets.append(len(self._nodos))
+
+    # -- Celdas ---------------------------------------------------------------
+
+    def _celda(self, x, y, z):
+        """Índices (ix, iy, iz) de la celda que contiene un punto (pueden caer fuera)."""
+        ox, oy, oz = self._origen
+        lado = self._lado
+        return (math.floor((x - ox) / lado), math.floor((y - oy) / lado),
+                math.floor((z - oz) / lado))
+
+    def _clave(self, ix, iy, iz):
+        """Clave única de una celda dentro de la rejilla."""
+        _, ny, nz = self._dims
+        return (ix * ny + iy) * nz + iz
+
+    def _capa(self, cx, cy, cz, r):
+        """Claves de las celdas de la rejilla a distancia de Chebyshev exactamente r."""
+        nx, ny, nz = self._dims
+        x0, x1 = max(cx - r, 0), min(cx + r, nx - 1)
+        y0, y1 = max(cy - r, 0), min(cy + r, ny - 1)
+        z0, z1 = max(cz - r, 0), min(cz + r, nz - 1)
+        for ix in range(x0, x1 + 1):
+            borde_x = abs(ix - cx) == r
+            for iy in range(y0, y1 + 1):
+                base = (ix * ny + iy) * nz
+                if borde_x or abs(iy - cy) == r:
+                    # Cara de la capa: toda la columna z
+                    for iz in range(z0, z1 + 1):
+                        yield base + iz
+                else:
+                    # Interior en x/y: solo las tapas z = cz ± r
+                    if 0 <= cz - r < nz:
+                        yield base + cz - r
+                    if r > 0 and 0 <= cz + r < nz:
+                        yield base + cz + r
+
+    def _recorrer(self, x, y, z, cota):
+        """
+        Genera (cuerda², nodo) de los nodos capa a capa. Tras cada capa r llama a
+        cota() (la mayor cuerda² que aún interesa) y termina si ninguna celda
+        de la capa r + 1 puede estar más cerca.
+
+        Si el punto queda lejos del mapa las capas recorren muchas celdas
+        vacías; cuando las celdas visitadas superan a las ocupadas se pasa a
+        recorrer directamente las celdas ocupadas que faltan.
+        """
+        cx, cy, cz = self._celda(x, y, z)
+        limites = [(c, d - 1 - c) for c, d in zip((cx, cy, cz), self._dims)]
+        # Primera capa que toca la rejilla y última que aún contiene celdas
+        r = max(max(-bajo, -alto, 0) for bajo, alto in limites)
+        r_max = max(max(bajo, alto) for bajo, alto in limites)
+
+        claves, offsets, nodos = self._claves, self._offsets, self._nodos
+        xs, ys, zs = self._x, self._y, self._z
+
+        def nodos_celda(i):
+            for p in range(offsets[i], offsets[i + 1]):
+                v = nodos[p]
+                dx = xs[v] - x
+                dy = ys[v] - y
+                dz = zs[v] - z
+                yield dx * dx + dy * dy + dz * dz, v
+
+        visitadas = 0
+        while r <= r_max:
+            for clave in self._capa(cx, cy, cz, r):
+                visitadas += 1
+                i = bisect_left(claves, clave)
+                if i < len(claves) and claves[i] == clave:
+                    yield from nodos_celda(i)
+
+            # Cualquier punto de la capa r + 1 está al menos a r lados de distancia
+            distancia_minima = r * self._lado
+            if distancia_minima * distancia_minima > cota():
+                return
+
+            if visitadas > len(claves):
+                # Recorrido directo de las celdas ocupadas de capas posteriores
+                _, ny, nz = self._dims
+                for i, clave in enumerate(claves):
+                    celda_xy, iz = divmod(clave, nz)
+                    ix, iy = divmod(celda_xy, ny)
+                    if max(abs(ix - cx), abs(iy - cy), abs(iz - cz)) > r:
+                        yield from nodos_celda(i)
+                return
+            r += 1
+
+    # -- Consultas ------------------------------------------------------------
+
+    def mas_cercano(self, lat, lon):
+        """
+        Nodo más cercano a (lat, lon) en grados por distancia de círculo máximo.
+
+        Returns:
+            tuple: (nodo, metros), o (None, math.inf) si el grafo no tiene nodos
+        """
+        vecinos = self.k_mas_cercanos(lat, lon, 1)
+        if not vecinos:
+            return None, math.inf
+        return vecinos[0]
+
+    def k_mas_cercanos(self, lat, lon, k):
+        """
+        Los k nodos más cercanos a (lat, lon), de menor a mayor distancia.
+        A igual distancia se prefiere el ID menor.
+
+        Returns:
+            list: [(nodo, metros), ...] con como mucho k elementos
+        """
+        if k <= 0:
+            return []
+        x, y, z = _punto_esfera(lat, lon)
+
+        # Montículo de máximos (valores negados) con los k mejores hasta ahora
+        mejores = []
+
+        def cota():
+            return -mejores[0][0] if len(mejores) == k else math.inf
+
+        for d2, v in self._recorrer(x, y, z, cota):
+            if len(mejores) < k:
+                heapq.heappush(mejores, (-d2, -v))
+            elif (d2, v) < (-mejores[0][0], -mejores[0][1]):
+                heapq.heapreplace(mejores, (-d2, -v))
+
+        return [(-menos_v, _metros(math.sqrt(-menos_d2)))
+                for menos_d2, menos_v in sorted(mejores, reverse=True)]
+
+    def ajustar(self, puntos):
+        """
+        Ajusta muchas coordenadas a la vez a su nodo más cercano.
+
+        Args:
+            puntos: Iterable de (lat, lon) en grados
+
+        Returns:
+            list: ID del nodo más cercano a cada punto (None si no hay nodos)
+        """
+        return [self.mas_cercano(lat, lon)[0] for lat, lon in puntos]
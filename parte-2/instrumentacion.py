@@ -0,0 +1,230 @@
+"""
+Instrumentación opcional de las búsquedas de AStar.
+
+Un AStar con el atributo 'instrumentacion' a None (lo normal) apenas cambia:
+resolver() comprueba ese atributo una vez por consulta y el motor clásico
+una variable local por expansión. Si se le asigna una Instrumentacion, la
+consulta se resuelve con el motor clásico y este sustituye la lista abierta,
+la heurística y el recorrido de vecinos por los envoltorios de una
+MedicionConsulta, que cuentan las operaciones de la lista abierta y de la
+heurística, reparten el tiempo entre heurística, frontera y recorrido de
+vecinos, y avisan de cada expansión a una función opcional.
+
+Los tiempos se miden con time.perf_counter alrededor de cada operación, así
+que una búsqueda instrumentada es bastante más lenta que una normal; lo que
+interesa es el reparto relativo, no el total.
+"""
+
+import time
+
+# -----------------------------------------------------------------------------
+# Clase Instrumentacion: contadores y tiempos acumulados de las búsquedas
+# -----------------------------------------------------------------------------
+
+class Instrumentacion:
+    """
+    Contadores y tiempos acumulados sobre todas las consultas instrumentadas
+    (reiniciar() los pone a cero).
+
+    Atributos:
+        consultas: Búsquedas instrumentadas
+        nodos_expandidos: Nodos extraídos y expandidos
+        inserciones: Entradas insertadas en la lista abierta
+        extracciones: Entradas extraídas de la lista abierta
+        extracciones_obsoletas: Extracciones de nodos ya cerrados (borrado perezoso)
+        mejoras: Veces que se mejora g(v) de un nodo ya visitado (decrease-key)
+        arcos_relajados: Arcos examinados al expandir
+        evaluaciones_heuristica: Llamadas a la heurística
+        max_frontera: Mayor tamaño alcanzado por la lista abierta
+        t_heuristica, t_frontera, t_vecinos: Segundos en la heurística, en las
+            operaciones de la lista abierta y en el resto del recorrido de vecinos
+        t_total: Segundos totales de las búsquedas
+        al_expandir: Función al_expandir(nodo, g, f, tam_frontera) llamada en
+            cada expansión, o None
+    """
+
+    # Contadores que se suman entre consultas (max_frontera se acumula con max)
+    CONTADORES = ("nodos_expandidos", "inserciones", "extracciones",
+                  "extracciones_obsoletas", "mejoras", "arcos_relajados",
+                  "evaluaciones_heuristica")
+    TIEMPOS = ("t_heuristica", "t_frontera", "t_vecinos", "t_total")
+
+    def __init__(self, al_expandir=None):
+        """Crea la instrumentación con los contadores a cero."""
+        self.al_expandir = al_expandir
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Pone a cero contadores y tiempos."""
+        self.consultas = 0
+        self.max_frontera = 0
+        for nombre in self.CONTADORES + self.TIEMPOS:
+            setattr(self, nombre, 0)
+
+    def nueva_consulta(self):
+        """MedicionConsulta para una búsqueda que se registrará aquí al terminar."""
+        return MedicionConsulta(self)
+
+    def registrar(self, max_frontera, **valores):
+        """Suma los contadores y tiempos de una consulta."""
+        self.consultas += 1
+        self.max_frontera = max(self.max_frontera, max_frontera)
+        for nombre, valor in valores.items():
+            setattr(self, nombre, getattr(self, nombre) + valor)
+
+    @property
+    def t_otros(self):
+        """Tiempo no atribuido a heurística, frontera ni vecinos (bucle, caminos, al_expandir)."""
+        return max(0.0, self.t_total - self.t_heuristica - self.t_frontera - self.t_vecinos)
+
+    def como_dict(self):
+        """Contadores y tiempos en un diccionario (p.ej. para guardarlos en JSON)."""
+        datos = {"consultas": self.consultas, "max_frontera": self.max_frontera}
+        for nombre in self.CONTADORES + self.TIEMPOS:
+            datos[nombre] = getattr(self, nombre)
+        datos["t_otros"] = self.t_otros
+        return datos
+
+    def lineas(self):
+        """Informe legible, una métrica por línea."""
+        lineas = [
+            f"consultas instrumentadas : {self.consultas}",
+            f"nodos expandidos         : {self.nodos_expandidos}",
+            f"inserciones en abierta   : {self.inserciones}",
+            f"extracciones             : {self.extracciones} "
+            f"({self.extracciones_obsoletas} obsoletas)",
+            f"mejoras de g (decrease)  : {self.mejoras}",
+            f"arcos relajados          : {self.arcos_relajados}",
+            f"evaluaciones heurística  : {self.evaluaciones_heuristica}",
+            f"tamaño máximo frontera   : {self.max_frontera}",
+        ]
+        total = self.t_total
+        for etiqueta, segundos in (("heurística", self.t_heuristica),
+                                   ("frontera", self.t_frontera),
+                                   ("vecinos", self.t_vecinos),
+                                   ("otros", self.t_otros)):
+            porcentaje = 100 * segundos / total if total > 0 else 0
+            lineas.append(f"tiempo {etiqueta:<18}: {segundos:.4f} s ({porcentaje:.1f}%)")
+        lineas.append(f"tiempo total             : {total:.4f} s")
+        return lineas
+
+
+# -----------------------------------------------------------------------------
+# Clase MedicionConsulta: envoltorios que miden las piezas de una búsqueda
+# -----------------------------------------------------------------------------
+
+class MedicionConsulta:
+    """
+    Mediciones de una única búsqueda de AStar.resolver (motor clásico).
+
+    El bucle usa abierta(), heuristica() y vecinos() en lugar de la lista
+    abierta, la heurística y Grafo.get_vecinos, y llama a terminar() al
+    acabar. Las extracciones obsoletas se deducen de las extracciones y los
+    nodos expandidos, y las mejoras de g son las inserciones de un nodo que
+    ya se había insertado (los nodos cerrados no se vuelven a insertar).
+    """
+
+    def __init__(self, instrumentacion):
+        """Empieza a medir una búsqueda."""
+        self.instrumentacion = instrumentacion
+        self.al_expandir = instrumentacion.al_expandir
+        self.reloj = time.perf_counter
+        self.t_inicio = self.reloj()
+        self.inserciones = self.extracciones = 0
+        self.mejoras = self.relajados = self.evaluaciones = 0
+        self.max_frontera = 0
+        self.t_heuristica = self.t_frontera = self.t_vecinos = 0.0
+        self.insertados = set()
+
+    def abierta(self, abierta):
+        """Envoltorio de la ListaAbierta que mide inserciones y extracciones."""
+        return _AbiertaMedida(abierta, self)
+
+    def heuristica(self, funcion):
+        """Envoltorio de funcion(nodo, objetivo) que cuenta y mide las evaluaciones."""
+        reloj = self.reloj
+
+        def medida(nodo, objetivo):
+            t0 = reloj()
+            h = funcion(nodo, objetivo)
+            self.t_heuristica += reloj() - t0
+            self.evaluaciones += 1
+            return h
+        return medida
+
+    def vecinos(self, funcion):
+        """
+        Envoltorio de funcion(nodo) -> (vecino, peso) que cuenta los arcos y
+        mide el recorrido completo de los vecinos, descontando el tiempo de la
+        heurística y de las inserciones hechas dentro del recorrido.
+        """
+        reloj = self.reloj
+
+        def medidos(nodo):
+            t0 = reloj()
+            anidado = self.t_heuristica + self.t_frontera
+            for arco in funcion(nodo):
+                self.relajados += 1
+                yield arco
+            anidado = self.t_heuristica + self.t_frontera - anidado
+            self.t_vecinos += reloj() - t0 - anidado
+        return medidos
+
+    def terminar(self, nodos_expandidos, encontrado):
+        """Registra la búsqueda en la Instrumentacion."""
+        # Cada extracción es del objetivo, de una entrada obsoleta o una expansión
+        obsoletas = self.extracciones - nodos_expandidos - (1 if encontrado else 0)
+        self.instrumentacion.registrar(
+            self.max_frontera,
+            nodos_expandidos=nodos_expandidos,
+            inserciones=self.inserciones,
+            extracciones=self.extracciones,
+            extracciones_obsoletas=obsoletas,
+            mejoras=self.mejoras,
+            arcos_relajados=self.relajados,
+            evaluaciones_heuristica=self.evaluaciones,
+            t_heuristica=self.t_heuristica,
+            t_frontera=self.t_frontera,
+            t_vecinos=self.t_vecinos,
+            t_total=self.reloj() - self.t_inicio,
+        )
+
+
+class _AbiertaMedida:
+    """ListaAbierta que anota sus operaciones en una MedicionConsulta."""
+
+    def __init__(self, abierta, medicion):
+        """Envuelve 'abierta' anotando en 'medicion'."""
+        self.abierta = abierta
+        self.medicion = medicion
+
+    def push(self, nodo, f_score):
+        """ListaAbierta.push midiendo su tiempo, inserciones, mejoras y tamaño."""
+        medicion = self.medicion
+        t0 = medicion.reloj()
+        self.abierta.push(nodo, f_score)
+        medicion.t_frontera += medicion.reloj() - t0
+        medicion.inserciones += 1
+        if nodo in medicion.insertados:
+            medicion.mejoras += 1
+        else:
+            medicion.insertados.add(nodo)
+        if len(self.abierta) > medicion.max_frontera:
+            medicion.max_frontera = len(self.abierta)
+
+    def pop(self):
+        """ListaAbierta.pop midiendo su tiempo y las extracciones."""
+        medicion = self.medicion
+        t0 = medicion.reloj()
+        entrada = self.abierta.pop()
+        medicion.t_frontera += medicion.reloj() - t0
+        medicion.extracciones += 1
+        return entrada
+
+    def is_empty(self):
+        """Como ListaAbierta.is_empty."""
+        return self.abierta.is_empty()
+
+    def __len__(self):
+        """Como ListaAbierta.__len__."""
+        return len(self.abierta)
@@ -0,0 +1,147 @@
+"""
+Matrices de distancias origen × destino sobre un Grafo.
+
+En lugar de lanzar AStar.resolver para cada par (N² búsquedas), se hace una
+única búsqueda Dijkstra desde cada origen que se detiene en cuanto ha
+asentado todos los destinos pedidos: una matriz de 100 × 100 cuesta unas 100
+búsquedas, y cada una solo explora hasta el destino más lejano.
+
+Los costes se guardan fila a fila en un array('q') plano, compatible con el
+protocolo de buffer (p.ej. numpy.frombuffer(matriz.costes, dtype='int64')
+.reshape(filas, columnas) si se dispone de NumPy).
+"""
+
+import heapq
+from array import array
+
+# Coste de un par sin camino en el array de costes
+INALCANZABLE = -1
+
+
+def busqueda_uno_a_muchos(grafo, origen, objetivos):
+    """
+    Dijkstra desde 'origen' que termina al asentar todos los 'objetivos'.
+
+    Returns:
+        tuple: (dist, came_from, nodos_expandidos) donde dist contiene la
+               distancia definitiva de cada objetivo alcanzable y came_from
+               los predecesores para reconstruir sus caminos
+    """
+    dist = {origen: 0}
+    came_from = {}
+    asentados = set()
+    pendientes = set(objetivos)
+    frontera = [(0, origen)]
+
+    while frontera and pendientes:
+        d_u, u = heapq.heappop(frontera)
+        # Entrada obsoleta: u ya se asentó con una distancia menor
+        if u in asentados:
+            continue
+        asentados.add(u)
+        pendientes.discard(u)
+
+        for v, peso in grafo.get_vecinos(u):
+            if v in asentados:
+                continue
+            d_v = d_u + peso
+            if v not in dist or d_v < dist[v]:
+                dist[v] = d_v
+                came_from[v] = u
+                heapq.heappush(frontera, (d_v, v))
+
+    return dist, came_from, len(asentados)
+
+
+def _reconstruir(came_from, inicio, fin):
+    """Camino inicio -> fin siguiendo los predecesores."""
+    camino = [fin]
+    while camino[-1] != inicio:
+        camino.append(came_from[camino[-1]])
+    camino.reverse()
+    return camino
+
+
+# -----------------------------------------------------------------------------
+# Clase MatrizDistancias: costes (y caminos) de todos los pares
+# -----------------------------------------------------------------------------
+
+class MatrizDistancias:
+    """
+    Matriz de costes mínimos entre una lista de orígenes y otra de destinos.
+
+    Atributos:
+        origenes: IDs de las filas
+        destinos: IDs de las columnas
+        costes: array('q') de len(origenes) * len(destinos) elementos, fila a
+                fila; INALCANZABLE si no hay camino
+        caminos: caminos[i][j] con la lista de nodos del camino (o []), o
+                 None si no se pidieron
+        nodos_expandidos: Nodos asentados en total por todas las búsquedas
+    """
+
+    def __init__(self, origenes, destinos, costes, caminos=None, nodos_expandidos=0):
+        self.origenes = origenes
+        self.destinos = destinos
+        self.costes = costes
+        self.caminos = caminos
+        self.nodos_expandidos = nodos_expandidos
+
+    @classmethod
+    def calcular(cls, grafo, origenes, destinos=None, caminos=False):
+        """
+        Calcula la matriz con una búsqueda uno-a-muchos por origen distinto.
+
+        Args:
+            grafo: Instancia de Grafo
+            origenes: Lista de IDs de origen
+            destinos: Lista de IDs de destino (por defecto, los mismos orígenes)
+            caminos: Si es True se guardan también los caminos de cada par
+        """
+        origenes = list(origenes)
+        destinos = origenes if destinos is None else list(destinos)
+        columnas = len(destinos)
+
+        costes = array('q', [INALCANZABLE]) * (len(origenes) * columnas)
+        tabla_caminos = [] if caminos else None
+        expandidos = 0
+
+        # Un origen repetido reutiliza la fila ya calculada
+        filas_hechas = {}
+        for i, origen in enumerate(origenes):
+            fila = i * columnas
+            if origen in filas_hechas:
+                previa = filas_hechas[origen] * columnas
+                costes[fila:fila + columnas] = costes[previa:previa + columnas]
+                if caminos:
+                    tabla_caminos.append(tabla_caminos[filas_hechas[origen]])
+                continue
+            filas_hechas[origen] = i
+
+            dist, came_from, asentados = busqueda_uno_a_muchos(grafo, origen, destinos)
+            expandidos += asentados
+            for j, destino in enumerate(destinos):
+                if destino in dist:
+                    costes[fila + j] = dist[destino]
+            if caminos:
+                tabla_caminos.append([
+                    _reconstruir(came_from, origen, destino) if destino in dist else []
+                    for destino in destinos
+                ])
+
+        return cls(origenes, destinos, costes, tabla_caminos, expandidos)
+
+    def coste(self, i, j):
+        """Coste del origen i al destino j (índices), o None si no hay camino."""
+        valor = self.costes[i * len(self.destinos) + j]
+        return None if valor == INALCANZABLE else valor
+
+    def camino(self, i, j):
+        """Camino del origen i al destino j (índices); requiere caminos=True."""
+        if self.caminos is None:
+            raise ValueError("La matriz se calculó sin caminos (caminos=False)")
+        return self.caminos[i][j]
+
+    def fila(self, i):
+        """Lista de costes del origen i a todos los destinos (None si no hay camino)."""
+        return [self.coste(i, j) for j in range(len(self.destinos))]
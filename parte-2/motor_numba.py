@@ -0,0 +1,119 @@
+"""
+Bucle de A* compilado con Numba (motor "numba" de AStar).
+
+Numba es opcional: si no está instalado DISPONIBLE es False y AStar usa el
+motor "rapido" en Python puro. La función compilada recibe directamente los
+arrays CSR del grafo, los términos de la heurística y los arrays del
+EspacioBusqueda (todos ellos exponen el protocolo de buffer, así que no se
+copian) y reproduce exactamente el bucle de AStar._resolver_rapido: mismas
+entradas (f, orden, nodo) en el montículo y la heurística con las mismas
+operaciones, de modo que el orden de expansión y el resultado no cambian.
+
+La primera llamada incluye el tiempo de compilación; con cache=True el
+código compilado se guarda en __pycache__ para las siguientes ejecuciones.
+"""
+
+import math
+import heapq
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+DISPONIBLE = numba is not None
+
+# Mismos valores que algoritmo.H_* (no se importa algoritmo para evitar el ciclo)
+_H_HAVERSINE = 0
+_H_CUERDA = 1
+
+
+def _buscar(offsets, destinos, pesos, ta, tb, tc,
+            modo, radio, inicio, fin, g_score, came_from, marca, gen):
+    """
+    A* de inicio a fin sobre el CSR. Deja g(n) y los predecesores en los
+    arrays del espacio de búsqueda.
+
+    ta, tb, tc son los términos por nodo de la heurística en uso
+    (Grafo.terminos_heuristica): (rlat, rlon, cos_lat) con Haversine,
+    (x, y, z) con la cuerda; con h = 0 no se leen y pueden estar vacíos.
+
+    Returns:
+        tuple: (encontrado, coste, nodos_expandidos)
+    """
+    cerrado = gen + 1
+    g_score[inicio] = 0
+    marca[inicio] = gen
+
+    # Mismos nombres que en AStar._resolver_rapido para cada heurística
+    rlat, rlon, cos_lat = ta, tb, tc
+    xs, ys, zs = ta, tb, tc
+    rlat2 = rlon2 = cos_lat2 = x2 = y2 = z2 = 0.0
+    if modo == _H_HAVERSINE or modo == _H_CUERDA:
+        rlat2 = x2 = ta[fin]
+        rlon2 = y2 = tb[fin]
+        cos_lat2 = z2 = tc[fin]
+
+    # h(inicio), igual que en el bucle
+    if modo == _H_HAVERSINE:
+        dlat = rlat2 - rlat[inicio]
+        dlon = rlon2 - rlon[inicio]
+        a = math.sin(dlat / 2)**2 + cos_lat[inicio] * cos_lat2 * math.sin(dlon / 2)**2
+        h_inicial = radio * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+    elif modo == _H_CUERDA:
+        dx = xs[inicio] - x2
+        dy = ys[inicio] - y2
+        dz = zs[inicio] - z2
+        h_inicial = radio * math.sqrt(dx * dx + dy * dy + dz * dz)
+    else:
+        h_inicial = 0.0
+
+    frontera = [(h_inicial, 0, int(inicio))]
+    contador = 1
+    expandidos = 0
+
+    while len(frontera) > 0:
+        entrada = heapq.heappop(frontera)
+        u = entrada[2]
+
+        if u == fin:
+            return True, g_score[u], expandidos
+
+        if marca[u] == cerrado:
+            continue
+        marca[u] = cerrado
+        expandidos += 1
+        g_u = g_score[u]
+
+        for i in range(offsets[u], offsets[u + 1]):
+            v = int(destinos[i])
+            marca_v = marca[v]
+            if marca_v == cerrado:
+                continue
+            tentative_g = g_u + pesos[i]
+            if marca_v != gen or tentative_g < g_score[v]:
+                g_score[v] = tentative_g
+                marca[v] = gen
+
+                if modo == _H_HAVERSINE:
+                    dlat = rlat2 - rlat[v]
+                    dlon = rlon2 - rlon[v]
+                    a = math.sin(dlat / 2)**2 + cos_lat[v] * cos_lat2 * math.sin(dlon / 2)**2
+                    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+                    h_v = radio * c
+                elif modo == _H_CUERDA:
+                    dx = xs[v] - x2
+                    dy = ys[v] - y2
+                    dz = zs[v] - z2
+                    h_v = radio * math.sqrt(dx * dx + dy * dy + dz * dz)
+                else:
+                    h_v = 0.0
+
+                heapq.heappush(frontera, (tentative_g + h_v, contador, v))
+                contador += 1
+                came_from[v] = u
+
+    return False, 0, expandidos
+
+
+buscar = numba.njit(cache=True)(_buscar) if DISPONIBLE else None
@@ -2,64 +2,291 @@
 # -*- coding: utf-8 -*-
 
 import sys
+import argparse
+import functools
 import time
 import os
-from grafo import Grafo
-from algoritmo import AStar
+from grafo import Grafo, GrafoCSR, GrafoMmap
+from algoritmo import AStar, AStarBidireccional
+from alt import AStarALT, Landmarks
+from contraccion import ConsultaCH, JerarquiaContraccion
+from instrumentacion import Instrumentacion
+import consultas
+import motor_numba
+import salida
+import servidor
 
 # -----------------------------------------------------------------------------
 # Parte 2: Algoritmo de búsqueda óptimo (A*)
 # -----------------------------------------------------------------------------
 
+USO = (
+    "./parte-2.py <id_inicio> <id_fin> <nombre_mapa> <fichero_salida> [opciones]\n"
+    "       ./parte-2.py --servidor <nombre_mapa> [--socket RUTA] [--trabajadores N] [opciones]\n"
+    "       ./parte-2.py --lote <fichero_consultas> <nombre_mapa> <fichero_salida> "
+    "[--trabajadores N] [opciones]"
+)
+
+
+def cargar_grafo(args, ruta_mapa, log):
+    """Carga el mapa con las opciones de la línea de órdenes o termina con error."""
+    log(f"Cargando grafo desde {ruta_mapa}...")
+
+    # Instanciación del objeto Grafo (representación CSR si se pide --compacto,
+    # CSR sobre la caché proyectada en memoria con --mmap)
+    if args.mmap:
+        grafo = GrafoMmap()
+    elif args.compacto:
+        grafo = GrafoCSR()
+    else:
+        grafo = Grafo()
+
+    # El nombre del mapa puede ser una ruta absoluta o relativa
+    # El método cargar_mapa() buscará automáticamente los ficheros .gr y .co
+    try:
+        t_carga_inicio = time.time()
+        # Carga de los ficheros .gr (arcos) y .co (coordenadas)
+        grafo.cargar_mapa(ruta_mapa, usar_cache=not args.sin_cache, procesos=args.procesos)
+        t_carga_fin = time.time()
+    except Exception as e:
+        log(f"Error cargando el grafo: {e}")
+        sys.exit(1)
+
+    # Rendimiento del parseo (solo si se han leído los ficheros de texto)
+    estadisticas = grafo.estadisticas_carga
+    if estadisticas is not None:
+        log(f"Parseo DIMACS: {estadisticas.lineas} líneas en {estadisticas.segundos:.2f} s "
+            f"({estadisticas.lineas_por_segundo:.0f} líneas/s)")
+    else:
+        log(f"Grafo cargado desde caché en {t_carga_fin - t_carga_inicio:.2f} s")
+    return grafo
+
+
+def crear_solver(args, grafo, ruta_mapa, log, motor=None):
+    """Crea el resolutor del algoritmo elegido, preparando su preproceso si lo tiene."""
+    motor = motor or args.motor
+    if args.algoritmo == "alt":
+        t_lmk = time.time()
+        landmarks = Landmarks.cargar_o_calcular(grafo, ruta_mapa, k=args.landmarks)
+        log(f"Landmarks preparados en {time.time() - t_lmk:.2f} s: {landmarks.nodos}")
+        return AStarALT(grafo, landmarks, motor=motor)
+    if args.algoritmo == "ch":
+        t_ch = time.time()
+        jerarquia = JerarquiaContraccion.cargar_o_construir(grafo, ruta_mapa)
+        log(f"Jerarquía de contracción preparada en {time.time() - t_ch:.2f} s")
+        return ConsultaCH(jerarquia)
+    if args.algoritmo == "bidireccional":
+        return AStarBidireccional(grafo, heuristica=args.heuristica)
+    return AStar(grafo, heuristica=args.heuristica, motor=motor)
+
+
+def modo_servidor(args, ruta_mapa):
+    """Carga el mapa una vez y atiende consultas por stdin o por un socket Unix."""
+    # Con el protocolo por stdout los mensajes de estado van a stderr
+    log = functools.partial(print, file=sys.stderr, flush=True)
+
+    grafo = cargar_grafo(args, ruta_mapa, log)
+    solver = crear_solver(args, grafo, ruta_mapa, log)
+
+    # El pool se crea después de preparar: los trabajadores heredan grafo y solver
+    consultas.preparar(grafo, solver)
+    with consultas.crear_pool(args.trabajadores) as pool:
+        if args.socket:
+            log(f"Servidor escuchando en {args.socket} con {args.trabajadores} trabajadores")
+            try:
+                servidor.servir_socket(pool, args.socket)
+            except OSError as e:
+                log(f"Error en el socket: {e}")
+                sys.exit(1)
+        else:
+            log(f"Servidor listo: '<id_inicio> <id_fin>' por línea, 'salir' para terminar")
+            servidor.servir_stdin(pool)
+
+
+def leer_consultas(ruta, num_nodos):
+    """
+    Lee un fichero de consultas con un par '<id_inicio> <id_fin>' por línea
+    (se ignoran las líneas vacías y las que empiezan por '#').
+
+    Raises:
+        ValueError: Si alguna línea no es un par de IDs válidos del grafo
+    """
+    pares = []
+    with open(ruta) as f:
+        for num_linea, linea in enumerate(f, 1):
+            campos = linea.split()
+            if not campos or campos[0].startswith("#"):
+                continue
+            try:
+                if len(campos) != 2:
+                    raise ValueError
+                inicio, fin = int(campos[0]), int(campos[1])
+            except ValueError:
+                raise ValueError(f"{ruta}:{num_linea}: se esperaba '<id_inicio> <id_fin>'") from None
+            if not (1 <= inicio <= num_nodos and 1 <= fin <= num_nodos):
+                raise ValueError(f"{ruta}:{num_linea}: vértice fuera del rango 1..{num_nodos}")
+            pares.append((inicio, fin))
+    return pares
+
+
+def modo_lote(args, ruta_mapa, fichero_salida):
+    """Resuelve todas las consultas de un fichero cargando el mapa una sola vez."""
+    grafo = cargar_grafo(args, ruta_mapa, print)
+    try:
+        pares = leer_consultas(args.lote, grafo.num_nodos)
+    except (OSError, ValueError) as e:
+        print(f"Error leyendo consultas: {e}")
+        sys.exit(1)
+    solver = crear_solver(args, grafo, ruta_mapa, print)
+    print(f"Resolviendo {len(pares)} consultas con {args.trabajadores} trabajadores...")
+
+    # El pool se crea después de preparar: los trabajadores heredan grafo y solver
+    consultas.preparar(grafo, solver)
+    t_inicio = time.time()
+    expansiones = 0
+    sin_solucion = 0
+    try:
+        with consultas.crear_pool(args.trabajadores) as pool, \
+                salida.EscritorRutas(fichero_salida, args.formato, grafo) as escritor:
+            # Una ruta por consulta, en el orden del fichero de entrada
+            resultados = consultas.resolver_lote(pool, pares, args.trabajadores)
+            for (inicio, fin), (coste, camino, costes_arcos, expandidos, _) in zip(pares, resultados):
+                expansiones += expandidos
+                if not camino:
+                    sin_solucion += 1
+                escritor.escribir(inicio, fin, coste, camino, costes_arcos)
+    except IOError as e:
+        print(f"Error escribiendo fichero de salida: {e}")
+        sys.exit(1)
+    tiempo_total = time.time() - t_inicio
+
+    # Rendimiento global del lote (incluye el reparto entre procesos)
+    tasa = len(pares) / tiempo_total if tiempo_total > 0 else 0
+    print(f"{len(pares)} consultas resueltas en {tiempo_total:.2f} s ({tasa:.1f} consultas/s), "
+          f"{sin_solucion} sin solución")
+    print(f"# expansiones : {expansiones}")
+    print(f"Soluciones guardadas en {fichero_salida}")
+
+
 def main():
 
     # 1) Validar argumentos
     # Nota: Para ejecutar el scirpt con ./parte-2.py en Linux, se debe dar permisos de ejecución con chmod +x parte-2.py
-    if len(sys.argv) != 5:
-        print("Uso: ./parte-2.py <id_inicio> <id_fin> <nombre_mapa> <fichero_salida>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(usage=USO)
+    parser.add_argument("argumentos", nargs="*",
+                        help="<id_inicio> <id_fin> <nombre_mapa> <fichero_salida>; "
+                             "solo <nombre_mapa> con --servidor; "
+                             "<nombre_mapa> <fichero_salida> con --lote")
+    parser.add_argument("--compacto", action="store_true",
+                        help="almacena el grafo en formato CSR (menos memoria)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="no lee ni genera la caché binaria <nombre_mapa>.cache")
+    parser.add_argument("--mmap", action="store_true",
+                        help="trabaja directamente sobre la caché <nombre_mapa>.cache "
+                             "proyectada en memoria, sin copiarla (formato CSR)")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="procesos para interpretar los ficheros DIMACS en paralelo")
+    parser.add_argument("--heuristica", choices=AStar.HEURISTICAS, default="haversine",
+                        help="heurística de A* (cuerda: cota más barata de calcular)")
+    parser.add_argument("--algoritmo", choices=("astar", "alt", "bidireccional", "ch"),
+                        default="astar",
+                        help="alt: A* con landmarks (preproceso guardado en <nombre_mapa>.lmk); "
+                             "bidireccional: A* simultáneo desde inicio y fin; "
+                             "ch: jerarquías de contracción (preproceso en <nombre_mapa>.ch)")
+    parser.add_argument("--motor", choices=AStar.MOTORES, default="clasico",
+                        help="implementación del bucle de A* (astar y alt): rapido usa solo "
+                             "variables locales; numba lo compila si Numba está instalado")
+    parser.add_argument("--comparar-motor", action="store_true",
+                        help="repite la consulta con el motor clasico y muestra la aceleración "
+                             "del motor elegido")
+    parser.add_argument("--landmarks", type=int, default=8,
+                        help="número de landmarks para --algoritmo alt")
+    parser.add_argument("--formato", choices=salida.FORMATOS, default="texto",
+                        help="formato del fichero de salida: texto (el de la práctica), "
+                             "binario (enteros compactos) o geojson (con coordenadas)")
+    parser.add_argument("--instrumentar", action="store_true",
+                        help="muestra contadores de la búsqueda y el reparto del tiempo "
+                             "entre heurística, frontera y vecinos (astar y alt)")
+    parser.add_argument("--traza", metavar="FICHERO",
+                        help="escribe una línea '<nodo> <g> <f> <tam_frontera>' por cada "
+                             "nodo expandido (astar y alt)")
+    parser.add_argument("--servidor", action="store_true",
+                        help="carga el mapa una vez y atiende consultas '<id_inicio> <id_fin>' "
+                             "por la entrada estándar (o por --socket)")
+    parser.add_argument("--socket", metavar="RUTA",
+                        help="con --servidor, escucha en este socket Unix en vez de stdin")
+    parser.add_argument("--lote", metavar="FICHERO_CONSULTAS",
+                        help="resuelve todas las consultas '<id_inicio> <id_fin>' del fichero "
+                             "y escribe una línea de salida por consulta")
+    parser.add_argument("--trabajadores", type=int, default=os.cpu_count() or 1,
+                        help="procesos que resuelven consultas en paralelo (--servidor y --lote)")
+    args = parser.parse_args()
+    if args.mmap and args.sin_cache:
+        parser.error("--mmap trabaja sobre la caché y no admite --sin-cache")
+
+    if args.servidor:
+        if len(args.argumentos) != 1:
+            parser.error("--servidor necesita exactamente <nombre_mapa>")
+        modo_servidor(args, args.argumentos[0])
+        return
+    if args.lote:
+        if len(args.argumentos) != 2:
+            parser.error("--lote necesita <nombre_mapa> <fichero_salida>")
+        modo_lote(args, args.argumentos[0], args.argumentos[1])
+        return
+    if len(args.argumentos) != 4:
+        parser.error("se necesitan <id_inicio> <id_fin> <nombre_mapa> <fichero_salida>")
 
     # Conversión de los IDs de nodos a enteros
     try:
-        start_node = int(sys.argv[1])  # Nodo de inicio
-        end_node = int(sys.argv[2])    # Nodo de destino
+        start_node = int(args.argumentos[0])  # Nodo de inicio
+        end_node = int(args.argumentos[1])    # Nodo de destino
     except ValueError:
         print("Error: Los IDs de los vértices deben ser enteros.")
         sys.exit(1)
 
     # Obtención de rutas de archivos
-    ruta_mapa = sys.argv[3]           # Ruta base del mapa (sin extensión)
-    fichero_salida = sys.argv[4]      # Ruta del fichero de salida
+    ruta_mapa = args.argumentos[2]        # Ruta base del mapa (sin extensión)
+    fichero_salida = args.argumentos[3]   # Ruta del fichero de salida
 
     # 2)Carga del Grafo
-    print(f"Cargando grafo desde {ruta_mapa}...")
-
-    # Instanciación del objeto Grafo
-    grafo = Grafo()  
-    
-    # El nombre del mapa puede ser una ruta absoluta o relativa
-    # El método cargar_mapa() buscará automáticamente los ficheros .gr y .co
-    try:
-        t_carga_inicio = time.time()
-        # Carga de los ficheros .gr (arcos) y .co (coordenadas)
-        grafo.cargar_mapa(ruta_mapa)
-        t_carga_fin = time.time()
-    except Exception as e:
-        print(f"Error cargando el grafo: {e}")
-        sys.exit(1)
+    grafo = cargar_grafo(args, ruta_mapa, print)
 
     # 3) Ejecución del Algoritmo A*
     print(f"Calculando ruta de {start_node} a {end_node}...")
     
-    # Creación del objeto solver con el algoritmo A*
-    solver = AStar(grafo)
+    # Creación del objeto solver con el algoritmo elegido
+    solver = crear_solver(args, grafo, ruta_mapa, print)
+
+    # Instrumentación opcional (solo la admiten AStar y AStarALT)
+    fichero_traza = None
+    if args.instrumentar or args.traza:
+        if args.algoritmo in ("astar", "alt"):
+            al_expandir = None
+            if args.traza:
+                try:
+                    fichero_traza = open(args.traza, 'w')
+                except IOError as e:
+                    print(f"Error abriendo fichero de traza: {e}")
+                    sys.exit(1)
+                al_expandir = lambda nodo, g, f, tam: fichero_traza.write(f"{nodo} {g} {f} {tam}\n")
+            solver.instrumentacion = Instrumentacion(al_expandir)
+        else:
+            print(f"La instrumentación no está disponible con --algoritmo {args.algoritmo}")
     
     # Medición del tiempo de ejecución del algoritmo
     t_algo_inicio = time.time()
-    coste_total, camino = solver.resolver(start_node, end_node)
+    coste_total, camino, costes_arcos = solver.resolver_con_costes(start_node, end_node)
     t_algo_fin = time.time()
     
     tiempo_total = t_algo_fin - t_algo_inicio
+    if fichero_traza is not None:
+        fichero_traza.close()
+        print(f"Traza de expansiones guardada en {args.traza}")
+    if args.instrumentar and getattr(solver, "instrumentacion", None) is not None:
+        print("Instrumentación de la búsqueda:")
+        for linea in solver.instrumentacion.lineas():
+            print(f"  {linea}")
 
     # 4) Presentación de resultados en pantalla
     if camino:
@@ -74,27 +301,29 @@ def main():
         if tiempo_total > 0:
             rate = solver.nodos_expandidos / tiempo_total
         print(f"# expansiones : {solver.nodos_expandidos} ({rate:.2f} nodes/sec)")
+
+        if args.motor == "numba" and not motor_numba.DISPONIBLE:
+            print("Numba no está instalado: se ha usado el motor rapido")
+
+        # Aceleración del motor elegido frente al clásico en la misma consulta
+        # (sin sentido si se ha instrumentado: entonces siempre se usa el clásico)
+        if args.comparar_motor and args.motor != "clasico" and args.algoritmo in ("astar", "alt") \
+                and not (args.instrumentar or args.traza):
+            referencia = crear_solver(args, grafo, ruta_mapa, lambda *_: None, motor="clasico")
+            t_ref_inicio = time.time()
+            referencia.resolver(start_node, end_node)
+            tiempo_ref = time.time() - t_ref_inicio
+            rate_ref = referencia.nodos_expandidos / tiempo_ref if tiempo_ref > 0 else 0
+            aceleracion = rate / rate_ref if rate_ref > 0 else 0
+            print(f"Motor clasico: {rate_ref:.2f} nodes/sec -> motor {args.motor}: "
+                  f"{rate:.2f} nodes/sec (x{aceleracion:.2f})")
         
         # 5) Escritura del fichero de salida-
         # Formato requerido: <inicio> - (coste) - <nodo_i> - (coste) - <nodo_i+1> - ... - <fin>
+        # (o binario/GeoJSON con --formato); los costes de arco los da el solver
         try:
-            with open(fichero_salida, 'w') as f:
-                # Construcción de la línea de salida con el formato especificado
-                linea_salida = f"{camino[0]}"  # Comenzamos con el nodo inicial
-                
-                # Iteramos sobre cada par de nodos consecutivos en el camino
-                for i in range(len(camino) - 1):
-                    u = camino[i]       # Nodo actual
-                    v = camino[i+1]     # Nodo siguiente
-                    
-                    # Obtenemos el coste del arco entre u y v
-                    coste_arco = grafo.coste_arco(u, v)
-                    
-                    # Añadimos el formato: - (coste) - nodo_siguiente
-                    linea_salida += f" - ({coste_arco}) - {v}"
-                
-                # Escribimos la línea completa en el fichero
-                f.write(linea_salida + "\n")
+            with salida.EscritorRutas(fichero_salida, args.formato, grafo) as escritor:
+                escritor.escribir(start_node, end_node, coste_total, camino, costes_arcos)
             
             print(f"Solución guardada en {fichero_salida}")
             
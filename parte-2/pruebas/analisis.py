@@ -3,7 +3,7 @@
 
 import sys
 import time
-import math
+import argparse
 import os
 import re
 from pathlib import Path
@@ -18,7 +18,9 @@ if str(RAIZ_PARTE2) not in sys.path:
     sys.path.insert(0, str(RAIZ_PARTE2))
 
 from grafo import Grafo
-from algoritmo import AStar, Dijkstra
+from algoritmo import AStar, Dijkstra, AStarBidireccional
+from instrumentacion import Instrumentacion
+from matriz import MatrizDistancias
 
 # Definimos las coordenadas de las ciudades usadas en los tests. Formato: (Latitud, Longitud)
 CIUDADES = {
@@ -64,6 +66,9 @@ MAPAS_DIR = Path(os.environ.get("MAPAS_DIR", RAIZ_PARTE2 / "mapas")).resolve()
 RESULTADOS_DIR = SCRIPT_DIR / "resultados"
 SALIDAS_DIR = SCRIPT_DIR / "salidas"
 
+# Ciudades más lejos que esto de cualquier nodo no pertenecen al mapa
+DISTANCIA_MAXIMA_CIUDAD = 50000  # metros
+
 def localizar_mapa(nombre_base):
     """Devuelve la ruta base si existen los ficheros .gr y .co."""
     base = MAPAS_DIR / nombre_base  # carpeta donde debería estar el mapa
@@ -80,42 +85,16 @@ def localizar_mapa(nombre_base):
     )
 
 # Utilidades auxiliares
-def distancia_euclidea_simple(lat1, lon1, lat2, lon2):
-    """Calculo rapido de distancia para la aproximacion de nodos."""
-    return math.sqrt((lat1-lat2)**2 + (lon1-lon2)**2)
-
 def buscar_nodo_cercano(grafo, lat_objetivo, lon_objetivo):
     """Localiza el id del nodo mas cercano a unas coordenadas dadas."""
     # Validamos que las coordenadas tengan sentido geográfico
     if not (-90 <= lat_objetivo <= 90) or not (-180 <= lon_objetivo <= 180):
         raise ValueError("Coordenadas fuera de rango valido")
 
-    # Convertimos a enteros porque el grafo trabaja en grados * 10^6
-    lat_target = int(lat_objetivo * 1000000)
-    lon_target = int(lon_objetivo * 1000000)
-
-    mejor_nodo = None  # guardará el id mas cercano
-    menor_dist = float("inf")  # valor inicial alto para comparar
-
-    # Recorremos todos los nodos disponibles
-    for nodo_id, coords in enumerate(grafo.coordenadas):
-        if nodo_id == 0:
-            continue  # el índice 0 no se usa en DIMACS
-
-        # Los ficheros pueden guardar (lon, lat) o (lat, lon)
-        c1, c2 = coords
-
-        # Calculamos ambas posibilidades y nos quedamos con la menor
-        d1 = distancia_euclidea_simple(lat_target, lon_target, c2, c1)
-        d2 = distancia_euclidea_simple(lat_target, lon_target, c1, c2)
-        actual = min(d1, d2)
-
-        # Actualizamos el registro del nodo mas cercano
-        if actual < menor_dist:
-            menor_dist = actual
-            mejor_nodo = nodo_id
-
-    return mejor_nodo
+    # El índice espacial se construye una vez por grafo y se reutiliza en
+    # todas las búsquedas (distancia de círculo máximo, no euclídea en grados)
+    nodo, _ = grafo.indice_espacial().mas_cercano(lat_objetivo, lon_objetivo)
+    return nodo
 
 def resolver_coordenadas(ref):
     """Devuelve la coordenada (lat, lon) según el tipo de referencia."""
@@ -127,8 +106,11 @@ def resolver_coordenadas(ref):
         return float(ref[0]), float(ref[1])  # aceptamos coordenadas directas
     raise KeyError("Referencia de coordenadas no valida")
 
-def ejecutar_comparativa(grafo, titulo, inicio_nom, fin_nom, inicio_id, fin_id):
-    """Lanza A* y Dijkstra para el mismo trayecto y registra métricas."""
+def ejecutar_comparativa(grafo, titulo, inicio_nom, fin_nom, inicio_id, fin_id, instrumentar=False):
+    """
+    Lanza A*, Dijkstra y A* bidireccional para el mismo trayecto y registra métricas.
+    Con instrumentar, repite A* instrumentado (aparte, para no alterar los tiempos).
+    """
     reporte = []
     reporte.append(f">>> TEST: {titulo}")
     reporte.append(f"    Trayecto: {inicio_nom} ({inicio_id}) -> {fin_nom} ({fin_id})")
@@ -151,12 +133,21 @@ def ejecutar_comparativa(grafo, titulo, inicio_nom, fin_nom, inicio_id, fin_id):
     nodos_dijkstra = solver_dijkstra.nodos_expandidos
     reporte.append(f"    Dijkstra completado en {t_dijkstra:.3f}s")
 
-    # 3) Analisis de resultados
+    # 3) Ejecucion A* bidireccional
+    solver_bidir = AStarBidireccional(grafo)
+    t4 = time.time()
+    coste_bidir, _ = solver_bidir.resolver(inicio_id, fin_id)
+    t5 = time.time()
+    t_bidir = t5 - t4
+    nodos_bidir = solver_bidir.nodos_expandidos
+    reporte.append(f"    A* bidireccional completado en {t_bidir:.3f}s")
+
+    # 4) Analisis de resultados
     status = "OK"
     mejora = 0.0
 
-    # Comprobamos que ambos algoritmos devuelven el mismo coste
-    if coste_astar != coste_dijkstra:
+    # Comprobamos que los tres algoritmos devuelven el mismo coste
+    if coste_astar != coste_dijkstra or coste_bidir != coste_dijkstra:
         status = "FALLO: Los costes no coinciden"
 
     # Calculamos la mejora en nodos expandidos respecto a Dijkstra
@@ -166,9 +157,17 @@ def ejecutar_comparativa(grafo, titulo, inicio_nom, fin_nom, inicio_id, fin_id):
     reporte.append("    METRICAS:")
     reporte.append(f"      A* -> Coste: {coste_astar} | Nodos: {nodos_astar} | Tiempo: {t_astar:.4f}s")
     reporte.append(f"      Dijkstra -> Coste: {coste_dijkstra} | Nodos: {nodos_dijkstra} | Tiempo: {t_dijkstra:.4f}s")
+    reporte.append(f"      A* bidireccional -> Coste: {coste_bidir} | Nodos: {nodos_bidir} | Tiempo: {t_bidir:.4f}s")
     reporte.append(f"      A* expandio un {mejora:.2f}% menos de nodos que Dijkstra.")
     reporte.append(f"      Resultado: {status}")
 
+    # 5) Desglose de la búsqueda A* (contadores y reparto del tiempo)
+    if instrumentar:
+        instrumentacion = Instrumentacion()
+        AStar(grafo, instrumentacion=instrumentacion).resolver(inicio_id, fin_id)
+        reporte.append("    INSTRUMENTACION A*:")
+        reporte.extend(f"      {linea}" for linea in instrumentacion.lineas())
+
     return reporte, camino_astar
 
 def guardar_log(titulo, lineas):
@@ -227,8 +226,47 @@ def guardar_fichero_solucion(titulo, grafo, camino):
     # Escribe el fichero con salto de línea final.
     ruta.write_text("\n".join(lineas) + "\n", encoding="utf-8")
 
+def guardar_matriz_ciudades(mapa, grafo):
+    """
+    Calcula la matriz de costes CIUDADES × CIUDADES sobre el mapa y la guarda
+    en la carpeta de resultados. Solo entran las ciudades que caen dentro del
+    mapa (a menos de DISTANCIA_MAXIMA_CIUDAD de algún nodo).
+    """
+    indice = grafo.indice_espacial()
+    nombres, nodos = [], []
+    for nombre, (lat, lon) in CIUDADES.items():
+        nodo, metros = indice.mas_cercano(lat, lon)
+        if nodo is not None and metros <= DISTANCIA_MAXIMA_CIUDAD:
+            nombres.append(nombre)
+            nodos.append(nodo)
+    if not nodos:
+        return
+
+    t0 = time.perf_counter()
+    matriz = MatrizDistancias.calcular(grafo, nodos)
+    segundos = time.perf_counter() - t0
+
+    ancho = max(len(nombre) for nombre in nombres)
+    lineas = [f">>> MATRIZ DE DISTANCIAS: {mapa}",
+              f"    Ciudades: {len(nombres)} | Nodos expandidos: {matriz.nodos_expandidos}"
+              f" | Tiempo: {segundos:.4f} s",
+              " " * ancho + "".join(f" {nombre:>14}" for nombre in nombres)]
+    for i, nombre in enumerate(nombres):
+        celdas = ("-" if coste is None else str(coste) for coste in matriz.fila(i))
+        lineas.append(f"{nombre:<{ancho}}" + "".join(f" {celda:>14}" for celda in celdas))
+
+    RESULTADOS_DIR.mkdir(parents=True, exist_ok=True)
+    ruta = RESULTADOS_DIR / f"matriz_{mapa}.txt"
+    ruta.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+
 def main():
     """Función principal que ejecuta todos los tests planificados."""
+    parser = argparse.ArgumentParser(description="Batería de pruebas sobre los mapas de USA")
+    parser.add_argument("--instrumentar", action="store_true",
+                        help="añade a cada resultado los contadores y tiempos de A*")
+    parser.add_argument("--matriz", action="store_true",
+                        help="guarda además la matriz de costes entre las CIUDADES de cada mapa")
+    args = parser.parse_args()
 
     # 1) Planificación de test agrupados por mapa
     tests_planificados = [
@@ -320,7 +358,8 @@ def main():
             # 2.2.2) Ejecución de la comparativa A* vs Dijkstra y guardado de resultados
             print(f"  -> Ejecutando {titulo}...")
             # Ejecuta ambos algoritmos, devuelve líneas de log y el camino
-            lineas_res, camino = ejecutar_comparativa(g, titulo, origen_ref, destino_ref, id_origen, id_destino)
+            lineas_res, camino = ejecutar_comparativa(g, titulo, origen_ref, destino_ref, id_origen, id_destino,
+                                                      args.instrumentar)
 
             # Guarda log detallado del test
             guardar_log(titulo, lineas_res)
@@ -328,6 +367,11 @@ def main():
             # Guarda el camino final
             guardar_fichero_solucion(titulo, g, camino)
 
+        # 2.3) Matriz de costes entre todas las ciudades que caen en el mapa
+        if args.matriz:
+            print(f"  -> Calculando matriz de ciudades ({mapa})...")
+            guardar_matriz_ciudades(mapa, g)
+
     print("\n--- Ejecucion de pruebas finalizada ---")
 
 if __name__ == "__main__":
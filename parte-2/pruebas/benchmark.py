@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Banco de pruebas de rendimiento reproducible.
+
+Mide por separado la carga del mapa (texto y caché binaria), la construcción
+del índice espacial, el ajuste de coordenadas a nodos y la búsqueda de
+caminos. Cada fase se repite varias veces con time.perf_counter y se informa
+de la mediana, percentiles, mínimo y máximo; la memoria pico de cada fase se
+mide aparte con tracemalloc (en una ejecución no cronometrada, porque
+tracemalloc ralentiza el código).
+
+Los resultados pueden guardarse en JSON (--salida) y compararse con otra
+ejecución guardada (--base) para detectar regresiones. Sin --mapa se genera
+un grafo sintético (rejilla o aleatorio), así que no hacen falta los mapas
+de USA.
+
+Ejemplos:
+    ./benchmark.py --sintetico rejilla --tam 200 --salida base.json
+    ./benchmark.py --sintetico rejilla --tam 200 --base base.json
+    ./benchmark.py --mapa ../mapas/USA-road-d.NY --compacto --motor rapido
+"""
+
+import sys
+import os
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# Ajuste del path para poder importar los modulos de la carpeta superior
+SCRIPT_DIR = Path(__file__).resolve().parent
+RAIZ_PARTE2 = SCRIPT_DIR.parent
+if str(RAIZ_PARTE2) not in sys.path:
+    sys.path.insert(0, str(RAIZ_PARTE2))
+
+from grafo import Grafo, GrafoCSR
+from algoritmo import AStar, Dijkstra
+import cache_grafo
+
+# Versión del formato del JSON de resultados
+VERSION = 1
+
+# Radio de la Tierra en metros (el mismo que AStar)
+RADIO_TIERRA = 6371000
+
+# -----------------------------------------------------------------------------
+# Generadores de grafos sintéticos (ficheros DIMACS .gr/.co)
+# -----------------------------------------------------------------------------
+
+def _distancia(lon1, lat1, lon2, lat2):
+    """Distancia Haversine en metros entre dos puntos en grados * 10^6."""
+    r1 = math.radians(lat1 / 1000000.0)
+    r2 = math.radians(lat2 / 1000000.0)
+    dlon = math.radians((lon2 - lon1) / 1000000.0)
+    a = math.sin((r2 - r1) / 2)**2 + math.cos(r1) * math.cos(r2) * math.sin(dlon / 2)**2
+    return RADIO_TIERRA * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _coste(coords, u, v, rng):
+    """Coste de un arco: distancia real por un factor >= 1 (la heurística sigue siendo admisible)."""
+    (lon1, lat1), (lon2, lat2) = coords[u], coords[v]
+    return max(1, math.ceil(_distancia(lon1, lat1, lon2, lat2) * rng.uniform(1.0, 1.5)))
+
+
+def _escribir_dimacs(ruta_base, coords, arcos):
+    """Escribe coords[1..n] y la lista de arcos (u, v, coste) en formato DIMACS."""
+    n = len(coords) - 1
+    with open(ruta_base + ".co", "w") as f:
+        f.write(f"c grafo sintético\np aux sp co {n}\n")
+        f.writelines(f"v {v} {lon} {lat}\n" for v, (lon, lat) in enumerate(coords) if v)
+    with open(ruta_base + ".gr", "w") as f:
+        f.write(f"c grafo sintético\np sp {n} {len(arcos)}\n")
+        f.writelines(f"a {u} {v} {w}\n" for u, v, w in arcos)
+
+
+def generar_rejilla(ruta_base, lado, semilla=1):
+    """
+    Rejilla de lado × lado nodos separados ~200 m, con coordenadas algo
+    desplazadas y arcos en ambos sentidos entre vecinos (falta un 7% al azar).
+    """
+    rng = random.Random(semilla)
+    coords = [(0, 0)]
+    for y in range(lado):
+        for x in range(lado):
+            coords.append((-100000000 + x * 2000 + rng.randint(-300, 300),
+                           40000000 + y * 2000 + rng.randint(-300, 300)))
+
+    arcos = []
+    for y in range(lado):
+        for x in range(lado):
+            u = y * lado + x + 1
+            for dx, dy in ((1, 0), (0, 1), (-1, 0), (0, -1)):
+                if 0 <= x + dx < lado and 0 <= y + dy < lado and rng.random() < 0.93:
+                    v = u + dy * lado + dx
+                    arcos.append((u, v, _coste(coords, u, v, rng)))
+    rng.shuffle(arcos)
+    _escribir_dimacs(ruta_base, coords, arcos)
+
+
+def generar_aleatorio(ruta_base, num_nodos, grado=3, semilla=1):
+    """
+    Grafo geométrico aleatorio: nodos uniformes en un cuadrado y cada uno
+    unido (en ambos sentidos) con 'grado' nodos elegidos entre los de su
+    celda y las ocho celdas vecinas.
+    """
+    rng = random.Random(semilla)
+    # Cuadrado de ~0.02 grados por cada 100 nodos de lado, ~4 nodos por celda
+    celdas_lado = max(1, int(math.sqrt(num_nodos / 4)))
+    lado = 2000 * celdas_lado * 2
+    coords = [(0, 0)] + [(-100000000 + rng.randrange(lado), 40000000 + rng.randrange(lado))
+                         for _ in range(num_nodos)]
+
+    celdas = {}
+    for v in range(1, num_nodos + 1):
+        lon, lat = coords[v]
+        clave = ((lon + 100000000) * celdas_lado // lado, (lat - 40000000) * celdas_lado // lado)
+        celdas.setdefault(clave, []).append(v)
+
+    arcos = []
+    for (cx, cy), nodos in celdas.items():
+        cercanos = [w for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                    for w in celdas.get((cx + dx, cy + dy), ())]
+        for u in nodos:
+            candidatos = [w for w in cercanos if w != u]
+            for v in rng.sample(candidatos, min(grado, len(candidatos))):
+                coste = _coste(coords, u, v, rng)
+                arcos.append((u, v, coste))
+                arcos.append((v, u, coste))
+    rng.shuffle(arcos)
+    _escribir_dimacs(ruta_base, coords, arcos)
+
+
+# -----------------------------------------------------------------------------
+# Medición
+# -----------------------------------------------------------------------------
+
+def percentil(datos, p):
+    """Percentil p (0-100) con interpolación lineal entre muestras ordenadas."""
+    ordenados = sorted(datos)
+    if not ordenados:
+        return None
+    pos = (len(ordenados) - 1) * p / 100
+    i = int(pos)
+    if i + 1 >= len(ordenados):
+        return ordenados[-1]
+    return ordenados[i] + (ordenados[i + 1] - ordenados[i]) * (pos - i)
+
+
+def resumir(muestras, memoria_pico=None, **extra):
+    """Estadísticas de una fase a partir de sus tiempos en segundos."""
+    resumen = {
+        "muestras": len(muestras),
+        "mediana": percentil(muestras, 50),
+        "p90": percentil(muestras, 90),
+        "p95": percentil(muestras, 95),
+        "min": min(muestras) if muestras else None,
+        "max": max(muestras) if muestras else None,
+        "memoria_pico": memoria_pico,
+    }
+    resumen.update(extra)
+    return resumen
+
+
+def cronometrar(funcion, repeticiones):
+    """Ejecuta funcion() 'repeticiones' veces y devuelve sus tiempos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return tiempos
+
+
+def memoria_pico(funcion):
+    """Memoria pico (bytes) reservada por Python durante una llamada a funcion()."""
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico
+
+
+def enlazar_mapa(ruta_mapa, directorio):
+    """
+    Deja <ruta_mapa>.gr/.co accesibles desde 'directorio' (enlace simbólico, o
+    copia si el sistema no los admite) y devuelve la nueva ruta base. Así la
+    caché que ejecutar() genera y borra es propia y no toca la del mapa real.
+    """
+    ruta_base = os.path.join(directorio, os.path.basename(ruta_mapa))
+    for extension in (".gr", ".co"):
+        origen = os.path.abspath(ruta_mapa + extension)
+        try:
+            os.symlink(origen, ruta_base + extension)
+        except (OSError, NotImplementedError):
+            shutil.copyfile(origen, ruta_base + extension)
+    return ruta_base
+
+
+def ejecutar(ruta_base, args):
+    """
+    Mide todas las fases sobre el mapa <ruta_base>.gr/.co y devuelve sus
+    resúmenes. Genera y borra <ruta_base>.cache, así que ruta_base debe estar
+    en un directorio temporal (ver enlazar_mapa).
+    """
+    clase = GrafoCSR if args.compacto else Grafo
+    rng = random.Random(args.semilla)
+    fases = {}
+
+    # 1) Carga desde los ficheros de texto (sin caché)
+    def cargar_texto():
+        clase().cargar_mapa(ruta_base, usar_cache=False)
+    fases["carga_texto"] = resumir(cronometrar(cargar_texto, args.repeticiones),
+                                   memoria_pico(cargar_texto))
+
+    # 2) Carga desde la caché binaria (se genera una vez antes de medir)
+    clase().cargar_mapa(ruta_base, usar_cache=True)
+    def cargar_cache():
+        clase().cargar_mapa(ruta_base, usar_cache=True)
+    fases["carga_cache"] = resumir(cronometrar(cargar_cache, args.repeticiones),
+                                   memoria_pico(cargar_cache))
+    try:
+        os.remove(cache_grafo.ruta_cache(ruta_base))
+    except OSError:
+        pass
+
+    grafo = clase()
+    grafo.cargar_mapa(ruta_base, usar_cache=False)
+
+    # 3) Construcción del índice espacial (se descarta entre repeticiones)
+    def construir_indice():
+        grafo._indice_espacial = None
+        grafo.indice_espacial()
+    fases["indice"] = resumir(cronometrar(construir_indice, args.repeticiones),
+                              memoria_pico(construir_indice))
+
+    # 4) Ajuste de coordenadas aleatorias dentro del mapa a su nodo más cercano
+    lons = [grafo.get_coordenadas(v)[0] / 1000000.0 for v in range(1, grafo.num_nodos + 1)]
+    lats = [grafo.get_coordenadas(v)[1] / 1000000.0 for v in range(1, grafo.num_nodos + 1)]
+    puntos = [(rng.uniform(min(lats), max(lats)), rng.uniform(min(lons), max(lons)))
+              for _ in range(args.puntos)]
+    indice = grafo.indice_espacial()
+    tiempos = cronometrar(lambda: indice.ajustar(puntos), args.repeticiones)
+    fases["ajuste"] = resumir([t / len(puntos) for t in tiempos],
+                              memoria_pico(lambda: indice.ajustar(puntos)),
+                              puntos=len(puntos))
+
+    # 5) Búsquedas entre pares aleatorios: tiempo por consulta
+    pares = [(rng.randint(1, grafo.num_nodos), rng.randint(1, grafo.num_nodos))
+             for _ in range(args.consultas)]
+    clase_solver = Dijkstra if args.algoritmo == "dijkstra" else AStar
+    solver = clase_solver(grafo, heuristica=args.heuristica, motor=args.motor)
+    tiempos = []
+    expansiones = 0
+    for _ in range(args.repeticiones):
+        for inicio, fin in pares:
+            t0 = time.perf_counter()
+            solver.resolver(inicio, fin)
+            tiempos.append(time.perf_counter() - t0)
+            expansiones += solver.nodos_expandidos
+
+    def buscar_todo():
+        for inicio, fin in pares:
+            clase_solver(grafo, heuristica=args.heuristica, motor=args.motor).resolver(inicio, fin)
+    total = sum(tiempos)
+    fases["busqueda"] = resumir(tiempos, memoria_pico(buscar_todo),
+                                consultas=len(pares),
+                                nodos_por_segundo=expansiones / total if total > 0 else 0)
+
+    datos_grafo = {"num_nodos": grafo.num_nodos, "num_arcos": grafo.num_arcos}
+    return datos_grafo, fases
+
+
+# -----------------------------------------------------------------------------
+# Informe y comparación con una ejecución base
+# -----------------------------------------------------------------------------
+
+def imprimir(resultado):
+    """Tabla legible con las estadísticas de cada fase."""
+    g = resultado["grafo"]
+    print(f"Grafo: {g['num_nodos']} nodos, {g['num_arcos']} arcos")
+    print(f"{'fase':<13}{'mediana':>12}{'p90':>12}{'p95':>12}{'min':>12}{'max':>12}{'mem pico':>12}")
+    for nombre, fase in resultado["fases"].items():
+        memoria = fase["memoria_pico"]
+        print(f"{nombre:<13}" + "".join(f"{fase[k] * 1000:>10.3f}ms"
+                                        for k in ("mediana", "p90", "p95", "min", "max"))
+              + (f"{memoria / 1048576:>10.1f}MB" if memoria is not None else ""))
+    busqueda = resultado["fases"].get("busqueda")
+    if busqueda:
+        print(f"Búsqueda: {busqueda['nodos_por_segundo']:.0f} nodes/sec")
+
+
+def comparar(resultado, base, tolerancia):
+    """
+    Compara la mediana de cada fase con la de la ejecución base.
+
+    Returns:
+        list: Líneas de informe; las regresiones empiezan por 'REGRESION'
+    """
+    lineas = []
+    for nombre, fase in resultado["fases"].items():
+        previa = base.get("fases", {}).get(nombre)
+        if not previa or not previa.get("mediana"):
+            continue
+        ratio = fase["mediana"] / previa["mediana"]
+        estado = "REGRESION" if ratio > 1 + tolerancia else "ok"
+        lineas.append(f"{estado:<10}{nombre:<13}{previa['mediana'] * 1000:>10.3f}ms -> "
+                      f"{fase['mediana'] * 1000:>10.3f}ms (x{ratio:.2f})")
+    return lineas
+
+
+def main():
+    """Genera o localiza el mapa, mide todas las fases e informa."""
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento")
+    parser.add_argument("--mapa", help="ruta base de un mapa DIMACS (sin extensión)")
+    parser.add_argument("--sintetico", choices=("rejilla", "aleatorio"), default="rejilla",
+                        help="grafo generado si no se indica --mapa")
+    parser.add_argument("--tam", type=int, default=100,
+                        help="lado de la rejilla o número de nodos del grafo aleatorio / 100")
+    parser.add_argument("--compacto", action="store_true", help="usa GrafoCSR")
+    parser.add_argument("--algoritmo", choices=("astar", "dijkstra"), default="astar")
+    parser.add_argument("--heuristica", choices=AStar.HEURISTICAS, default="haversine")
+    parser.add_argument("--motor", choices=AStar.MOTORES, default="clasico")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--consultas", type=int, default=20,
+                        help="pares origen-destino por repetición")
+    parser.add_argument("--puntos", type=int, default=200,
+                        help="coordenadas a ajustar por repetición")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--salida", help="guarda los resultados en este fichero JSON")
+    parser.add_argument("--base", help="JSON de una ejecución anterior con la que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="aumento relativo de la mediana que se considera regresión")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporal:
+        if args.mapa:
+            ruta_base = enlazar_mapa(args.mapa, temporal)
+            origen = {"mapa": os.path.basename(args.mapa)}
+        else:
+            ruta_base = os.path.join(temporal, args.sintetico)
+            if args.sintetico == "rejilla":
+                generar_rejilla(ruta_base, args.tam, args.semilla)
+            else:
+                generar_aleatorio(ruta_base, args.tam * 100, semilla=args.semilla)
+            origen = {"sintetico": args.sintetico, "tam": args.tam}
+
+        print(f"Midiendo {origen} ({args.repeticiones} repeticiones)...")
+        datos_grafo, fases = ejecutar(ruta_base, args)
+
+    resultado = {
+        "version": VERSION,
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform()},
+        "parametros": dict(origen, compacto=args.compacto, algoritmo=args.algoritmo,
+                           heuristica=args.heuristica, motor=args.motor,
+                           repeticiones=args.repeticiones, consultas=args.consultas,
+                           puntos=args.puntos, semilla=args.semilla),
+        "grafo": datos_grafo,
+        "fases": fases,
+    }
+    imprimir(resultado)
+
+    if args.salida:
+        Path(args.salida).write_text(json.dumps(resultado, indent=2) + "\n", encoding="utf-8")
+        print(f"Resultados guardados en {args.salida}")
+
+    if args.base:
+        base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+        if base.get("parametros") != resultado["parametros"]:
+            print("[AVISO] La ejecución base usó otros parámetros; la comparación es orientativa")
+        lineas = comparar(resultado, base, args.tolerancia)
+        print("\n".join(lineas))
+        if any(linea.startswith("REGRESION") for linea in lineas):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de regresión de los resolutores frente a Dijkstra.
+
+Se ejecutan con pytest desde la carpeta parte-2:
+    python -m pytest -q pruebas/test_regresiones.py
+"""
+
+import sys
+import math
+import random
+from pathlib import Path
+
+import pytest
+
+# Ajuste del path para poder importar los modulos de la carpeta superior
+SCRIPT_DIR = Path(__file__).resolve().parent
+RAIZ_PARTE2 = SCRIPT_DIR.parent
+if str(RAIZ_PARTE2) not in sys.path:
+    sys.path.insert(0, str(RAIZ_PARTE2))
+
+import consultas
+import motor_numba
+import salida
+from grafo import Grafo, GrafoCSR
+from algoritmo import AStar, Dijkstra
+from contraccion import JerarquiaContraccion, ConsultaCH
+from benchmark import generar_rejilla, generar_aleatorio
+
+# Metros por grado de longitud en el ecuador (mismo radio que la heurística)
+METROS_GRADO = 6371000 * math.pi / 180
+
+
+def _mapa_entradas_caducadas(ruta_base):
+    """
+    Mapa pequeño (nodos sobre el ecuador) en el que resolver_multiple debe
+    recalcular entradas de versiones anteriores al asentar el objetivo 2.
+    Cuando la versión se guardaba por nodo, una entrada antigua del nodo 3
+    pasaba por vigente y el coste a 6 salía 7008 (vía 5) en vez de 7004
+    (vía 4).
+    """
+    xs = [0, 1000, 1000, 500, 0, -5000]
+    arcos = [(1, 2, 1001), (1, 4, 502), (1, 3, 5500), (1, 5, 1),
+             (5, 3, 1006), (4, 3, 501), (3, 6, 6001)]
+    with open(ruta_base + ".co", "w") as f:
+        for nodo, x in enumerate(xs, 1):
+            f.write(f"v {nodo} {round(x / METROS_GRADO * 1e6)} 0\n")
+    with open(ruta_base + ".gr", "w") as f:
+        for u, v, peso in arcos:
+            f.write(f"a {u} {v} {peso}\n")
+    grafo = Grafo()
+    grafo.cargar_mapa(ruta_base, usar_cache=False)
+    return grafo
+
+
+def _comprobar_multiple(grafo, inicio, objetivos):
+    """
+    resolver_multiple da, para cada objetivo, el coste de Dijkstra, un camino
+    válido y los costes reales de sus arcos.
+    """
+    dijkstra = Dijkstra(grafo)
+    resultado = AStar(grafo).resolver_multiple(inicio, objetivos)
+    assert set(resultado) == set(objetivos)
+    for objetivo in objetivos:
+        coste_ref, _ = dijkstra.resolver(inicio, objetivo)
+        coste, camino, costes_arcos = resultado[objetivo]
+        assert coste == coste_ref, (inicio, objetivo)
+        if coste is None:
+            assert camino == [] and costes_arcos == []
+            continue
+        assert camino[0] == inicio and camino[-1] == objetivo
+        assert costes_arcos == [grafo.coste_arco(u, v) for u, v in zip(camino, camino[1:])]
+        assert sum(costes_arcos) == coste
+
+
+def test_resolver_multiple_entradas_caducadas(tmp_path):
+    grafo = _mapa_entradas_caducadas(str(tmp_path / "mapa"))
+    resultado = AStar(grafo).resolver_multiple(1, [2, 6])
+    assert resultado[6] == (7004, [1, 4, 3, 6], [502, 501, 6001])
+    _comprobar_multiple(grafo, 1, [2, 6])
+
+
+def test_resolver_multiple_rejilla(tmp_path):
+    ruta_base = str(tmp_path / "rejilla")
+    generar_rejilla(ruta_base, 25, semilla=7)
+    grafo = Grafo()
+    grafo.cargar_mapa(ruta_base, usar_cache=False)
+
+    rng = random.Random(3)
+    nodos = range(1, grafo.num_nodos + 1)
+    for _ in range(15):
+        inicio = rng.choice(nodos)
+        # Con pocos objetivos se usa la heurística; con más, h = 0
+        cantidad = rng.choice((2, 3, 5, AStar.MAX_OBJETIVOS_HEURISTICA + 4))
+        _comprobar_multiple(grafo, inicio, rng.sample(nodos, cantidad))
+
+
+def test_resolver_origen_reparte_expansiones(tmp_path):
+    ruta_base = str(tmp_path / "rejilla")
+    generar_rejilla(ruta_base, 25, semilla=7)
+    grafo = Grafo()
+    grafo.cargar_mapa(ruta_base, usar_cache=False)
+    solver = AStar(grafo)
+    consultas.preparar(grafo, solver)
+
+    # Destinos con uno repetido y el propio inicio
+    inicio, destinos = 40, [600, 3, 311, 600, 40, 125]
+    resultados = consultas.resolver_origen(inicio, destinos)
+    assert len(resultados) == len(destinos)
+    total = solver.nodos_expandidos
+    dijkstra = Dijkstra(grafo)
+    for fin, (coste, camino, costes_arcos, _, _) in zip(destinos, resultados):
+        assert coste == dijkstra.resolver(inicio, fin)[0], fin
+        assert costes_arcos == [grafo.coste_arco(u, v) for u, v in zip(camino, camino[1:])]
+    # Las expansiones de la búsqueda compartida se reparten sin duplicarse
+    assert sum(r[3] for r in resultados) == total
+    assert resultados[3][3] == 0
+
+
+def test_consulta_ch_igual_que_dijkstra(tmp_path):
+    # Rejilla con arcos de un solo sentido (faltan al azar) y grafo aleatorio
+    for nombre, generar in (("rejilla", lambda ruta: generar_rejilla(ruta, 20, semilla=13)),
+                            ("aleatorio", lambda ruta: generar_aleatorio(ruta, 1500, semilla=17))):
+        ruta_base = str(tmp_path / nombre)
+        generar(ruta_base)
+        grafo = GrafoCSR()
+        grafo.cargar_mapa(ruta_base, usar_cache=False)
+        ch = ConsultaCH(JerarquiaContraccion.construir(grafo))
+        dijkstra = Dijkstra(grafo)
+
+        rng = random.Random(19)
+        for _ in range(40):
+            inicio = rng.randint(1, grafo.num_nodos)
+            fin = rng.randint(1, grafo.num_nodos)
+            coste_ref, _ = dijkstra.resolver(inicio, fin)
+            coste, camino, costes_arcos = ch.resolver_con_costes(inicio, fin)
+            assert coste == coste_ref, (nombre, inicio, fin)
+            if coste is None:
+                assert camino == []
+                continue
+            # Camino desempaquetado: arcos reales del grafo con sus costes
+            assert camino[0] == inicio and camino[-1] == fin
+            assert costes_arcos == [grafo.coste_arco(u, v) for u, v in zip(camino, camino[1:])]
+            assert sum(costes_arcos) == coste
+
+
+def test_salida_binaria_ida_y_vuelta(tmp_path):
+    # Ruta normal, inicio == fin, sin solución y un coste que no cabe en uint32
+    rutas = [(1, 4, 1504, [1, 2, 3, 4], [501, 2, 1001]),
+             (7, 7, 0, [7], []),
+             (3, 9, None, [], []),
+             (2, 5, 5000000000, [2, 6, 5], [4000000000, 1000000000])]
+    ruta = tmp_path / "rutas.bin"
+    with salida.EscritorRutas(ruta, "binario") as escritor:
+        for ruta_i in rutas:
+            escritor.escribir(*ruta_i)
+    assert salida.leer_binario(ruta) == rutas
+
+
+def _comparar_motor_numba(ruta_base):
+    """El motor numba da los mismos costes, caminos y expansiones que el rapido."""
+    generar_rejilla(ruta_base, 25, semilla=11)
+    rng = random.Random(5)
+    for clase in (Grafo, GrafoCSR):
+        grafo = clase()
+        grafo.cargar_mapa(ruta_base, usar_cache=False)
+        pares = [(rng.randint(1, grafo.num_nodos), rng.randint(1, grafo.num_nodos))
+                 for _ in range(10)]
+        for crear in (lambda m: AStar(grafo, motor=m),
+                      lambda m: AStar(grafo, heuristica="cuerda", motor=m),
+                      lambda m: Dijkstra(grafo, motor=m)):
+            rapido, numba = crear("rapido"), crear("numba")
+            for inicio, fin in pares:
+                assert numba.resolver(inicio, fin) == rapido.resolver(inicio, fin)
+                assert numba.nodos_expandidos == rapido.nodos_expandidos
+
+
+def test_motor_numba_sin_compilar(tmp_path, monkeypatch):
+    # Ejecuta el bucle de motor_numba como Python normal, haya o no Numba
+    monkeypatch.setattr(motor_numba, "DISPONIBLE", True)
+    monkeypatch.setattr(motor_numba, "buscar", motor_numba._buscar)
+    _comparar_motor_numba(str(tmp_path / "rejilla"))
+
+
+@pytest.mark.skipif(not motor_numba.DISPONIBLE, reason="Numba no está instalado")
+def test_motor_numba_compilado(tmp_path):
+    _comparar_motor_numba(str(tmp_path / "rejilla"))
@@ -0,0 +1,185 @@
+"""
+Escritura de rutas en fichero.
+
+Los caminos de costa a costa tienen decenas de miles de nodos, así que la
+ruta no se monta entera en memoria como una única cadena: se genera por
+trozos que se vuelcan a un fichero con un búfer grande. Hay tres formatos:
+
+    texto:   el formato de la práctica, una línea por ruta
+             <inicio> - (coste) - <nodo_i> - ... - <fin>
+    binario: registros compactos de enteros (ver CABECERA y REGISTRO)
+    geojson: FeatureCollection con una LineString por ruta con las
+             coordenadas de sus nodos, para herramientas de mapas
+"""
+
+import json
+import struct
+import sys
+from array import array
+
+FORMATOS = ("texto", "binario", "geojson")
+
+# Tamaño del búfer de escritura
+BUFER = 1 << 20
+
+# Nodos por trozo al generar el texto de una ruta
+NODOS_POR_TROZO = 4096
+
+# Formato binario: cabecera del fichero y, por ruta, un registro
+# (inicio, fin, coste, num_nodos) seguido de num_nodos IDs y num_nodos - 1
+# costes de arco, todo little-endian. En el registro coste es int64 y el
+# resto uint32; IDs y costes de arco son uint32. Sin solución: coste -1 y
+# 0 nodos.
+MAGIC = b"RUTAS"
+VERSION = 1
+CABECERA = struct.Struct("<5sB")
+REGISTRO = struct.Struct("<IIqI")
+
+
+def trozos_texto(camino, costes_arcos):
+    """Genera el texto de una ruta '<inicio> - (coste) - <nodo_i> - ... - <fin>' por trozos."""
+    yield str(camino[0])
+    for i in range(1, len(camino), NODOS_POR_TROZO):
+        nodos = camino[i:i + NODOS_POR_TROZO]
+        costes = costes_arcos[i - 1:i - 1 + NODOS_POR_TROZO]
+        yield "".join(f" - ({c}) - {v}" for c, v in zip(costes, nodos))
+
+
+def _uint32(valores):
+    """Array de uint32 en little-endian."""
+    datos = array('I', valores)
+    if sys.byteorder != "little":
+        datos.byteswap()
+    return datos
+
+# -----------------------------------------------------------------------------
+# Clase EscritorRutas: fichero de salida en cualquiera de los formatos
+# -----------------------------------------------------------------------------
+
+class EscritorRutas:
+    """
+    Escribe rutas una tras otra en un fichero. Se usa como gestor de
+    contexto para que el formato quede bien cerrado (p.ej. el GeoJSON):
+
+        with EscritorRutas(ruta, "geojson", grafo) as escritor:
+            escritor.escribir(inicio, fin, coste, camino, costes_arcos)
+    """
+
+    def __init__(self, ruta, formato="texto", grafo=None):
+        """
+        Abre el fichero de salida.
+
+        Args:
+            ruta: Fichero a crear
+            formato: Uno de FORMATOS
+            grafo: Grafo del que sacar las coordenadas (necesario para geojson)
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de salida desconocido: {formato}")
+        if formato == "geojson" and grafo is None:
+            raise ValueError("El formato geojson necesita el grafo para las coordenadas")
+        self.formato = formato
+        self.grafo = grafo
+        self._rutas = 0
+
+        if formato == "binario":
+            self._f = open(ruta, "wb", buffering=BUFER)
+            self._f.write(CABECERA.pack(MAGIC, VERSION))
+        else:
+            self._f = open(ruta, "w", buffering=BUFER, encoding="utf-8")
+            if formato == "geojson":
+                self._f.write('{"type": "FeatureCollection", "features": [')
+
+    def escribir(self, inicio, fin, coste, camino, costes_arcos):
+        """Añade una ruta; un camino vacío indica que no hay solución."""
+        if self.formato == "texto":
+            self._escribir_texto(inicio, fin, camino, costes_arcos)
+        elif self.formato == "binario":
+            self._escribir_binario(inicio, fin, coste, camino, costes_arcos)
+        else:
+            self._escribir_geojson(inicio, fin, coste, camino, costes_arcos)
+        self._rutas += 1
+
+    def _escribir_texto(self, inicio, fin, camino, costes_arcos):
+        """Una línea por ruta; las consultas sin solución quedan como comentario."""
+        if not camino:
+            self._f.write(f"# {inicio} {fin} sin solución\n")
+            return
+        self._f.writelines(trozos_texto(camino, costes_arcos))
+        self._f.write("\n")
+
+    def _escribir_binario(self, inicio, fin, coste, camino, costes_arcos):
+        """Registro (inicio, fin, coste, num_nodos) + nodos + costes de arco."""
+        if not camino:
+            self._f.write(REGISTRO.pack(inicio, fin, -1, 0))
+            return
+        self._f.write(REGISTRO.pack(inicio, fin, coste, len(camino)))
+        _uint32(camino).tofile(self._f)
+        _uint32(costes_arcos).tofile(self._f)
+
+    def _escribir_geojson(self, inicio, fin, coste, camino, costes_arcos):
+        """Feature con la LineString de la ruta (geometría nula si no hay solución)."""
+        propiedades = json.dumps({"inicio": inicio, "fin": fin, "coste": coste,
+                                  "nodos": len(camino)}, ensure_ascii=False)
+        f = self._f
+        f.write(",\n" if self._rutas else "\n")
+        if not camino:
+            f.write(f'{{"type": "Feature", "properties": {propiedades}, "geometry": null}}')
+            return
+
+        # Coordenadas [longitud, latitud] en grados, volcadas por trozos
+        f.write(f'{{"type": "Feature", "properties": {propiedades}, '
+                f'"geometry": {{"type": "LineString", "coordinates": [')
+        coordenadas = self.grafo.get_coordenadas
+        for i in range(0, len(camino), NODOS_POR_TROZO):
+            trozo = []
+            for v in camino[i:i + NODOS_POR_TROZO]:
+                lon, lat = coordenadas(v)
+                trozo.append(f"[{lon / 1000000:.6f}, {lat / 1000000:.6f}]")
+            if i:
+                f.write(", ")
+            f.write(", ".join(trozo))
+        f.write("]}}")
+
+    def cerrar(self):
+        """Completa el formato y cierra el fichero."""
+        if self.formato == "geojson":
+            self._f.write("\n]}\n")
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+
+def leer_binario(ruta):
+    """
+    Lee un fichero en formato binario.
+
+    Returns:
+        list: [(inicio, fin, coste, camino, costes_arcos)]; coste None y listas
+              vacías para las consultas sin solución
+    """
+    rutas = []
+    with open(ruta, "rb") as f:
+        magic, version = CABECERA.unpack(f.read(CABECERA.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{ruta} no es un fichero de rutas binario válido")
+        while True:
+            datos = f.read(REGISTRO.size)
+            if not datos:
+                break
+            inicio, fin, coste, n = REGISTRO.unpack(datos)
+            camino = array('I')
+            costes = array('I')
+            if n:
+                camino.fromfile(f, n)
+                costes.fromfile(f, n - 1)
+                if sys.byteorder != "little":
+                    camino.byteswap()
+                    costes.byteswap()
+            rutas.append((inicio, fin, coste if n else None, camino.tolist(), costes.tolist()))
+    return rutas
@@ -0,0 +1,175 @@
+"""
+Modo servidor de parte-2.py: carga el mapa una vez y atiende consultas.
+
+Protocolo de líneas (por la entrada estándar o por un socket Unix local):
+
+    petición:   <id_inicio> <id_fin>
+    respuesta:  OK <coste> <expansiones> <segundos> <inicio> - (coste) - ... - <fin>
+                SIN_SOLUCION <id_inicio> <id_fin> <expansiones> <segundos>
+                ERROR <mensaje>
+
+Las líneas vacías o que empiezan por '#' se ignoran y 'salir' cierra la
+sesión. Las consultas de una misma sesión se reparten entre los trabajadores
+del pool según llegan (varias pueden resolverse a la vez), pero las
+respuestas se escriben en el orden de las peticiones. El tiempo de cada
+respuesta es solo el de la búsqueda, medido en el trabajador.
+"""
+
+import os
+import sys
+import stat
+import socket
+import threading
+import socketserver
+from collections import deque
+
+from consultas import formatear_camino, resolver_consulta
+
+# Número máximo de consultas de una sesión pendientes de responder
+MAX_PENDIENTES = 1024
+
+
+def _interpretar(linea):
+    """Devuelve (inicio, fin), None si la línea no es una consulta, o lanza ValueError."""
+    campos = linea.split()
+    if not campos or campos[0].startswith("#"):
+        return None
+    if len(campos) != 2:
+        raise ValueError("se esperaba '<id_inicio> <id_fin>'")
+    try:
+        return int(campos[0]), int(campos[1])
+    except ValueError:
+        raise ValueError("los IDs de los vértices deben ser enteros") from None
+
+
+def _respuesta(consulta, futuro):
+    """Línea de respuesta de una consulta ya enviada al pool."""
+    try:
+        coste, camino, costes_arcos, expandidos, segundos = futuro.result()
+    except Exception as e:
+        return f"ERROR {type(e).__name__}: {e}"
+
+    if not camino:
+        inicio, fin = consulta
+        return f"SIN_SOLUCION {inicio} {fin} {expandidos} {segundos:.6f}"
+    return f"OK {coste} {expandidos} {segundos:.6f} {formatear_camino(camino, costes_arcos)}"
+
+
+def atender(lineas, escribir, pool):
+    """
+    Atiende una sesión: lee peticiones de 'lineas' y escribe las respuestas
+    con 'escribir' (una línea sin salto final) en el orden de llegada.
+
+    La lectura y el envío al pool se hacen en este hilo y la escritura en
+    otro, de modo que una consulta lenta no impide aceptar las siguientes.
+    """
+    pendientes = deque()
+    hay_pendientes = threading.Condition()
+
+    def escritor():
+        while True:
+            with hay_pendientes:
+                while not pendientes:
+                    hay_pendientes.wait()
+                elemento = pendientes[0]
+            if elemento is None:
+                return
+
+            consulta, futuro, error = elemento
+            escribir(error if futuro is None else _respuesta(consulta, futuro))
+            with hay_pendientes:
+                pendientes.popleft()
+                hay_pendientes.notify_all()
+
+    hilo = threading.Thread(target=escritor, daemon=True)
+    hilo.start()
+
+    try:
+        for linea in lineas:
+            if linea.strip() == "salir":
+                break
+            try:
+                consulta = _interpretar(linea)
+            except ValueError as e:
+                elemento = (None, None, f"ERROR {e}")
+            else:
+                if consulta is None:
+                    continue
+                elemento = (consulta, pool.submit(resolver_consulta, *consulta), None)
+
+            with hay_pendientes:
+                # Contrapresión: no se acumulan más de MAX_PENDIENTES consultas
+                while len(pendientes) >= MAX_PENDIENTES:
+                    hay_pendientes.wait()
+                pendientes.append(elemento)
+                hay_pendientes.notify_all()
+    finally:
+        # Marca de fin: el escritor termina tras responder todo lo pendiente
+        with hay_pendientes:
+            pendientes.append(None)
+            hay_pendientes.notify_all()
+        hilo.join()
+
+
+# -----------------------------------------------------------------------------
+# Transportes: entrada estándar y socket Unix
+# -----------------------------------------------------------------------------
+
+def servir_stdin(pool, entrada=sys.stdin, salida=sys.stdout):
+    """Atiende una única sesión por la entrada y salida estándar."""
+    def escribir(texto):
+        salida.write(texto + "\n")
+        salida.flush()
+
+    atender(entrada, escribir, pool)
+
+
+class _ManejadorSesion(socketserver.StreamRequestHandler):
+    """Una sesión por conexión; el pool es compartido por todas."""
+
+    def handle(self):
+        def lineas():
+            for datos in self.rfile:
+                yield datos.decode("utf-8", errors="replace")
+
+        def escribir(texto):
+            try:
+                self.wfile.write(texto.encode("utf-8") + b"\n")
+                self.wfile.flush()
+            except OSError:
+                pass  # el cliente ha cerrado la conexión
+
+        atender(lineas(), escribir, self.server.pool)
+
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def servir_socket(pool, ruta):
+    """
+    Atiende conexiones en un socket Unix hasta recibir Ctrl+C. Cada conexión
+    es una sesión independiente y todas comparten el pool de trabajadores.
+    """
+    if os.path.exists(ruta):
+        # Solo se reutiliza la ruta si es un socket abandonado
+        if not stat.S_ISSOCK(os.stat(ruta).st_mode):
+            raise OSError(f"{ruta} existe y no es un socket")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as cliente:
+            try:
+                cliente.connect(ruta)
+                activo = True
+            except OSError:
+                activo = False
+        if activo:
+            raise OSError(f"Ya hay un servidor escuchando en {ruta}")
+        os.unlink(ruta)
+
+    with _ServidorUnix(ruta, _ManejadorSesion) as servidor:
+        servidor.pool = pool
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(ruta)